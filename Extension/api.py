@@ -1,44 +1,134 @@
-from flask import Flask, request, jsonify
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from scrape_amazon_titles import scrape_amazon_product_page, haversine, origin_hubs, uk_hub
-import pgeocode
+from scrape_amazon_titles import scrape_amazon_product_page, extract_asin
+from geo import distances_from_uk_hub
+from emissions import MODE_FACTORS, estimate_transport, origin_distances
+from vocabulary import canonical, class_index, memo_info
+from geocoder import GeocoderUnavailable, geocoder_ready, get_geocoder, normalize_postcode
+from metrics import callback, instrument_app, stage_timer
+from applog import get_logger, install_request_ids
+from request_profiler import install_profiling
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml_model"))
+from model_bundle import BUNDLE_NAME, load_bundle  # noqa: E402
+
+# === CONFIG ===
+BATCH_SCRAPE_WORKERS = int(os.environ.get("BATCH_SCRAPE_WORKERS", 8))
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", 500))
+MAX_SCENARIOS = int(os.environ.get("MAX_SCENARIOS", 512))
+MODEL_BUNDLE = os.environ.get("MODEL_BUNDLE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml_model", BUNDLE_NAME))
 
 app = Flask(__name__)
 CORS(app)
+instrument_app(app, "extension_api")
+install_request_ids(app)
+install_profiling(app)
+log = get_logger("api")
+
+# Load the postcode index once at startup rather than on the first request. If it is
+# missing and can't be built, the API still starts; postcode routes answer 503.
+try:
+    get_geocoder()
+except GeocoderUnavailable as e:
+    log.error("❌ Starting without postcode lookups: %s", e)
+
+
+def geocoder_unavailable():
+    return jsonify({'error': 'Postcode lookup is temporarily unavailable'}), 503
+
+
+def _geocoder_cache_counts():
+    vocab = memo_info()
+    counts = {("vocabulary", "hit"): vocab.hits, ("vocabulary", "miss"): vocab.misses}
+    if geocoder_ready():
+        info = get_geocoder().cache_info()
+        counts.update({("geocoder", "hit"): info.hits, ("geocoder", "miss"): info.misses})
+    return counts
+
+
+callback("eco_lru_cache_requests_total", "In-process LRU cache lookups.", "counter", ("cache", "result"),
+         _geocoder_cache_counts)
+
+# ML eco score for scenario sweeps, from the same bundle app.py serves (optional here)
+ml_bundle = ml_index = None
+if os.path.exists(MODEL_BUNDLE):
+    try:
+        ml_bundle = load_bundle(MODEL_BUNDLE)
+        ml_index = {field: class_index(field, ml_bundle.encoders[name].classes_)
+                    for field, name in [("material", "material"), ("transport", "transport"),
+                                        ("recyclability", "recycle"), ("origin", "origin")]}
+        log.info("📦 Loaded model bundle: %s", MODEL_BUNDLE)
+    except Exception as e:
+        ml_bundle = ml_index = None
+        log.warning("⚠️ Could not load %s (%s), scenario sweeps will return no ML score.", MODEL_BUNDLE, e)
+else:
+    log.warning("⚠️ %s not found, scenario sweeps will return no ML score.", MODEL_BUNDLE)
+
+
+def build_estimates(product, distances, uk_distances, include_packaging=True, override_mode=None, origins=None):
+    # One product at any number of (distance, packaging, override) combinations, each a
+    # column or a scalar, in a single emissions-engine call. `origins` labels each row
+    # when the distances are for other origins than the product's own.
+    distances = np.atleast_1d(np.asarray(distances, dtype=np.float64))
+    est = estimate_transport(product['estimated_weight_kg'], distances, product.get("recyclability"),
+                             include_packaging, override_mode)
+    n = len(est["carbon_kg"])
+    distances = np.broadcast_to(distances, (n,))
+    uk_distances = np.broadcast_to(np.asarray(uk_distances, dtype=np.float64), (n,))
+    origins = np.broadcast_to(np.asarray(product['brand_estimated_origin'] if origins is None else origins,
+                                         dtype=object), (n,))
+
+    # === 👇 Enhancement: fallback source flag + confidence
+    origin_source = product.get("origin_source", "brand_db")
+    confidence = product.get("confidence", "Estimated")
+
+    # === ✅ Build response
+    return [{
+        "title": product.get("title"),
+        "data": {
+            "attributes": {
+                "carbon_kg": float(est["carbon_kg"][i]),
+                "weight_kg": round(float(est["final_weight_kg"][i]), 2),
+                "raw_product_weight_kg": round(product['estimated_weight_kg'], 2),
+                "origin": origins[i],
+                "intl_distance_km": round(float(distances[i]), 1),
+                "uk_distance_km": round(float(uk_distances[i]), 1),
+                "dimensions_cm": product.get("dimensions_cm"),
+                "material_type": product.get("material_type"),
+                "transport_mode": est["transport_mode"][i],
+                "emission_factors": dict(MODE_FACTORS),
+                "eco_score": est["eco_score"][i],
+                "recyclability": product.get("recyclability"),
+                "confidence": confidence,
+                "origin_source": origin_source,
+            }
+        }
+    } for i in range(n)]
+
+
+def build_estimate(product, user_lat, user_lon, include_packaging=True, override_mode=None,
+                   distance=None, uk_distance=None):
+    # Distance from origin to user (unknown origins ship from the UK hub)
+    if distance is None:
+        distance = float(origin_distances(product['brand_estimated_origin'], user_lat, user_lon)[0])
+    product['distance_origin_to_user'] = round(distance, 1)
+
+    # Distance from UK hub to user
+    if uk_distance is None:
+        uk_distance = float(distances_from_uk_hub(user_lat, user_lon))
+    product['distance_uk_to_user'] = round(uk_distance, 1)
+
+    return build_estimates(product, distance, uk_distance, include_packaging, override_mode)[0]
 
-# ✅ Add this helper function near the top
-def determine_transport_mode(distance_km):
-    if distance_km < 1500:
-        return "Truck", 0.12  # 120g per tonne-km
-    elif distance_km < 6000:
-        return "Ship", 0.02   # 20g per tonne-km
-    else:
-        return "Air", 0.5     # 500g per tonne-km
-    
-def calculate_eco_score(carbon_kg, recyclability, distance_km, weight_kg):
-    carbon_score = max(0, 10 - carbon_kg * 5)
-    weight_score = max(0, 10 - weight_kg * 2)
-    distance_score = max(0, 10 - distance_km / 1000)
-    recycle_score = {
-        "Low": 2,
-        "Medium": 6,
-        "High": 10
-    }.get(recyclability or "Medium", 5)
-
-    total_score = (carbon_score + weight_score + distance_score + recycle_score) / 4
-
-    if total_score >= 9:
-        return "A+"
-    elif total_score >= 8:
-        return "A"
-    elif total_score >= 6.5:
-        return "B"
-    elif total_score >= 5:
-        return "C"
-    elif total_score >= 3.5:
-        return "D"
-    else:
-        return "F"
 
 @app.route("/estimate_emissions", methods=["POST"])
 def estimate():
@@ -48,90 +138,249 @@ def estimate():
     include_packaging = data.get("include_packaging", True)
     override_mode = data.get("override_transport_mode")
 
-    print(f"🌍 Request received: {url}")
-    print(f"📍 Postcode: {postcode} | Packaging included? {include_packaging} | Override mode: {override_mode}")
+    log.info("🌍 Request received: %s", url)
+    log.debug("📍 Postcode: %s | Packaging included? %s | Override mode: %s", postcode, include_packaging, override_mode)
 
     if not url or not postcode:
         return jsonify({'error': 'Missing URL or postcode'}), 400
 
-    # Get lat/lon from postcode
-    geo = pgeocode.Nominatim('gb')
-    location = geo.query_postal_code(postcode)
-    if location.empty or location.latitude is None:
+    # Get lat/lon from postcode (in-memory index, LRU cached)
+    try:
+        with stage_timer("estimate_emissions", "geocode"):
+            location = get_geocoder().query(postcode)
+    except GeocoderUnavailable:
+        return geocoder_unavailable()
+    if location is None:
         return jsonify({'error': 'Invalid postcode'}), 400
 
-    user_lat, user_lon = location.latitude, location.longitude
+    user_lat, user_lon = location
 
     # Scrape product
-    product = scrape_amazon_product_page(url)
+    with stage_timer("estimate_emissions", "scrape"):
+        product = scrape_amazon_product_page(url)
     if not product:
         return jsonify({'error': 'Could not fetch product'}), 500
 
-    print(f"🔍 Scraped product: {product.get('title', 'N/A')}")
+    log.info("🔍 Scraped product: %s", product.get('title', 'N/A'))
 
-    origin = origin_hubs.get(product['brand_estimated_origin'], uk_hub)
+    with stage_timer("estimate_emissions", "build_estimate"):
+        result = build_estimate(product, user_lat, user_lon, include_packaging, override_mode)
+    return jsonify(result)
 
-    # Distance from origin to user
-    distance = haversine(origin['lat'], origin['lon'], user_lat, user_lon)
-    product['distance_origin_to_user'] = round(distance, 1)
 
-    # Distance from UK hub to user
-    product['distance_uk_to_user'] = round(haversine(uk_hub['lat'], uk_hub['lon'], user_lat, user_lon), 1)
-
-    # Raw + final weight
-    raw_weight = product['estimated_weight_kg']
-    final_weight = raw_weight * 1.2 if include_packaging else raw_weight
-
-    # Transport mode decision
-    transport_mode, emission_factor = determine_transport_mode(distance)
-    modes = {
-        "Air": 0.5,
-        "Ship": 0.03,
-        "Truck": 0.15
-    }
-
-    if override_mode in modes:
-        transport_mode = override_mode
-        emission_factor = modes[override_mode]
-
-    carbon_kg = round(final_weight * emission_factor * (distance / 1000), 2)
-
-    # Eco Score
-    eco_score = calculate_eco_score(
-        carbon_kg,
-        product.get("recyclability"),
-        product["distance_origin_to_user"],
-        final_weight
-    )
+# === Scenario sweep ===
+SCENARIO_AUTO = "auto"  # no override: the distance picks the mode
 
-    # === 👇 Enhancement: fallback source flag + confidence
-    origin_source = product.get("origin_source", "brand_db")
-    confidence = product.get("confidence", "Estimated")
 
-    # === ✅ Build response
-    response = {
+def _encode(values, field, default):
+    # Label-encode a column by canonical spelling, unknown values falling back to `default`
+    # (like app.py's safe_encode); "Truck" is the model's "Land"
+    index = ml_index[field]
+    fallback = index.get(default, 0)
+    return np.array([index.get(canonical(field, v, default), fallback) for v in values], dtype=np.float64)
+
+
+def ml_scores(material, weights, transports, recyclability, origins):
+    # One batched predict for every scenario row -> (labels, confidence %), or None without a model
+    if ml_bundle is None:
+        return None
+    n = len(weights)
+    X = np.column_stack([
+        _encode([material] * n, "material", "Other"),
+        np.asarray(weights, dtype=np.float64),
+        _encode(transports, "transport", "Land"),
+        _encode([recyclability] * n, "recyclability", "Medium"),
+        _encode(origins, "origin", "Other"),
+    ])
+    try:
+        proba = ml_bundle.model.predict_proba(X)
+        best = proba.argmax(axis=1)
+        labels = ml_bundle.encoders["label"].inverse_transform(ml_bundle.model.classes_[best])
+    except Exception as e:
+        # e.g. a bundle trained on another feature layout: keep the grid, drop the ML score
+        log.warning("⚠️ Scenario ML prediction failed: %s", e)
+        return None
+    return labels, np.round(proba[np.arange(n), best] * 100, 1)
+
+
+@app.route("/estimate_emissions/scenarios", methods=["POST"])
+def estimate_scenarios():
+    # Every origin x transport mode x packaging variant of one product, from one scrape,
+    # one geocode, one emissions-engine call and one batched predict
+    data = request.get_json() or {}
+    url = data.get("amazon_url")
+    postcode = data.get("postcode")
+    modes = data.get("transport_modes", [SCENARIO_AUTO] + list(MODE_FACTORS))
+    packaging = data.get("include_packaging", [True, False])
+    extra_origins = data.get("origins", [])
+
+    if not url or not postcode:
+        return jsonify({'error': 'Missing URL or postcode'}), 400
+    modes = modes if isinstance(modes, list) else [modes]
+    packaging = packaging if isinstance(packaging, list) else [packaging]
+    if not modes or not packaging:
+        return jsonify({'error': '"transport_modes" and "include_packaging" must not be empty'}), 400
+    unknown = [m for m in modes if m != SCENARIO_AUTO and m not in MODE_FACTORS]
+    if unknown:
+        return jsonify({'error': f'Unknown transport mode(s) {unknown} (expected "{SCENARIO_AUTO}" or one of {list(MODE_FACTORS)})'}), 400
+    if not isinstance(extra_origins, list) or not all(isinstance(o, str) and o for o in extra_origins):
+        return jsonify({'error': '"origins" must be a list of country names'}), 400
+    if (1 + len(extra_origins)) * len(modes) * len(packaging) > MAX_SCENARIOS:
+        return jsonify({'error': f'Too many scenarios (max {MAX_SCENARIOS})'}), 400
+
+    log.info("🧭 Scenario request: %s (%s mode(s) x %s packaging x %s extra origin(s))",
+             url, len(modes), len(packaging), len(extra_origins))
+
+    try:
+        with stage_timer("estimate_scenarios", "geocode"):
+            location = get_geocoder().query(postcode)
+    except GeocoderUnavailable:
+        return geocoder_unavailable()
+    if location is None:
+        return jsonify({'error': 'Invalid postcode'}), 400
+    user_lat, user_lon = location
+
+    with stage_timer("estimate_scenarios", "scrape"):
+        product = scrape_amazon_product_page(url)
+    if not product:
+        return jsonify({'error': 'Could not fetch product'}), 500
+
+    # The product's own origin first, then any "what if it came from..." overrides
+    origins = list(dict.fromkeys([product['brand_estimated_origin']] + extra_origins))
+
+    with stage_timer("estimate_scenarios", "build_estimate"):
+        distances = np.asarray(origin_distances(origins, user_lat, user_lon), dtype=np.float64)
+        uk_distance = float(distances_from_uk_hub(user_lat, user_lon))
+        # Flattened grid, origin-major, then mode, then packaging
+        o, m, p = np.indices((len(origins), len(modes), len(packaging))).reshape(3, -1)
+        overrides = np.array([None if mode == SCENARIO_AUTO else mode for mode in modes], dtype=object)[m]
+        results = build_estimates(product, distances[o], uk_distance, np.array(packaging, dtype=bool)[p],
+                                  overrides, np.array(origins, dtype=object)[o])
+
+    with stage_timer("estimate_scenarios", "predict"):
+        attributes = [r["data"]["attributes"] for r in results]
+        ml = ml_scores(product.get("material_type") or "Other", [a["weight_kg"] for a in attributes],
+                       [a["transport_mode"] for a in attributes], product.get("recyclability") or "Medium",
+                       [a["origin"] for a in attributes])
+
+    scenarios = []
+    for i, result in enumerate(results):
+        if ml is not None:
+            result["data"]["attributes"]["ml_eco_score"] = str(ml[0][i])
+            result["data"]["attributes"]["ml_confidence"] = f"{ml[1][i]}%"
+        scenarios.append({"origin": origins[o[i]], "transport_mode": modes[m[i]],
+                          "include_packaging": bool(packaging[p[i]]), "result": result})
+
+    return jsonify({
         "title": product.get("title"),
-        "data": {
-            "attributes": {
-                "carbon_kg": carbon_kg,
-                "weight_kg": round(final_weight, 2),
-                "raw_product_weight_kg": round(raw_weight, 2),
-                "origin": product['brand_estimated_origin'],
-                "intl_distance_km": product['distance_origin_to_user'],
-                "uk_distance_km": product['distance_uk_to_user'],
-                "dimensions_cm": product.get("dimensions_cm"),
-                "material_type": product.get("material_type"),
-                "transport_mode": transport_mode,
-                "emission_factors": modes,
-                "eco_score": eco_score,
-                "recyclability": product.get("recyclability"),
-                "confidence": confidence,
-                "origin_source": origin_source,
-            }
-        }
-    }
+        "origins": origins,
+        "transport_modes": modes,
+        "include_packaging": packaging,
+        "ml_scores": ml is not None,
+        "scenarios": scenarios,
+    })
+
+
+# === Batch estimation ===
+# Shared, bounded scrape pool. Each thread keeps its own Chrome profile dir,
+# since two browsers cannot share one user-data-dir.
+_scrape_pool = ThreadPoolExecutor(max_workers=BATCH_SCRAPE_WORKERS, thread_name_prefix="batch-scrape")
+_scrape_slots = threading.local()
+_scrape_slot_counter = itertools.count()
+
+
+def _scrape_in_pool(url):
+    if not hasattr(_scrape_slots, "profile"):
+        _scrape_slots.profile = f"selenium_profile_batch{next(_scrape_slot_counter)}"
+    with stage_timer("estimate_batch", "scrape"):
+        return scrape_amazon_product_page(url, user_data_dir=_scrape_slots.profile)
+
+
+def _ndjson(obj):
+    return json.dumps(obj) + "\n"
+
+
+@app.route("/estimate_emissions/batch", methods=["POST"])
+def estimate_batch():
+    data = request.get_json() or {}
+    items = data.get("items") or []
+    default_packaging = data.get("include_packaging", True)
+    default_override = data.get("override_transport_mode")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty "items" list of {url, postcode}'}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'Batch too large (max {MAX_BATCH_ITEMS} items)'}), 400
+
+    log.info("📦 Batch request: %s item(s)", len(items))
+
+    # Geocode every distinct postcode in one vectorized lookup
+    postcodes = sorted({normalize_postcode(item.get("postcode")) for item in items if isinstance(item, dict)} - {""})
+    try:
+        with stage_timer("estimate_batch", "geocode"):
+            lats, lons, found = get_geocoder().query_many(postcodes)
+    except GeocoderUnavailable:
+        return geocoder_unavailable()
+    coords = {pc: (lat, lon) for pc, lat, lon, ok in zip(postcodes, lats, lons, found) if ok}
+
+    # Group items by ASIN so each product is scraped once
+    jobs = {}
+    errors = []
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        url = item.get("url") or item.get("amazon_url")
+        postcode = normalize_postcode(item.get("postcode"))
+        if not url or not postcode:
+            errors.append({"index": index, "error": "Missing URL or postcode"})
+        elif postcode not in coords:
+            errors.append({"index": index, "url": url, "postcode": item.get("postcode"), "error": "Invalid postcode"})
+        else:
+            key = extract_asin(url) or url
+            jobs.setdefault(key, {"url": url, "items": []})["items"].append((index, item, coords[postcode]))
+
+    log.info("🧮 %s unique product(s), %s unique postcode(s), %s rejected item(s)", len(jobs), len(coords), len(errors))
+
+    def generate():
+        for error in errors:
+            yield _ndjson(error)
+
+        # copy_context: pool threads log under this request's id
+        futures = {_scrape_pool.submit(contextvars.copy_context().run, _scrape_in_pool, job["url"]): key
+                   for key, job in jobs.items()}
+        try:
+            for future in as_completed(futures):
+                job = jobs[futures[future]]
+                try:
+                    product = future.result()
+                except Exception as e:
+                    log.warning("❌ Batch scrape failed for %s: %s", job['url'], e)
+                    product = None
+
+                if not product:
+                    for index, item, _ in job["items"]:
+                        yield _ndjson({"index": index, "url": item.get("url") or item.get("amazon_url"),
+                                       "postcode": item.get("postcode"), "error": "Could not fetch product"})
+                    continue
+
+                # Distances and estimates for every postcode that asked for this product, in one go
+                user_lats = np.array([c[0] for _, _, c in job["items"]])
+                user_lons = np.array([c[1] for _, _, c in job["items"]])
+                distances = origin_distances(product['brand_estimated_origin'], user_lats, user_lons)
+                uk_distances = distances_from_uk_hub(user_lats, user_lons)
+                packaging = [item.get("include_packaging", default_packaging) for _, item, _ in job["items"]]
+                overrides = [item.get("override_transport_mode", default_override) for _, item, _ in job["items"]]
+                with stage_timer("estimate_batch", "build_estimate"):
+                    results = build_estimates(product, distances, uk_distances, packaging, overrides)
+
+                for (index, item, _), result in zip(job["items"], results):
+                    yield _ndjson({"index": index, "url": item.get("url") or item.get("amazon_url"),
+                                   "postcode": item.get("postcode"), "result": result})
+        finally:
+            # Client went away or we are done: drop anything not started yet
+            for future in futures:
+                future.cancel()
 
-    return jsonify(response)
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
 
 
 if __name__ == '__main__':
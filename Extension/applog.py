@@ -0,0 +1,235 @@
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+
+# Structured logging for the APIs and the scrapers. Call sites use %-style
+# arguments (log.info("Scraped %s", title)), so a message below the configured
+# level costs one level check and is never formatted. Records go onto a
+# bounded in-memory queue and a background thread formats and writes them
+# in batches, so a request never blocks on stderr. If the queue is full, the
+# record is dropped and counted.
+#
+#   LOG_LEVEL=DEBUG|INFO|WARNING   (default INFO)
+#   LOG_FORMAT=text|json           (default text; colour when stderr is a tty)
+#   LOG_SAMPLE_RATE=0.01           share of high-volume debug events kept
+
+# === CONFIG ===
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text").lower()
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", 0.01))
+QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+ROOT = "eco"
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+_COLOURS = {"DEBUG": "\033[90m", "INFO": "\033[94m", "WARNING": "\033[93m", "ERROR": "\033[91m", "CRITICAL": "\033[91m"}
+
+
+class RequestIdFilter(logging.Filter):
+    # Runs in the calling thread, before the record crosses the queue
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, colour=False):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s [%(request_id)s] %(message)s")
+        self.colour = colour
+
+    def format(self, record):
+        line = super().format(record)
+        if self.colour:
+            return f"{_COLOURS.get(record.levelname, '')}{line}\033[0m"
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "sample_rate", None) is not None:
+            entry["sample_rate"] = record.sample_rate
+        if record.exc_info or record.exc_text:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args now (they may be mutated after the call returns) but skip
+        # the stdlib's record copy and full format; the writer formats
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchWriter(threading.Thread):
+    # Formats and writes whatever is queued in one write + flush, instead of one per record
+    STOP = object()
+
+    def __init__(self, q, formatter, stream, batch_size=256):
+        super().__init__(name="applog-writer", daemon=True)
+        self.queue, self.formatter, self.stream, self.batch_size = q, formatter, stream, batch_size
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = [self.formatter.format(r) for r in batch if r is not self.STOP]
+            if lines:
+                try:
+                    self.stream.write("\n".join(lines) + "\n")
+                    self.stream.flush()
+                except (OSError, ValueError):
+                    pass
+            for _ in batch:
+                self.queue.task_done()
+            if any(r is self.STOP for r in batch):
+                return
+
+    def stop(self):
+        self.queue.put(self.STOP)
+        self.join()
+
+
+_lock = threading.Lock()
+_handler = None
+_writer = None
+
+
+def _make_formatter():
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return TextFormatter(colour=sys.stderr.isatty())
+
+
+def _start_writer():
+    global _writer
+    _handler.queue = queue.Queue(QUEUE_SIZE)
+    _writer = BatchWriter(_handler.queue, _make_formatter(), sys.stderr)
+    _writer.start()
+
+
+def _no_caller(*args, **kwargs):
+    return "(unknown file)", 0, "(unknown function)", None
+
+
+def configure(level=None):
+    # Idempotent; get_logger() calls it on first use
+    global _handler
+    with _lock:
+        root = logging.getLogger(ROOT)
+        root.setLevel(level or LOG_LEVEL)
+        if _handler is not None:
+            return root
+        _handler = DroppingQueueHandler(queue.Queue(QUEUE_SIZE))
+        _handler.addFilter(RequestIdFilter())
+        root.addHandler(_handler)
+        root.propagate = False
+        _start_writer()
+        atexit.register(shutdown)
+        # serve.py forks workers after import: the writer thread does not survive
+        # the fork, so each child gets a fresh queue and its own writer
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_writer)
+        return root
+
+
+def shutdown():
+    # Drains the queue; safe to call more than once
+    if _writer is not None and _writer.is_alive():
+        _writer.stop()
+
+
+def dropped():
+    return _handler.dropped if _handler is not None else 0
+
+
+def get_logger(name):
+    if _handler is None:
+        configure()
+    logger = logging.getLogger(f"{ROOT}.{name}")
+    # No file/line in the output, so skip the stack walk the stdlib does per record
+    logger.findCaller = _no_caller
+    return logger
+
+
+class SampledLogger:
+    # For per-item events (search cards, spec blobs): keeps ~rate of them, tagged with the rate
+    def __init__(self, logger, rate=None):
+        self.logger = logger
+        self.rate = LOG_SAMPLE_RATE if rate is None else rate
+
+    def _log(self, level, msg, args):
+        if self.logger.isEnabledFor(level) and random.random() < self.rate:
+            self.logger.log(level, msg, *args, extra={"sample_rate": self.rate})
+
+    def debug(self, msg, *args):
+        self._log(logging.DEBUG, msg, args)
+
+    def info(self, msg, *args):
+        self._log(logging.INFO, msg, args)
+
+
+# === Per-request correlation ids ===
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def install_request_ids(app):
+    # Takes X-Request-ID from the caller (or makes one), tags every record logged
+    # while handling the request and echoes the id back on the response
+    from flask import g, request
+
+    @app.before_request
+    def _bind_request_id():
+        rid = request.headers.get("X-Request-ID", "")[:64] or new_request_id()
+        g.request_id_token = request_id_var.set(rid)
+
+    @app.after_request
+    def _echo_request_id(response):
+        response.headers["X-Request-ID"] = request_id_var.get()
+        return response
+
+    @app.teardown_request
+    def _unbind_request_id(exc):
+        token = g.pop("request_id_token", None)
+        if token is not None:
+            try:
+                request_id_var.reset(token)
+            except ValueError:
+                pass  # streamed response finished in another context
+
+    return app
+
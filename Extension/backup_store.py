@@ -0,0 +1,249 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used when it's not installed
+    zstandard = None
+
+# === CONFIG ===
+DEFAULT_BACKUP_DIR = "backups"
+FULL_EVERY = 20  # deltas between full snapshots
+KEEP_FULL = 3  # full snapshots (with their deltas) kept per database
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _item_hash(value):
+    return hashlib.sha256(_canonical(value)).hexdigest()[:16]
+
+
+def _keyed_items(db):
+    # bulk DB is a list of products, priority DB a dict keyed by ASIN
+    if isinstance(db, dict):
+        return "dict", dict(db)
+    items = {}
+    for product in db:
+        key = product.get("asin") if isinstance(product, dict) else None
+        items[key or "h:" + _item_hash(product)] = product
+    return "list", items
+
+
+# === Compression ===
+def _compress(data):
+    if zstandard:
+        return "zst", zstandard.ZstdCompressor(level=10).compress(data)
+    return "gz", gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data, codec):
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("This backup was written with zstd; pip install zstandard to restore it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class BackupStore:
+    """Content-addressed, incremental snapshots of the product databases.
+
+    Each snapshot stores only the products added/changed/removed since the
+    previous one (a full copy every full_every snapshots), compressed and
+    named by the hash of its content under objects/. manifest.json records
+    the chain, and restore() replays deltas onto the last full snapshot.
+    """
+
+    def __init__(self, root=DEFAULT_BACKUP_DIR, full_every=FULL_EVERY, keep_full=KEEP_FULL):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.full_every = full_every
+        self.keep_full = keep_full
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.manifest = self._load_json(self.manifest_path, {"snapshots": []})
+
+    # === Files ===
+    @staticmethod
+    def _load_json(path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _save_manifest(self):
+        self._write_atomic(self.manifest_path, json.dumps(self.manifest, indent=2).encode("utf-8"))
+
+    def _index_path(self, name):
+        return os.path.join(self.root, f"{name}.index.json.gz")
+
+    def _load_index(self, name):
+        path = self._index_path(name)
+        if not os.path.exists(path):
+            return {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_index(self, name, index):
+        self._write_atomic(self._index_path(name), gzip.compress(_canonical(index), compresslevel=1))
+
+    def _put_object(self, payload):
+        digest = hashlib.sha256(_canonical(payload)).hexdigest()
+        codec, data = _compress(_canonical(payload))
+        path = os.path.join(self.objects_dir, f"{digest}.json.{codec}")
+        if not os.path.exists(path):
+            self._write_atomic(path, data)
+        return digest, codec, len(data)
+
+    def _get_object(self, digest, codec):
+        with open(os.path.join(self.objects_dir, f"{digest}.json.{codec}"), "rb") as f:
+            return json.loads(_decompress(f.read(), codec))
+
+    # === Snapshots ===
+    def snapshots(self, name=None):
+        return [s for s in self.manifest["snapshots"] if name is None or s["db"] == name]
+
+    def snapshot(self, name, db, force_full=False):
+        # Returns the manifest entry, or None when nothing changed since the last snapshot
+        kind, items = _keyed_items(db)
+        hashes = {key: _item_hash(value) for key, value in items.items()}
+        previous = self.snapshots(name)
+        last = previous[-1] if previous else None
+
+        deltas_since_full = 0
+        for s in reversed(previous):
+            if s["type"] == "full":
+                break
+            deltas_since_full += 1
+        full = force_full or last is None or deltas_since_full + 1 >= self.full_every
+
+        if full:
+            payload = {"kind": kind, "items": list(items.items())}
+            changed, removed = len(items), 0
+        else:
+            old = self._load_index(name)
+            upserts = [[key, items[key]] for key, h in hashes.items() if old.get(key) != h]
+            gone = [key for key in old if key not in hashes]
+            if not upserts and not gone:
+                return None
+            payload = {"kind": kind, "upserts": upserts, "removed": gone}
+            changed, removed = len(upserts), len(gone)
+
+        digest, codec, size = self._put_object(payload)
+        entry = {
+            "id": f"{name}-{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
+            "db": name,
+            "type": "full" if full else "delta",
+            "created_at": time.time(),
+            "object": digest,
+            "codec": codec,
+            "bytes": size,
+            "items": len(items),
+            "changed": changed,
+            "removed": removed,
+        }
+        self.manifest["snapshots"].append(entry)
+        self._save_index(name, hashes)
+        self._prune(name)
+        self._save_manifest()
+        return entry
+
+    # === Retention ===
+    def _prune(self, name):
+        fulls = [i for i, s in enumerate(self.manifest["snapshots"]) if s["db"] == name and s["type"] == "full"]
+        if len(fulls) <= self.keep_full:
+            return
+        cutoff = fulls[-self.keep_full]
+        self.manifest["snapshots"] = [
+            s for i, s in enumerate(self.manifest["snapshots"]) if s["db"] != name or i >= cutoff
+        ]
+        self.collect_garbage()
+
+    def collect_garbage(self):
+        referenced = {f"{s['object']}.json.{s['codec']}" for s in self.manifest["snapshots"]}
+        removed = 0
+        for fname in os.listdir(self.objects_dir):
+            if fname not in referenced and not fname.endswith(".tmp"):
+                os.remove(os.path.join(self.objects_dir, fname))
+                removed += 1
+        return removed
+
+    # === Restore ===
+    def restore(self, name, snapshot_id=None):
+        chain = self.snapshots(name)
+        if snapshot_id:
+            ids = [s["id"] for s in chain]
+            if snapshot_id not in ids:
+                raise KeyError(f"No snapshot {snapshot_id} for {name}")
+            chain = chain[: ids.index(snapshot_id) + 1]
+        if not chain:
+            raise KeyError(f"No snapshots for {name}")
+
+        start = max(i for i, s in enumerate(chain) if s["type"] == "full")
+        base = self._get_object(chain[start]["object"], chain[start]["codec"])
+        kind, items = base["kind"], dict(base["items"])
+        for s in chain[start + 1:]:
+            delta = self._get_object(s["object"], s["codec"])
+            for key in delta["removed"]:
+                items.pop(key, None)
+            for key, value in delta["upserts"]:
+                items[key] = value
+        return items if kind == "dict" else list(items.values())
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="💾 Incremental product DB backups.")
+    parser.add_argument("--dir", default=DEFAULT_BACKUP_DIR, help="Backup directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List snapshots")
+
+    snap = sub.add_parser("snapshot", help="Snapshot a JSON database file")
+    snap.add_argument("db", help="Database name, e.g. bulk or priority")
+    snap.add_argument("file")
+    snap.add_argument("--full", action="store_true")
+
+    restore = sub.add_parser("restore", help="Rebuild a database from its snapshots")
+    restore.add_argument("db")
+    restore.add_argument("--snapshot", help="Snapshot id (default: latest)")
+    restore.add_argument("--out", required=True)
+
+    sub.add_parser("gc", help="Delete objects no snapshot refers to")
+
+    args = parser.parse_args()
+    store = BackupStore(args.dir)
+
+    if args.command == "list":
+        for s in store.snapshots():
+            when = datetime.fromtimestamp(s["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{s['id']:<40} {s['type']:<5} {when}  {s['items']:>7} items  "
+                  f"{s['changed']:>6} changed  {s['removed']:>5} removed  {s['bytes'] / 1024:8.1f} KB")
+
+    elif args.command == "snapshot":
+        with open(args.file, "r", encoding="utf-8") as f:
+            entry = store.snapshot(args.db, json.load(f), force_full=args.full)
+        print(f"💾 {entry['id']} ({entry['type']}, {entry['changed']} changed)" if entry else "🤷 No changes.")
+
+    elif args.command == "restore":
+        db = store.restore(args.db, args.snapshot)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(db, f, indent=2)
+        print(f"✅ Restored {len(db)} items of {args.db} → {args.out}")
+
+    elif args.command == "gc":
+        print(f"🧹 Removed {store.collect_garbage()} unreferenced object(s).")
@@ -0,0 +1,268 @@
+import argparse
+import fnmatch
+import hashlib
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlparse
+
+import browser_profile
+from browser_profile import BLOCKED_URL_PATTERNS
+
+# Bytes transferred and wall time per product page with the fast browser
+# profile on and off, against recorded fixture pages served locally.
+#
+#   python bench_browser_profile.py record https://www.amazon.co.uk/dp/B0... charger
+#   python bench_browser_profile.py run                # real Chrome, both profiles
+#   python bench_browser_profile.py run --static       # no browser: what each profile would fetch
+#
+# Fixtures live in fixtures/pages/<name>/index.html with every subresource saved
+# under res/ and rewritten to /_/<original host>/<file>, so host-based block
+# patterns (ad networks, telemetry) still apply to the local copies.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(script_dir, "fixtures", "pages")
+TITLE_LOCATORS = [("id", "productTitle"), ("css selector", "#title span"), ("css selector", "h1.a-size-large span")]
+
+RESOURCE_TYPES = {
+    "img": (".png", ".jpg", ".jpeg", ".gif", ".webp", ".svg", ".ico", ".avif"),
+    "font": (".woff", ".woff2", ".ttf", ".otf", ".eot"),
+    "media": (".mp4", ".webm", ".m3u8"),
+    "js": (".js",),
+    "css": (".css",),
+}
+
+
+def resource_type(path):
+    path = urlparse(path).path.lower()
+    for kind, exts in RESOURCE_TYPES.items():
+        if path.endswith(exts):
+            return kind
+    return "html" if path.endswith((".html", "/")) else "other"
+
+
+def is_blocked(original_url):
+    kind = resource_type(original_url)
+    return kind == "img" or any(fnmatch.fnmatchcase(original_url, p) for p in BLOCKED_URL_PATTERNS)
+
+
+# === Fixtures ===
+def record(url, name, fixtures_dir):
+    import requests
+    from bs4 import BeautifulSoup
+
+    out = os.path.join(fixtures_dir, name)
+    os.makedirs(os.path.join(out, "res"), exist_ok=True)
+    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/135.0 Safari/537.36",
+               "Accept-Language": "en-GB"}
+    html = requests.get(url, headers=headers, timeout=30).text
+    soup = BeautifulSoup(html, "html.parser")
+
+    saved = 0
+    for tag, attr in (("img", "src"), ("script", "src"), ("link", "href"), ("iframe", "src"), ("source", "src")):
+        for el in soup.find_all(tag):
+            src = el.get(attr)
+            if not src or src.startswith("data:"):
+                continue
+            absolute = urljoin(url, src)
+            parsed = urlparse(absolute)
+            ext = os.path.splitext(parsed.path)[1][:6]
+            fname = hashlib.sha1(absolute.encode()).hexdigest()[:16] + ext
+            try:
+                body = requests.get(absolute, headers=headers, timeout=30).content
+            except Exception:
+                continue
+            os.makedirs(os.path.join(out, "res", parsed.netloc), exist_ok=True)
+            with open(os.path.join(out, "res", parsed.netloc, fname), "wb") as f:
+                f.write(body)
+            el[attr] = f"/_/{parsed.netloc}/{fname}"
+            saved += 1
+
+    with open(os.path.join(out, "index.html"), "w", encoding="utf-8") as f:
+        f.write(str(soup))
+    print(f"📼 Recorded {url} → {out} ({saved} subresources)")
+
+
+def synthesize(name, fixtures_dir, seed=0):
+    # Stand-in when no recording is available: product DOM plus a typical resource mix
+    rng = random.Random(seed)
+    out = os.path.join(fixtures_dir, name)
+    resources = (
+        [("m.media-amazon.com", f"img{i}.jpg", rng.randint(15, 80) * 1024) for i in range(45)]
+        + [("m.media-amazon.com", f"font{i}.woff2", 40 * 1024) for i in range(4)]
+        + [("m.media-amazon.com", f"app{i}.js", rng.randint(40, 150) * 1024) for i in range(10)]
+        + [("m.media-amazon.com", "site.css", 90 * 1024)]
+        + [("aax-eu.amazon-adsystem.com", f"ad{i}.js", 35 * 1024) for i in range(6)]
+        + [("fls-eu.amazon.co.uk", f"1/batch/1/OE/{i}.js", 2 * 1024) for i in range(5)]
+        + [("m.media-amazon.com", "promo.mp4", 600 * 1024)]
+    )
+    tags = []
+    for host, fname, size in resources:
+        path = os.path.join(out, "res", host, fname)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(size))
+        src = f"/_/{host}/{fname}"
+        kind = resource_type(fname)
+        if kind == "img":
+            tags.append(f'<img src="{src}">')
+        elif kind == "css":
+            tags.append(f'<link rel="stylesheet" href="{src}">')
+        elif kind == "font":
+            tags.append(f'<link rel="preload" as="font" href="{src}">')
+        elif kind == "media":
+            tags.append(f'<video><source src="{src}"></video>')
+        else:
+            tags.append(f'<script src="{src}" async></script>')
+    bullets = "".join(f"<li>Feature {i}: made of recycled plastic</li>" for i in range(8))
+    html = f"""<html><head><title>{name}</title>{''.join(t for t in tags if t.startswith('<link'))}</head><body>
+<div id="title"><span id="productTitle">Anker USB C Charger 65W, 120g</span></div>
+<a id="bylineInfo">Visit the Anker Store</a>
+<div id="detailBullets_feature_div"><ul>{bullets}<li>Item weight : 120 g</li><li>Country of origin : China</li></ul></div>
+{''.join(t for t in tags if not t.startswith('<link'))}
+</body></html>"""
+    with open(os.path.join(out, "index.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+    return out
+
+
+def fixture_resources(page_dir):
+    # (original URL, local path) for every subresource referenced by a fixture page
+    from bs4 import BeautifulSoup
+
+    with open(os.path.join(page_dir, "index.html"), "r", encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    found = []
+    for tag, attr in (("img", "src"), ("script", "src"), ("link", "href"), ("iframe", "src"), ("source", "src")):
+        for el in soup.find_all(tag):
+            src = el.get(attr) or ""
+            if src.startswith("/_/"):
+                host, fname = src[3:].split("/", 1)
+                found.append((f"https://{host}/{fname}", os.path.join(page_dir, "res", host, fname)))
+    return found
+
+
+# === Local fixture server (counts bytes per resource type) ===
+def start_server(fixtures_dir, latency_ms):
+    log, lock = [], threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            parts = self.path.lstrip("/").split("/")
+            if parts[0] == "_":
+                # /_/<host>/<file> is shared by all pages; look it up in whichever fixture has it
+                rel = os.path.join("res", *parts[1:])
+                candidates = [os.path.join(fixtures_dir, p, rel) for p in os.listdir(fixtures_dir)]
+                path = next((c for c in candidates if os.path.exists(c)), None)
+            else:
+                path = os.path.join(fixtures_dir, parts[0], "index.html")
+            if not path or not os.path.exists(path):
+                self.send_error(404)
+                return
+            with open(path, "rb") as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                log.append((resource_type(self.path if parts[0] == "_" else "/"), len(body)))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, log, lock
+
+
+def breakdown(entries):
+    totals = {}
+    for kind, size in entries:
+        totals[kind] = totals.get(kind, 0) + size
+    return totals
+
+
+def print_row(page, profile, n_requests, totals, elapsed_ms):
+    kinds = " ".join(f"{k}={totals.get(k, 0) / 1024:7.0f}K" for k in ("html", "js", "css", "img", "font", "media", "other"))
+    elapsed = f"{elapsed_ms:8.0f} ms" if elapsed_ms is not None else "       - ms"
+    print(f"{page:<16} {profile:<5} {n_requests:>4} req  {sum(totals.values()) / 1024:8.0f} KB  {elapsed}   {kinds}")
+
+
+# === Runs ===
+def run_static(pages, fixtures_dir):
+    for page in pages:
+        page_dir = os.path.join(fixtures_dir, page)
+        html_size = os.path.getsize(os.path.join(page_dir, "index.html"))
+        resources = [(url, path) for url, path in fixture_resources(page_dir) if os.path.exists(path)]
+        for profile in ("off", "on"):
+            fetched = [(resource_type(url), os.path.getsize(path)) for url, path in resources
+                       if profile == "off" or not is_blocked(url)]
+            print_row(page, profile, len(fetched) + 1, breakdown(fetched + [("html", html_size)]), None)
+
+
+def run_browser(pages, fixtures_dir, latency_ms, repeats):
+    from selenium import webdriver
+
+    server, log, lock = start_server(fixtures_dir, latency_ms)
+    base = f"http://127.0.0.1:{server.server_port}"
+    for page in pages:
+        for enabled in (False, True):
+            browser_profile.FAST_PROFILE = enabled
+            options = browser_profile.apply_fast_profile(webdriver.ChromeOptions())
+            options.add_argument("--headless=new")
+            driver = webdriver.Chrome(options=options)
+            # Host patterns still match: the original host is kept in the local path
+            browser_profile.enable_resource_blocking(driver)
+            try:
+                times, entries = [], []
+                for _ in range(repeats):
+                    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                    with lock:
+                        log.clear()
+                    t0 = time.perf_counter()
+                    driver.get(f"{base}/{page}/")
+                    browser_profile.wait_for_any(driver, TITLE_LOCATORS, timeout=30)
+                    times.append((time.perf_counter() - t0) * 1000)
+                    time.sleep(0.5)  # let in-flight requests land in the log
+                    with lock:
+                        entries = list(log)
+                times.sort()
+                print_row(page, "on" if enabled else "off", len(entries), breakdown(entries), times[len(times) // 2])
+            finally:
+                driver.quit()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Page bytes and load time with the fast browser profile on/off.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Save a live page and its subresources as a fixture")
+    rec.add_argument("url")
+    rec.add_argument("name")
+
+    run = sub.add_parser("run", help="Measure every fixture page with the profile off and on")
+    run.add_argument("--static", action="store_true", help="No browser: bytes each profile would request")
+    run.add_argument("--latency-ms", type=float, default=40, help="Simulated per-request server latency")
+    run.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.url, args.name, args.fixtures)
+    else:
+        fixtures_dir = args.fixtures
+        if not os.path.isdir(fixtures_dir) or not os.listdir(fixtures_dir):
+            fixtures_dir = tempfile.mkdtemp(prefix="page_fixtures_")
+            synthesize("synthetic_pdp", fixtures_dir)
+            print(f"⚠️ No recorded fixtures in {args.fixtures}, using a synthetic product page ({fixtures_dir})")
+        pages = sorted(p for p in os.listdir(fixtures_dir) if os.path.isdir(os.path.join(fixtures_dir, p)))
+        if args.static:
+            run_static(pages, fixtures_dir)
+        else:
+            run_browser(pages, fixtures_dir, args.latency_ms, args.repeats)
@@ -0,0 +1,87 @@
+import argparse
+import random
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawl_engine import CrawlEngine, HostRateLimiter, WorkQueue
+
+# Local mock-server check for the crawl engine: throughput should grow with
+# the number of workers until it hits the per-host rate cap.
+
+
+class Blocked(Exception):
+    pass
+
+
+def start_mock_server(latency, block_rate, items_per_page=48):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if random.random() < block_rate:
+                body = "<html><title>Robot Check</title></html>"
+            else:
+                seed = abs(hash(self.path)) % 10**6
+                cards = "".join(f'<div data-asin="B{seed:06d}{i:03d}"></div>' for i in range(items_per_page))
+                body = f"<html><div class='s-main-slot'>{cards}</div></html>"
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(url):
+    html = urllib.request.urlopen(url, timeout=30).read().decode()
+    if "robot check" in html.lower():
+        raise Blocked(url)
+    return [{"asin": a} for a in re.findall(r'data-asin="([A-Z0-9]+)"', html)]
+
+
+def run(base_url, workers, pages, rate_per_hour, burst):
+    seen = set()
+
+    def on_result(url, outcome, products):
+        fresh = {p["asin"] for p in products} - seen
+        seen.update(fresh)
+        return len(fresh)
+
+    work = WorkQueue(f"{base_url}/s?k=term{i % 50}&page={i // 50 + 1}" for i in range(pages))
+    engine = CrawlEngine(fetch, work, HostRateLimiter(rate_per_hour, burst), workers, on_result, (Blocked,))
+    engine.start()
+    work.join()
+    engine.stop()
+    return engine.stats.summary()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Crawl engine throughput vs worker count against a local mock server.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.25, help="Mock page latency in seconds")
+    parser.add_argument("--block-rate", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=72000, help="Rate cap, pages/hour/host (default 20/s)")
+    parser.add_argument("--burst", type=int, default=5)
+    args = parser.parse_args()
+
+    server = start_mock_server(args.latency, args.block_rate)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    print(f"🧪 Mock server at {base_url}: latency {args.latency}s, block rate {args.block_rate:.0%}, cap {args.rate:g} pages/h")
+
+    for workers in args.workers:
+        s = run(base_url, workers, args.pages, args.rate, args.burst)
+        print(
+            f"workers={workers:<3} pages/h={s['pages_per_hour']:9.0f}  new ASINs/h={s['new_asins_per_hour']:10.0f}"
+            f"  block rate={s['block_rate']:.1%}  (cap {args.rate:g}/h)"
+        )
+    server.shutdown()
@@ -0,0 +1,112 @@
+import argparse
+import time
+
+import numpy as np
+
+from emissions import (MATERIAL_INTENSITY_DEFAULT, estimate_transport, load_material_intensity, material_carbon,
+                       ml_carbon, trees_to_offset)
+
+# Per-product Python (the code api.py and app.py used to run per request)
+# against the vectorized emissions engine on the same columns, at 1, 1k and
+# 1M rows. Also counts rows where the two disagree.
+
+MATERIALS = ["Plastic", "Steel", "Aluminum", "Paper", "Glass", "Bamboo", "Other", "Cardboard"]
+RECYCLABILITY = ["Low", "Medium", "High", None]
+OVERRIDES = [None, None, "Air", "Ship", "Truck", "Rail"]
+
+
+# === Scalar reference (as it was in api.py / app.py) ===
+def determine_transport_mode(distance_km):
+    if distance_km < 1500:
+        return "Truck", 0.12
+    elif distance_km < 6000:
+        return "Ship", 0.02
+    else:
+        return "Air", 0.5
+
+
+def calculate_eco_score(carbon_kg, recyclability, distance_km, weight_kg):
+    carbon_score = max(0, 10 - carbon_kg * 5)
+    weight_score = max(0, 10 - weight_kg * 2)
+    distance_score = max(0, 10 - distance_km / 1000)
+    recycle_score = {"Low": 2, "Medium": 6, "High": 10}.get(recyclability or "Medium", 5)
+    total_score = (carbon_score + weight_score + distance_score + recycle_score) / 4
+    if total_score >= 9:
+        return "A+"
+    elif total_score >= 8:
+        return "A"
+    elif total_score >= 6.5:
+        return "B"
+    elif total_score >= 5:
+        return "C"
+    elif total_score >= 3.5:
+        return "D"
+    else:
+        return "F"
+
+
+def scalar_estimate(weight, distance, recyclability, include_packaging, override_mode, material, intensity):
+    final_weight = weight * 1.2 if include_packaging else weight
+    transport_mode, emission_factor = determine_transport_mode(distance)
+    modes = {"Air": 0.5, "Ship": 0.03, "Truck": 0.15}
+    if override_mode in modes:
+        transport_mode, emission_factor = override_mode, modes[override_mode]
+    carbon_kg = round(final_weight * emission_factor * (distance / 1000), 2)
+    eco_score = calculate_eco_score(carbon_kg, recyclability, round(distance, 1), final_weight)
+    defra_kg = round(weight * intensity.get(material, MATERIAL_INTENSITY_DEFAULT), 2)
+    return carbon_kg, eco_score, transport_mode, defra_kg, round(weight * 1.2, 2), max(1, round(defra_kg / 15))
+
+
+def vector_estimate(weight, distance, recyclability, include_packaging, override_mode, material, intensity):
+    est = estimate_transport(weight, distance, recyclability, include_packaging, override_mode)
+    defra_kg = material_carbon(weight, material, intensity)
+    return est["carbon_kg"], est["eco_score"], est["transport_mode"], defra_kg, ml_carbon(weight), trees_to_offset(defra_kg)
+
+
+def make_columns(n, rng):
+    return (
+        np.round(rng.uniform(0.05, 25.0, n), 3),
+        rng.uniform(5, 20000, n),
+        np.array(RECYCLABILITY, dtype=object)[rng.integers(0, len(RECYCLABILITY), n)],
+        rng.random(n) < 0.7,
+        np.array(OVERRIDES, dtype=object)[rng.integers(0, len(OVERRIDES), n)],
+        np.array(MATERIALS, dtype=object)[rng.integers(0, len(MATERIALS), n)],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Scalar vs vectorized emissions maths.")
+    parser.add_argument("--sizes", default="1,1000,1000000")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetitions for the small sizes")
+    args = parser.parse_args()
+
+    intensity = load_material_intensity()
+    rng = np.random.default_rng(0)
+
+    print(f"{'rows':>9} | {'per-product':>12} | {'vectorized':>12} | {'speedup':>8} | mismatches")
+    for n in (int(s) for s in args.sizes.split(",")):
+        cols = make_columns(n, rng)
+        rows = list(zip(*(c.tolist() for c in cols)))
+        repeat = max(1, args.repeat // max(1, n // 100))
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            scalar = [scalar_estimate(*row, intensity) for row in rows]
+        t_scalar = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            vector = vector_estimate(*cols, intensity)
+        t_vector = (time.perf_counter() - start) / repeat
+
+        mismatches = 0
+        for i, expected in enumerate(scalar):
+            got = tuple(v[i] for v in vector)
+            if any(e != g and not (isinstance(e, float) and abs(e - g) < 1e-9) for e, g in zip(expected, got)):
+                mismatches += 1
+
+        print(f"{n:>9} | {t_scalar * 1000:>9.3f} ms | {t_vector * 1000:>9.3f} ms | {t_scalar / t_vector:>7.1f}x | {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
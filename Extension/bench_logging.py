@@ -0,0 +1,104 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+import applog
+
+# Per-request logging overhead: the old print()/Log path against applog at INFO
+# and DEBUG. One "request" replays the log calls a product scrape plus
+# /estimate_emissions makes: ~20 per-request lines and one event per search card.
+# Output goes to a line-buffered /dev/null, so a print costs a write per line,
+# like on a terminal. Caller time is what the request pays; drain time is the
+# background writer catching up.
+
+PRODUCT = {"title": "Anker USB C Charger 65W", "asin": "B0ABCDEF12", "distance_origin_to_uk": 9120.4}
+CARDS_PER_REQUEST = 48
+
+
+def legacy_request(i):
+    print(f"\033[94mℹ️ 🌍 Request received: https://www.amazon.co.uk/dp/{PRODUCT['asin']}\033[0m")
+    print("🧪 Inside scraper function, fallback mode is:", False)
+    print("🚀 Launching undetected ChromeDriver...")
+    print("🌐 Navigating to page:", f"https://www.amazon.co.uk/dp/{PRODUCT['asin']}")
+    print("🧾 Raw brand text:", "Visit the Anker Store")
+    for n in range(CARDS_PER_REQUEST):
+        print("🛒", f"{PRODUCT['title']} #{n}")
+    print("📍 Extracted origin from blob: made in china → China")
+    print("🛡️ Preserving explicit product origin: China (source: blob_match)")
+    print("🔍 Starting to parse text blobs for product details...")
+    print(f"⚖️ Weight: {0.12} kg | 📦 Dimensions: {'10 x 5 x 3 cm'} | 🧬 Material: {'Plastic'}")
+    print("🛡️ Protected origin: China (source: blob_match)")
+    print(f"🌍 Returning distances: {PRODUCT['distance_origin_to_uk']} km from origin, 100 km from UK hub")
+    print("✅ Scraped product:", PRODUCT["title"])
+    print("🎯 Returning final origin: China (source: blob_match)")
+    print(f"✅ Final product weight used: {0.126} kg")
+    print("✅ Logged to real_scraped_dataset.csv")
+    print("🎯 Returning final origin: China")
+    print({"distance_from_origin_km": PRODUCT["distance_origin_to_uk"], "distance_from_uk_hub_km": 100})
+
+
+def applog_request(i, log, card_log):
+    url = f"https://www.amazon.co.uk/dp/{PRODUCT['asin']}"
+    log.info("🌍 Request received: %s", url)
+    log.debug("🧪 Inside scraper function, fallback mode is: %s", False)
+    log.debug("🚀 Launching undetected ChromeDriver...")
+    log.info("🌐 Navigating to page: %s", url)
+    log.debug("🧾 Raw brand text: %s", "Visit the Anker Store")
+    for n in range(CARDS_PER_REQUEST):
+        card_log.debug("🛒 %s #%s", PRODUCT["title"], n)
+    log.debug("📍 Extracted origin from blob: %s → %s", "made in china", "China")
+    log.debug("🛡️ Preserving explicit product origin: %s (source: %s)", "China", "blob_match")
+    log.debug("🔍 Starting to parse text blobs for product details...")
+    log.debug("⚖️ Weight: %s kg | 📦 Dimensions: %s | 🧬 Material: %s", 0.12, "10 x 5 x 3 cm", "Plastic")
+    log.debug("🛡️ Protected origin: %s (source: %s)", "China", "blob_match")
+    log.debug("🌍 Returning distances: %s km from origin, %s km from UK hub", PRODUCT["distance_origin_to_uk"], 100)
+    log.info("✅ Scraped product: %s", PRODUCT["title"])
+    log.debug("🎯 Returning final origin: %s (source: %s)", "China", "blob_match")
+    log.debug("✅ Final product weight used: %s kg", 0.126)
+    log.debug("✅ Logged to real_scraped_dataset.csv")
+    log.debug("🎯 Returning final origin: %s", "China")
+    log.debug("📏 Distances: %s km from origin, %s km from UK hub", PRODUCT["distance_origin_to_uk"], 100)
+
+
+def measure(name, fn, requests, drain=None):
+    dropped = applog.dropped()
+    t0 = time.perf_counter()
+    for i in range(requests):
+        fn(i)
+    caller = time.perf_counter() - t0
+    if drain:
+        drain()
+    total = time.perf_counter() - t0
+    print(f"{name:<22} {caller / requests * 1e6:8.1f} µs/request in the caller   "
+          f"{total / requests * 1e6:8.1f} µs/request incl. drain   {applog.dropped() - dropped} dropped",
+          file=sys.__stdout__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Per-request logging overhead: print vs applog at INFO/DEBUG.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--sample-rate", type=float, default=applog.LOG_SAMPLE_RATE)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w", buffering=1, encoding="utf-8")
+    sys.stdout = devnull
+    sys.stderr = devnull
+    applog.configure()
+    log = applog.get_logger("bench")
+    card_log = applog.SampledLogger(log, args.sample_rate)
+
+    def drain():
+        applog._handler.queue.join()
+
+    print(f"🧪 {args.requests} requests, {CARDS_PER_REQUEST} card events each, "
+          f"card sample rate {args.sample_rate:g}", file=sys.__stdout__)
+    measure("print / Log (before)", legacy_request, args.requests)
+    for level in ("WARNING", "INFO", "DEBUG"):
+        applog.configure(level)
+        measure(f"applog {level}", lambda i: applog_request(i, log, card_log), args.requests, drain)
+    applog.configure("DEBUG")
+    card_log.rate = 1.0
+    measure("applog DEBUG, no sample", lambda i: applog_request(i, log, card_log), args.requests, drain)
+    logging.shutdown()
@@ -0,0 +1,172 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from mock_amazon import fake_asin, start_mock_server
+
+# Offline scraper benchmarks against mock_amazon.py: products per minute,
+# browser RSS and how failures (503s, CAPTCHAs) are handled, for the product
+# page scraper, the search page scraper and the crawl engine. Needs Chrome;
+# runs in a scratch directory so the scrapers' side files don't touch the repo.
+
+
+# === Browser memory ===
+def _children():
+    # pid -> ppid for every process we can see
+    parents = {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                stat = f.read()
+            parents[int(pid)] = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return parents
+
+
+def descendants_rss_mb(root_pid):
+    parents = _children()
+    tree, frontier = set(), [root_pid]
+    while frontier:
+        pid = frontier.pop()
+        for child, parent in parents.items():
+            if parent == pid and child not in tree:
+                tree.add(child)
+                frontier.append(child)
+    total_kb = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class RssSampler:
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.samples.append(descendants_rss_mb(os.getpid()))
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+
+    def summary(self):
+        if not self.samples:
+            return "browser RSS n/a"
+        return f"browser RSS peak {max(self.samples):.0f} MB, mean {sum(self.samples) / len(self.samples):.0f} MB"
+
+
+# === Suites ===
+def report(name, elapsed, products, failures, mock, rss):
+    per_min = products / elapsed * 60 if elapsed else 0.0
+    print(
+        f"{name:<8} {products:>5} products in {elapsed:7.1f}s = {per_min:7.1f}/min  failures={failures}  "
+        f"served: {mock.stats['errors']} x 503, {mock.stats['captchas']} captchas  |  {rss.summary()}"
+    )
+
+
+def bench_product(scraper, mock, n):
+    from scrape_amazon_titles import AMAZON_BASE_URL
+    asins = [fake_asin("bench", 1, i) for i in range(n)]
+    ok = failures = 0
+    with RssSampler() as rss:
+        t0 = time.perf_counter()
+        for asin in asins:
+            try:
+                product = scraper.scrape_amazon_product_page(f"{AMAZON_BASE_URL}/dp/{asin}")
+            except Exception as e:
+                print(f"⚠️ {asin}: {e}")
+                product = None
+            if product:
+                ok += 1
+            else:
+                failures += 1
+        elapsed = time.perf_counter() - t0
+    report("product", elapsed, ok, failures, mock, rss)
+
+
+def bench_search(scraper, mock, pages):
+    from scrape_amazon_titles import AMAZON_BASE_URL
+    products = failures = 0
+    with RssSampler() as rss:
+        t0 = time.perf_counter()
+        for page in range(1, pages + 1):
+            try:
+                found = scraper.scrape_amazon_titles(f"{AMAZON_BASE_URL}/s?k=bench&page={page}", raise_on_block=True)
+                products += len(found)
+            except scraper.ScrapeBlocked:
+                failures += 1
+        elapsed = time.perf_counter() - t0
+    report("search", elapsed, products, failures, mock, rss)
+
+
+def bench_crawl(scraper, mock, pages, workers):
+    from crawl_engine import CrawlEngine, HostRateLimiter, WorkQueue
+    from scrape_amazon_titles import AMAZON_BASE_URL
+
+    work = WorkQueue(f"{AMAZON_BASE_URL}/s?k=term{i % 10}&page={i // 10 + 1}" for i in range(pages))
+    engine = CrawlEngine(
+        lambda url: scraper.scrape_amazon_titles(url, raise_on_block=True), work,
+        HostRateLimiter(3600 * 100, workers), workers, None, (scraper.ScrapeBlocked,),
+    )
+    with RssSampler() as rss:
+        t0 = time.perf_counter()
+        engine.start()
+        work.join()
+        engine.stop()
+        elapsed = time.perf_counter() - t0
+    s = engine.stats.summary()
+    report(f"crawl x{workers}", elapsed, engine.stats.products, s["blocked"] + s["failed"], mock, rss)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Offline scraper benchmarks against the mock Amazon server.")
+    parser.add_argument("--suite", nargs="+", choices=("product", "search", "crawl"), default=["product", "search", "crawl"])
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--captcha-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    mock, server, base_url = start_mock_server(args.latency_ms, args.error_rate, args.captcha_rate, seed=0)
+    os.environ["AMAZON_BASE_URL"] = base_url
+    os.environ["SCRAPER_INTERACTIVE_CAPTCHA"] = "0"
+
+    # The scrapers write side files (brand_locations.json, cleaned_products.json, ...) to the cwd
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="scraper_bench_"))
+    import scrape_amazon_titles as scraper
+
+    print(f"🧪 Mock Amazon at {base_url}: latency {args.latency_ms:g} ms, "
+          f"503 rate {args.error_rate:.0%}, captcha rate {args.captcha_rate:.0%}")
+    for suite in args.suite:
+        mock.stats.update({k: 0 for k in mock.stats})
+        if suite == "product":
+            bench_product(scraper, mock, args.products)
+        elif suite == "search":
+            bench_search(scraper, mock, args.pages)
+        else:
+            bench_crawl(scraper, mock, args.pages, args.workers)
+    server.shutdown()
@@ -0,0 +1,156 @@
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from extractors import extract_search_cards_from_html
+from scrape_amazon_titles import (
+    SEARCH_BRAND_SELECTOR, SEARCH_CARD_SELECTOR, SEARCH_LINK_SELECTOR, SEARCH_TITLE_SELECTORS,
+    extract_search_cards,
+)
+
+# WebDriver round-trips and wall time to pull the cards off one search page:
+# the old per-card find_element/get_attribute pattern vs one execute_script.
+# Without --live it runs against a generated 50-card page through a fake
+# driver that charges --rpc-ms per WebDriver command (a local chromedriver
+# round trip is typically 1-5 ms, remote/grid setups far more).
+
+
+def fixture_page(n_cards=50):
+    cards = []
+    for i in range(n_cards):
+        brand = ["Anker", "Sony", "Generic", ""][i % 4]
+        cards.append(f"""
+        <div data-asin="B0{i:08d}" data-brand="{brand}" aria-label="Product {i}">
+          <h5 class="s-line-clamp-1"><span class="a-size-base">{brand}</span></h5>
+          <a class="a-link-normal s-no-outline" href="/dp/B0{i:08d}"><img src="x.jpg"></a>
+          <h2><span class="a-size-medium a-color-base a-text-normal">{brand} USB C Charger {i}, 65W, 120g</span></h2>
+          <span class="a-price">£{10 + i}.99</span>
+        </div>""")
+    return f"<html><body><div class='s-main-slot'>{''.join(cards)}</div></body></html>"
+
+
+# === Fake WebDriver over a static page (counts commands) ===
+class FakeElement:
+    def __init__(self, driver, node):
+        self.driver = driver
+        self.node = node
+
+    def get_attribute(self, name):
+        self.driver.rpc()
+        if name == "href" and self.node.get("href"):
+            return "https://www.amazon.co.uk" + self.node["href"]
+        return self.node.get(name)
+
+    @property
+    def text(self):
+        self.driver.rpc()
+        return self.node.get_text(" ", strip=True)
+
+    def find_element(self, by, selector):
+        self.driver.rpc()
+        found = self.node.select_one(selector)
+        if found is None:
+            raise LookupError(selector)
+        return FakeElement(self.driver, found)
+
+
+class FakeDriver:
+    def __init__(self, html, rpc_ms):
+        self.page_source = html
+        self.soup = BeautifulSoup(html, "html.parser")
+        self.rpc_s = rpc_ms / 1000
+        self.rpcs = 0
+
+    def rpc(self):
+        self.rpcs += 1
+        if self.rpc_s:
+            time.sleep(self.rpc_s)
+
+    def find_elements(self, by, selector):
+        self.rpc()
+        return [FakeElement(self, n) for n in self.soup.select(selector)]
+
+    def execute_script(self, script, *args):
+        # Stands in for the in-page JS: same fields, one command
+        self.rpc()
+        cards, tech_details = extract_search_cards_from_html(self.page_source)
+        return {"cards": cards, "tech_details": tech_details}
+
+
+# === Live driver: count commands through the real command executor ===
+def counting(driver):
+    original = driver.execute
+    driver.rpcs = 0
+
+    def execute(command, params=None):
+        driver.rpcs += 1
+        return original(command, params)
+
+    driver.execute = execute
+    return driver
+
+
+# === The two extraction strategies ===
+def extract_per_card(driver):
+    # The pre-execute_script access pattern of scrape_amazon_titles
+    cards = []
+    for el in driver.find_elements("css selector", SEARCH_CARD_SELECTOR):
+        asin = el.get_attribute("data-asin")
+        if not asin:
+            continue
+        try:
+            href = el.find_element("css selector", SEARCH_LINK_SELECTOR).get_attribute("href")
+        except Exception:
+            continue
+        title = None
+        for sel in SEARCH_TITLE_SELECTORS:
+            try:
+                title = el.find_element("css selector", sel).text.strip()
+                if title:
+                    break
+            except Exception:
+                continue
+        brand_attr = el.get_attribute("data-brand")
+        try:
+            brand_text = el.find_element("css selector", SEARCH_BRAND_SELECTOR).text.strip()
+        except Exception:
+            brand_text = None
+        aria_label = el.get_attribute("aria-label")
+        text = el.text
+        tech = [td.text for td in driver.find_elements("css selector", "#prodDetails td")]
+        cards.append((asin, href, title, brand_attr, brand_text, aria_label, text, tech))
+    return cards
+
+
+def measure(name, fn, driver):
+    driver.rpcs = 0
+    t0 = time.perf_counter()
+    result = fn(driver)
+    elapsed = time.perf_counter() - t0
+    n = len(result[0]) if isinstance(result, tuple) else len(result)
+    print(f"{name:<16} {n:>4} cards  {driver.rpcs:>5} RPCs  {elapsed * 1000:9.1f} ms/page")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Search-card extraction: RPCs and time per page.")
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--rpc-ms", type=float, default=2.0, help="Simulated cost of one WebDriver command")
+    parser.add_argument("--live", metavar="URL", help="Measure against a real Chrome on this search URL")
+    args = parser.parse_args()
+
+    if args.live:
+        import undetected_chromedriver as uc
+        driver = counting(uc.Chrome(options=uc.ChromeOptions()))
+        try:
+            driver.get(args.live)
+            time.sleep(3)
+            measure("per-card", extract_per_card, driver)
+            measure("execute_script", extract_search_cards, driver)
+        finally:
+            driver.quit()
+    else:
+        driver = FakeDriver(fixture_page(args.cards), args.rpc_ms)
+        print(f"🧪 {args.cards}-card fixture page, {args.rpc_ms:g} ms per WebDriver command")
+        measure("per-card", extract_per_card, driver)
+        measure("execute_script", extract_search_cards, driver)
@@ -0,0 +1,97 @@
+import argparse
+import random
+
+from term_selector import TermSelector
+
+# Simulated search space: each term has a ranked result list of varying depth
+# that overlaps with a shared pool of popular products, so some terms keep
+# returning ASINs we already have. Compares new products per page load for
+# the old random (term, page) choice against the bandit strategies.
+
+ITEMS_PER_PAGE = 30
+
+
+def make_world(rng, n_terms, max_pages, popular_size=600):
+    popular = [f"P{i:06d}" for i in range(popular_size)]
+    terms = {}
+    next_id = 0
+    for t in range(n_terms):
+        depth = int(rng.uniform(1, max_pages) * ITEMS_PER_PAGE)  # distinct results before Amazon starts repeating
+        overlap = rng.uniform(0.0, 0.95)  # share of results drawn from the popular pool
+        results = []
+        for _ in range(depth):
+            if rng.random() < overlap:
+                results.append(rng.choice(popular))
+            else:
+                results.append(f"U{next_id:07d}")
+                next_id += 1
+        terms[f"term{t:03d}"] = {"results": results, "block_rate": rng.uniform(0.0, 0.15)}
+    return terms, popular
+
+
+def load_page(rng, world, popular, term, page):
+    info = world[term]
+    if rng.random() < info["block_rate"]:
+        return None  # blocked
+    start = (page - 1) * ITEMS_PER_PAGE
+    items = info["results"][start:start + ITEMS_PER_PAGE]
+    if len(items) < ITEMS_PER_PAGE:
+        items = items + rng.sample(popular, ITEMS_PER_PAGE - len(items))
+    return items
+
+
+def run_random(seed, world, popular, budget, max_pages):
+    rng = random.Random(seed)
+    candidates = [(t, p) for t in world for p in range(1, max_pages + 1)]
+    rng.shuffle(candidates)
+    seen, new_total = set(), 0
+    for term, page in candidates[:budget]:
+        items = load_page(rng, world, popular, term, page)
+        if items:
+            fresh = set(items) - seen
+            seen |= fresh
+            new_total += len(fresh)
+    return new_total / budget
+
+
+def run_bandit(seed, world, popular, budget, max_pages, strategy):
+    rng = random.Random(seed)
+    selector = TermSelector(path=None, strategy=strategy, max_pages=max_pages, seed=seed)
+    terms = list(world)
+    seen, new_total = set(), 0
+    for _ in range(budget):
+        term = selector.pick(terms)
+        if term is None:
+            break
+        page = selector.next_page(term)
+        items = load_page(rng, world, popular, term, page)
+        if items is None:
+            selector.record(term, page, "blocked")
+            continue
+        fresh = set(items) - seen
+        seen |= fresh
+        new_total += len(fresh)
+        selector.record(term, page, "ok", len(fresh), len(items))
+    return new_total / budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🎰 Simulated new-ASIN yield: random vs bandit term selection.")
+    parser.add_argument("--terms", type=int, default=60)
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=400, help="Page loads per simulated run")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {"random": [], "ucb": [], "thompson": []}
+    for run in range(args.runs):
+        world, popular = make_world(random.Random(run), args.terms, args.max_pages)
+        results["random"].append(run_random(run, world, popular, args.budget, args.max_pages))
+        for strategy in ("ucb", "thompson"):
+            results[strategy].append(run_bandit(run, world, popular, args.budget, args.max_pages, strategy))
+
+    print(f"🧪 {args.runs} runs, {args.terms} terms x {args.max_pages} pages, budget {args.budget} page loads")
+    baseline = sum(results["random"]) / args.runs
+    for name, values in results.items():
+        mean = sum(values) / len(values)
+        print(f"{name:<9} new products/page load = {mean:6.2f}  ({mean / baseline:.2f}x random)")
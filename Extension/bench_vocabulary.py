@@ -0,0 +1,190 @@
+import argparse
+import random
+import sys
+import time
+
+from vocabulary import DEFAULTS, _resolve, canonical
+
+# Throughput of the compiled, memoized vocabulary against the per-call
+# keyword scans it replaced (app.py's normalize_feature + fuzzy_match_*,
+# extractors.fuzzy_normalize_origin), on realistic raw values. Also checks
+# every alias in ALIAS_CASES; exits 1 if any resolves wrongly.
+
+# (field, raw input, expected canonical)
+ALIAS_CASES = [
+    ("material", "Aluminium", "Aluminum"),
+    ("material", "aluminum alloy", "Aluminum"),
+    ("material", "ALUMINIUM", "Aluminum"),
+    ("material", "Stainless Steel", "Steel"),
+    ("material", "Polypropylene (PP)", "Plastic"),
+    ("material", "plastics", "Plastic"),
+    ("material", "Borosilicate Glass", "Glass"),
+    ("material", "Corrugated board", "Cardboard"),
+    ("material", "papers", "Paper"),
+    ("material", "Bamboo", "Bamboo"),
+    ("material", "Plastic and glass", "Plastic"),
+    ("material", "Rosewood", "Rosewood"),
+    ("material", "unknown", "Other"),
+    ("material", "", "Other"),
+    ("material", None, "Other"),
+    ("origin", "UK", "UK"),
+    ("origin", "Uk", "UK"),
+    ("origin", "uk", "UK"),
+    ("origin", "United Kingdom", "UK"),
+    ("origin", "England", "UK"),
+    ("origin", "Made in Great Britain", "UK"),
+    ("origin", "Northern Ireland", "UK"),
+    ("origin", "USA", "USA"),
+    ("origin", "Usa", "USA"),
+    ("origin", "U.S.", "USA"),
+    ("origin", "United States of America", "USA"),
+    ("origin", "us", "USA"),
+    ("origin", "Australia", "Australia"),
+    ("origin", "Russia", "Russia"),
+    ("origin", "Ukraine", "Ukraine"),
+    ("origin", "PRC", "China"),
+    ("origin", "china, shenzhen", "China"),
+    ("origin", "Holland", "Netherlands"),
+    ("origin", "Eire", "Ireland"),
+    ("origin", "Republic of Korea", "South Korea"),
+    # not the USA / South Korea: no bare "america" or "korea" alias
+    ("origin", "South America", "South America"),
+    ("origin", "Latin America", "Latin America"),
+    ("origin", "Made in North Korea", "Made In North Korea"),
+    ("origin", "GERMANY", "Germany"),
+    ("origin", "Not specified", "Other"),
+    ("origin", "Other", "Other"),
+    ("transport", "Truck", "Land"),
+    ("transport", "road", "Land"),
+    ("transport", "land", "Land"),
+    ("transport", "Air freight", "Air"),
+    ("transport", "SEA", "Ship"),
+    ("transport", "ship", "Ship"),
+    ("recyclability", "high", "High"),
+    ("recyclability", "Fully recyclable", "High"),
+    ("recyclability", "partially recyclable", "Medium"),
+    ("recyclability", "Non-recyclable", "Low"),
+    ("recyclability", "not recyclable", "Low"),
+    ("recyclability", "LOW", "Low"),
+    ("recyclability", "Unknown", "Medium"),
+]
+
+
+# === Old normalizers (as they were) ===
+def normalize_feature(value, default):
+    clean = str(value or default).strip().title()
+    return default if clean.lower() == "unknown" else clean
+
+
+def fuzzy_match_material(material):
+    material_keywords = {
+        "Plastic": ["plastic", "plastics"],
+        "Glass": ["glass"],
+        "Aluminium": ["aluminium", "aluminum"],
+        "Steel": ["steel"],
+        "Paper": ["paper", "papers"],
+        "Cardboard": ["cardboard", "corrugated"],
+    }
+    material_lower = material.lower()
+    for clean, keywords in material_keywords.items():
+        if any(keyword in material_lower for keyword in keywords):
+            return clean
+    return material
+
+
+def fuzzy_normalize_origin(raw_origin):
+    if not raw_origin:
+        return "Unknown"
+    origin = raw_origin.strip().lower()
+    fuzzy_map = {
+        "uk": ["united kingdom", "uk", "england", "scotland", "wales"],
+        "usa": ["united states", "united states of america", "us", "usa"],
+        "china": ["china", "prc"],
+        "germany": ["germany"],
+        "france": ["france"],
+        "italy": ["italy"],
+        "japan": ["japan"],
+        "ireland": ["ireland", "eire"],
+        "netherlands": ["netherlands", "holland"],
+        "canada": ["canada"],
+        "switzerland": ["switzerland"],
+        "australia": ["australia"],
+        "sweden": ["sweden"],
+        "finland": ["finland"],
+        "mexico": ["mexico"],
+    }
+    for country, keywords in fuzzy_map.items():
+        if any(keyword in origin for keyword in keywords):
+            return country.title()
+    return raw_origin.title()
+
+
+def legacy(field, value):
+    value = normalize_feature(value, DEFAULTS[field])
+    if field == "material":
+        return fuzzy_match_material(value)
+    if field == "origin":
+        return fuzzy_normalize_origin(value)
+    return value
+
+
+def make_inputs(n, distinct, seed=0):
+    # `distinct` raw spellings (case/spacing variants of the alias table), drawn n times
+    rng = random.Random(seed)
+    pool = [(field, raw) for field, raw, _ in ALIAS_CASES if raw]
+    variants = []
+    while len(variants) < distinct:
+        field, raw = rng.choice(pool)
+        variants.append((field, rng.choice([raw, raw.upper(), raw.lower(), f" {raw} ", raw.title()]) + " " * rng.randint(0, 3)))
+    return [rng.choice(variants) for _ in range(n)]
+
+
+def check_aliases():
+    failures = [(field, raw, expected, canonical(field, raw, DEFAULTS[field]))
+                for field, raw, expected in ALIAS_CASES
+                if canonical(field, raw, DEFAULTS[field]) != expected]
+    for field, raw, expected, got in failures:
+        print(f"❌ {field}: {raw!r} -> {got!r}, expected {expected!r}")
+    print(f"{'✅' if not failures else '❌'} {len(ALIAS_CASES) - len(failures)}/{len(ALIAS_CASES)} aliases resolve as expected")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Vocabulary normalizer throughput + alias check.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--distinct", type=int, default=500, help="Distinct raw spellings in the stream")
+    args = parser.parse_args()
+
+    ok = check_aliases()
+    inputs = make_inputs(args.rows, args.distinct)
+
+    start = time.perf_counter()
+    for field, raw in inputs:
+        legacy(field, raw)
+    t_legacy = time.perf_counter() - start
+
+    _resolve.cache_clear()
+    start = time.perf_counter()
+    for field, raw in inputs:
+        canonical(field, raw, DEFAULTS[field])
+    t_memo = time.perf_counter() - start
+
+    # Compiled matcher alone: every value a memo miss
+    cold = [(field, f"{raw} #{i}") for i, (field, raw) in enumerate(inputs[:50_000])]
+    _resolve.cache_clear()
+    start = time.perf_counter()
+    for field, raw in cold:
+        canonical(field, raw, DEFAULTS[field])
+    t_cold = (time.perf_counter() - start) / len(cold) * len(inputs)
+    _resolve.cache_clear()
+
+    print(f"\n{len(inputs):,} values, {args.distinct} distinct spellings")
+    for name, t in [("old keyword scans", t_legacy), ("vocabulary, memo cold", t_cold), ("vocabulary, memoized", t_memo)]:
+        print(f"  {name:<22} {t * 1000:8.1f} ms  ({len(inputs) / t:>12,.0f} values/s, {t_legacy / t:5.1f}x)")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
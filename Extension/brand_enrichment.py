@@ -0,0 +1,211 @@
+import atexit
+import os
+import queue
+import re
+import threading
+import time
+import weakref
+
+from selenium.webdriver.common.by import By
+
+from applog import get_logger
+
+# === CONFIG ===
+ENRICH_WORKERS = 2  # browsers kept open for enrichment
+BATCH_SIZE = 10  # results per commit to the brand store
+FLUSH_INTERVAL_S = 30  # commit whatever is buffered at least this often
+PAGES_PER_DRIVER = 50  # recycle a worker's browser after this many pages
+
+log = get_logger("enrichment")
+_queues = weakref.WeakSet()  # live queues, reset in forked children
+
+
+def extract_origin_from_page(driver, url):
+    # "Made in ..." from the merchant info, description or feature bullets of a product page
+    driver.get(url)
+    text_blobs = []
+    for by, selector in ((By.ID, "merchant-info"), (By.ID, "productDescription")):
+        try:
+            text_blobs.append(driver.find_element(by, selector).text)
+        except Exception:
+            pass
+    try:
+        text_blobs += [b.text for b in driver.find_elements(By.CSS_SELECTOR, "#feature-bullets li")]
+    except Exception:
+        pass
+
+    for blob in text_blobs:
+        blob = blob.lower()
+        if "made in" in blob or "manufactured in" in blob:
+            match = re.search(r"(made|manufactured)\s+in\s+([a-z\s,]+)", blob)
+            if match:
+                location = match.group(2).strip().title()
+                country = location.split(",")[-1].strip()
+                city = location.split(",")[0].strip() if "," in location else "Unknown"
+                return country, city
+    return None
+
+
+class BrandEnrichmentQueue:
+    """Background brand-origin lookups so the crawl never waits on them.
+
+    submit() is non-blocking and deduplicated: each brand is looked up at
+    most once per process. A bounded pool of workers each keeps one browser
+    open across lookups, and results are handed to commit(results) in
+    batches, where results maps brand -> (country, city).
+    """
+
+    def __init__(self, make_driver, commit, workers=ENRICH_WORKERS, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL_S, lookup=extract_origin_from_page):
+        self.make_driver = make_driver
+        self.commit = commit
+        self.lookup = lookup
+        self.workers = workers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.queue = queue.Queue()
+        self.seen = set()
+        self.results = {}
+        self.lock = threading.Lock()
+        self.commit_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.stats = {"submitted": 0, "deduplicated": 0, "found": 0, "not_found": 0, "errors": 0, "commits": 0}
+        _queues.add(self)
+
+    # === Producer side ===
+    def submit(self, brand, example_url):
+        if not brand or not example_url:
+            return False
+        with self.lock:
+            if brand in self.seen:
+                self.stats["deduplicated"] += 1
+                return False
+            self.seen.add(brand)
+            self.stats["submitted"] += 1
+            if not self.threads:
+                self._start()
+        self.queue.put((brand, example_url))
+        return True
+
+    def pending(self):
+        return self.queue.unfinished_tasks
+
+    # === Workers ===
+    def _start(self):
+        self.stop_event.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"brand-enrich-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+        flusher = threading.Thread(target=self._flusher, name="brand-enrich-flush", daemon=True)
+        flusher.start()
+        self.threads.append(flusher)
+        atexit.register(self.close, False)
+
+    def _worker(self):
+        driver, pages = None, 0
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    brand, url = self.queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                try:
+                    if driver is None or pages >= PAGES_PER_DRIVER:
+                        self._quit(driver)
+                        driver, pages = self.make_driver(), 0
+                    pages += 1
+                    found = self.lookup(driver, url)
+                    self._record(brand, found)
+                except Exception as e:
+                    log.warning("⚠️ Brand enrichment failed for %s: %s", brand, e)
+                    with self.lock:
+                        self.stats["errors"] += 1
+                    self._quit(driver)  # a broken browser is replaced on the next lookup
+                    driver = None
+                finally:
+                    self.queue.task_done()
+        finally:
+            self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def _record(self, brand, found):
+        with self.lock:
+            if found:
+                log.info("🔍 Enriched: %s → %s, %s", brand, found[1], found[0])
+                self.results[brand] = found
+                self.stats["found"] += 1
+            else:
+                log.info("❌ No location found for: %s", brand)
+                self.stats["not_found"] += 1
+            full = len(self.results) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _flusher(self):
+        while not self.stop_event.wait(self.flush_interval):
+            self.flush()
+
+    # === Commit ===
+    def flush(self):
+        with self.commit_lock:
+            with self.lock:
+                batch, self.results = self.results, {}
+            if not batch:
+                return 0
+            self.commit(batch)
+            with self.lock:
+                self.stats["commits"] += 1
+            return len(batch)
+
+    def join(self, timeout=None):
+        # Waits for queued lookups to finish (tests, CLI), then commits
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks and (deadline is None or time.monotonic() < deadline):
+            time.sleep(0.1)
+        return self.flush()
+
+    def close(self, wait=True):
+        if wait:
+            self.join()
+        self.stop_event.set()
+        for t in self.threads:
+            t.join(timeout=5)
+        self.threads = []
+        self.flush()
+
+    def _reset_after_fork(self):
+        # Worker threads do not survive a fork and locks may be copied held:
+        # start the child empty, so its next submit() starts its own workers.
+        # Brands still queued in the parent are forgotten so they can be resubmitted;
+        # buffered results stay with the parent, which commits them.
+        try:
+            pending = {brand for brand, _ in self.queue.queue}
+        except Exception:
+            pending = set()
+        self.queue = queue.Queue()
+        self.seen -= pending
+        self.results = {}
+        self.lock = threading.Lock()
+        self.commit_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+
+def _reset_queues_after_fork():
+    for q in list(_queues):
+        q._reset_after_fork()
+
+
+# serve.py forks workers after import: see applog's writer for the same reset
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_queues_after_fork)
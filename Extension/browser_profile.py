@@ -0,0 +1,71 @@
+import os
+import random
+import time
+
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from applog import get_logger
+
+# === CONFIG ===
+# Fast profile: no images/fonts/media/ads, DOMContentLoaded instead of full load,
+# and waits that stop as soon as the nodes we parse exist. Opt-in (SCRAPER_FAST_PROFILE=1)
+# until its block rate has been measured against real pages.
+FAST_PROFILE = os.environ.get("SCRAPER_FAST_PROFILE", "0") == "1"
+# Simulated scrolling/hovering with random sleeps. On by default (SCRAPER_HUMAN_DELAYS=0 to skip).
+HUMAN_DELAYS = os.environ.get("SCRAPER_HUMAN_DELAYS", "1") != "0"
+
+# Patterns for CDP Network.setBlockedURLs ("*" is a wildcard). Stylesheets are kept:
+# element .text depends on CSS visibility.
+BLOCKED_URL_PATTERNS = [
+    # images, fonts, media
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.m3u8*",
+    # ads, tracking, telemetry
+    "*amazon-adsystem.com*", "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*fls-eu.amazon.*", "*fls-na.amazon.*", "*unagi*.amazon.*",
+    "*/uedata*", "*/csm/*", "*/rd/uedata*",
+]
+
+log = get_logger("browser")
+
+
+def apply_fast_profile(options):
+    # Call on ChromeOptions before the browser starts
+    if not FAST_PROFILE:
+        return options
+    options.page_load_strategy = "eager"  # return at DOMContentLoaded, not after every image/ad
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    return options
+
+
+def enable_resource_blocking(driver, patterns=None):
+    # Call on a running driver; blocked requests fail before they hit the network
+    if not FAST_PROFILE:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or BLOCKED_URL_PATTERNS})
+        return True
+    except Exception as e:
+        log.warning("⚠️ Could not enable resource blocking: %s", e)
+        return False
+
+
+def wait_for_any(driver, locators, timeout=10):
+    # One wait for the first of several locators, instead of a full timeout per locator.
+    # Returns the first locator (in the given order) that is present, or None.
+    try:
+        WebDriverWait(driver, timeout).until(EC.any_of(*(EC.presence_of_element_located(loc) for loc in locators)))
+    except Exception:
+        return None
+    for loc in locators:
+        if driver.find_elements(*loc):
+            return loc
+    return None
+
+
+def human_pause(low, high):
+    if HUMAN_DELAYS:
+        time.sleep(random.uniform(low, high))
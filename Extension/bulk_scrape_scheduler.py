@@ -1,10 +1,15 @@
+import argparse
 import time
-import random
 import json
 import os
 import csv
 from datetime import datetime
-from scrape_amazon_titles import scrape_amazon_titles, is_high_confidence, Log
+from scrape_amazon_titles import AMAZON_BASE_URL, scrape_amazon_titles, is_high_confidence, Log, ScrapeBlocked
+from crawl_engine import CrawlEngine, HostRateLimiter
+from url_frontier import UrlFrontier
+from term_selector import TermSelector
+from backup_store import BackupStore
+from urllib.parse import parse_qs, urlparse
 
 # === CONFIG ===
 priority_path = "priority_products.json"
@@ -15,8 +20,14 @@ search_terms_csv = "search_terms.csv"
 failed_urls_path = "failed_urls.txt"
 blocked_urls_path = "blocked_urls.txt"
 retry_tracker_path = "blocked_urls_retry.txt"
-pages_per_term = 2  # You can increase this later
-sleep_between_jobs = (600, 1200)  # 10–20 mins
+frontier_path = "crawl_frontier.db"
+max_pages_per_term = 20  # the term selector decides how deep each term goes
+term_stats_path = "term_stats.json"
+term_strategy = "thompson"  # or "ucb"
+workers = 2  # concurrent browsers
+requests_per_hour_per_host = 12  # token-bucket rate, replaces fixed sleeps between jobs
+burst_per_host = 2
+report_every_s = 300
 backup_every_n_loops = 5
 
 # === LOAD SEARCH TERMS ===
@@ -47,7 +58,7 @@ if os.path.exists(bulk_path):
         bulk_db = json.load(f)
 
 existing_asins = {p["asin"] for p in bulk_db if p.get("asin")}
-seen_urls = set()
+backups = BackupStore(backup_dir)
 loop_count = 0
 
 # === LOGGING ===
@@ -68,90 +79,66 @@ def maybe_add_to_priority(product, priority_db, priority_path):
     if is_high_confidence(product):
         product["confidence"] = "High"
         priority_db[asin] = product
-        with open(priority_path, "w", encoding="utf-8") as f:
-            json.dump(priority_db, f, indent=2)
         Log.success(f"🔐 Added {asin} to priority_products.json")
         return True
     return False
 
 
-failed_urls_path = "failed_urls.txt"
+# === FRONTIER ===
+def search_url(term, page):
+    return f"{AMAZON_BASE_URL}/s?k={term}&page={page}"
 
-def save_failed_url(url):
-    with open(failed_urls_path, "a", encoding="utf-8") as f:
-        f.write(url + "\n")
-        
 
-def load_failed_urls():
-    if not os.path.exists(failed_urls_path):
-        return []
-    with open(failed_urls_path, "r", encoding="utf-8") as f:
-        return list(set(line.strip() for line in f if line.strip()))
-
-def remove_url_from_failed(url):
-    if not os.path.exists(failed_urls_path):
-        return
-    with open(failed_urls_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    lines = [line for line in lines if line.strip() != url]
-    with open(failed_urls_path, "w", encoding="utf-8") as f:
-        f.writelines(lines)
-        
-def load_blocked_urls():
-    if not os.path.exists(blocked_urls_path):
-        return []
-    with open(blocked_urls_path, "r", encoding="utf-8") as f:
-        return list(set(line.strip() for line in f if line.strip()))
-
-def move_to_retry_tracker(url):
-    with open(retry_tracker_path, "a", encoding="utf-8") as f:
-        f.write(url + "\n")
-    if os.path.exists(blocked_urls_path):
-        with open(blocked_urls_path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip() and line.strip() != url]
-        with open(blocked_urls_path, "w", encoding="utf-8") as f:
-            f.writelines(line + "\n" for line in lines)
-
-
-retry_queue = load_failed_urls()
-
-# === MAIN LOOP ===
-while True:
-    retry_mode = False
-    blocked_urls = load_blocked_urls()
-    if blocked_urls and random.random() < 0.5:  # try blocked URLs sometimes
-        url = random.choice(blocked_urls)
-        log(f"⚠️ Retrying previously blocked URL: {url}")
-        retry_mode = True
-    else:
-        term = random.choice(search_terms)
-        page = random.randint(1, pages_per_term)
-        url = f"https://www.amazon.co.uk/s?k={term}&page={page}"
-    
-    # Retry logic
-    if not retry_mode and retry_queue:
-        url = retry_queue.pop()
-        log(f"♻️ Retrying failed URL: {url}")
+def parse_search_url(url):
+    query = parse_qs(urlparse(url).query)
+    term = query.get("k", [""])[0].replace(" ", "+")
+    return term, int(query.get("page", ["1"])[0])
+
+
+def refresh_term_heads(frontier):
+    # Each term has one "head" URL (its next uncrawled page) in the frontier, scored
+    # by the bandit, so the frontier's priority order is the selector's choice
+    heads = []
+    for term, score in selector.scores(search_terms).items():
+        if score is not None:
+            heads.append((search_url(term, selector.next_page(term)), min(score, 1e9)))
+    frontier.prioritize(heads)
 
 
-    if url in seen_urls:
-        log("⚠️ Already tried this URL, skipping.")
-        continue
-    seen_urls.add(url)
+def open_frontier():
+    frontier = UrlFrontier(frontier_path)
 
+    recovered = frontier.recover_in_flight()
+    if recovered:
+        log(f"♻️ Re-queued {recovered} URL(s) left in flight by the last run.")
+
+    # One-off migration of the old text-file trackers
+    for path, state in ((failed_urls_path, "failed"), (blocked_urls_path, "blocked"), (retry_tracker_path, "blocked")):
+        migrated = frontier.import_legacy_file(path, state)
+        if migrated:
+            log(f"📥 Migrated {migrated} URL(s) from {path} into the frontier.")
+
+    refresh_term_heads(frontier)
+    log(f"🗂️ Frontier: {frontier.stats()}")
+    return frontier
+
+
+def fetch_search_page(url):
     log(f"🌐 Scraping: {url}")
-    try:
-        scraped = scrape_amazon_titles(url, max_items=30)
-    except Exception as e:
-        log(f"❌ Error scraping {url}: {e}")
-        if retry_mode:
-            move_to_retry_tracker(url)
-        else:
-            save_failed_url(url)
-        time.sleep(10)
-        continue
+    return scrape_amazon_titles(url, max_items=30, raise_on_block=True)
 
 
+# === RESULT HANDLING (called by the engine under its result lock) ===
+def handle_result(url, outcome, scraped):
+    # Failed/blocked URLs are rescheduled with backoff by the frontier itself
+    global loop_count
+    term, page = parse_search_url(url)
+    if outcome != "ok":
+        if outcome is not None:
+            selector.record(term, page, outcome)
+            selector.save()
+            refresh_term_heads(frontier)
+        return 0
 
     new_bulk = []
     new_priority = 0
@@ -168,31 +155,63 @@ while True:
             new_priority += 1
 
     if new_bulk:
-        remove_url_from_failed(url)
         bulk_db.extend(new_bulk)
         log(f"➕ Added {len(new_bulk)} new products. {new_priority} high-confidence.")
 
         with open(bulk_path, "w", encoding="utf-8") as f:
             json.dump(bulk_db, f, indent=2)
 
-        with open(priority_path, "w", encoding="utf-8") as f:
-            json.dump(priority_db, f, indent=2)
+        if new_priority:
+            with open(priority_path, "w", encoding="utf-8") as f:
+                json.dump(priority_db, f, indent=2)
 
     else:
         log("🤷 No new unique products found.")
 
-    # 🔁 Periodic Backup
+    selector.record(term, page, "ok", len(new_bulk), len(scraped))
+    selector.save()
+    refresh_term_heads(frontier)
+
+    # 🔁 Periodic incremental backup (only products changed since the last snapshot)
     loop_count += 1
     if loop_count % backup_every_n_loops == 0:
-        os.makedirs(backup_dir, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(f"{backup_dir}/bulk_{timestamp}.json", "w", encoding="utf-8") as f:
-            json.dump(bulk_db, f, indent=2)
-        with open(f"{backup_dir}/priority_{timestamp}.json", "w", encoding="utf-8") as f:
-            json.dump(priority_db, f, indent=2)
-        log("💾 Backup created.")
-
-    # 💤 Sleep before next round
-    delay = random.randint(*sleep_between_jobs)
-    log(f"⏲️ Sleeping for {delay // 60} mins...")
-    time.sleep(delay)
+        for name, db in (("bulk", bulk_db), ("priority", priority_db)):
+            entry = backups.snapshot(name, db)
+            if entry:
+                log(f"💾 Backup {entry['id']}: {entry['type']}, {entry['changed']} changed, {entry['bytes'] / 1024:.1f} KB")
+
+    return len(new_bulk)
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🕷️ Bulk Amazon search-page crawler.")
+    parser.add_argument("--workers", type=int, default=workers, help="Concurrent scrape workers (browsers)")
+    parser.add_argument("--rate", type=float, default=requests_per_hour_per_host, help="Max pages per hour per host")
+    parser.add_argument("--burst", type=int, default=burst_per_host, help="Token-bucket burst size per host")
+    parser.add_argument("--strategy", choices=("thompson", "ucb"), default=term_strategy, help="Term selection bandit")
+    parser.add_argument("--report-every", type=int, default=report_every_s, help="Seconds between throughput reports")
+    args = parser.parse_args()
+
+    selector = TermSelector(term_stats_path, args.strategy, max_pages_per_term)
+    frontier = open_frontier()
+    engine = CrawlEngine(
+        fetch_search_page, frontier,
+        limiter=HostRateLimiter(args.rate, args.burst),
+        workers=args.workers,
+        on_result=handle_result,
+        blocked_exceptions=(ScrapeBlocked,),
+    )
+    log(f"🚀 Starting crawl: {args.workers} worker(s), {args.rate:g} pages/hour/host (burst {args.burst})")
+    engine.start()
+    try:
+        while True:
+            time.sleep(args.report_every)
+            log(engine.stats.format())
+    except KeyboardInterrupt:
+        log("🛑 Stopping crawl...")
+        engine.stop()
+        log(engine.stats.format())
+        log(f"🗂️ Frontier: {frontier.stats()}")
+        frontier.close()
+        selector.save()
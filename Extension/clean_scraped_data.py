@@ -1,12 +1,22 @@
 import json
 import csv
 import argparse
+import hashlib
+import os
+import sqlite3
+import tempfile
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # === CONFIG ===
 INPUT_JSON = "bulk_scraped_products.json"
 OUTPUT_JSON = "cleaned_products.json"
 OUTPUT_CSV = "cleaned_products.csv"
+CSV_KEYS = [
+    "asin", "title", "estimated_weight_kg", "dimensions_cm", "material_type",
+    "brand_estimated_origin", "origin_city", "confidence", "recyclability"
+]
+READ_CHUNK = 1 << 16
 
 def load_products(path):
     try:
@@ -39,16 +49,11 @@ def export_csv(products, path):
         print("⚠️ No products to export.")
         return
 
-    keys = [
-        "asin", "title", "estimated_weight_kg", "dimensions_cm", "material_type",
-        "brand_estimated_origin", "origin_city", "confidence", "recyclability"
-    ]
-
     with open(path, "w", encoding="utf-8", newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
+        writer = csv.DictWriter(f, fieldnames=CSV_KEYS)
         writer.writeheader()
         for p in products:
-            writer.writerow({k: p.get(k, "") for k in keys})
+            writer.writerow({k: p.get(k, "") for k in CSV_KEYS})
 
     print(f"📄 CSV exported: {path}")
 
@@ -71,11 +76,222 @@ def main(confidence_filter, csv_export, top_n=None):
     if csv_export:
         export_csv(filtered, OUTPUT_CSV)
 
+# === Streaming mode ===
+# Same result as main(), in bounded memory: products are parsed one at a time,
+# seen ASINs live in a hashed set (or an on-disk one) and output is written
+# as it goes. With several input shards and --workers, parsing and filtering
+# run in parallel and the parent only dedupes and writes, in input order.
+
+def iter_json_array(f, chunk_size=READ_CHUNK):
+    # Incremental parse of "[{...}, {...}]": holds one read chunk plus the object being decoded
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    skip(" \t\r\n")
+    if buf[pos:pos + 1] != "[":
+        raise ValueError("expected a JSON array")
+    pos += 1
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+            if end == len(buf) and not eof:
+                raise json.JSONDecodeError("may be truncated", buf, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+        pos = end
+        yield obj
+
+
+def iter_products(path):
+    # JSON array or JSON Lines, whichever the file turns out to be
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == "[":
+            yield from iter_json_array(f)
+            return
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # torn last line of a crawl that is still writing
+
+
+class HashedAsinSet:
+    # 8-byte digests instead of the strings; collisions are negligible at crawl sizes
+    def __init__(self):
+        self.seen = set()
+
+    def add(self, asin):
+        key = int.from_bytes(hashlib.blake2b(asin.encode(), digest_size=8).digest(), "little")
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        return True
+
+    def close(self):
+        self.seen = set()
+
+
+class DiskAsinSet:
+    # SQLite-backed, for crawls whose ASINs alone would not fit the memory budget
+    def __init__(self, path=None):
+        self.temp = path is None
+        if self.temp:
+            fd, path = tempfile.mkstemp(prefix="seen_asins_", suffix=".db")
+            os.close(fd)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS seen (asin TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add(self, asin):
+        return self.db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (asin,)).rowcount == 1
+
+    def close(self):
+        self.db.close()
+        if self.temp:
+            os.remove(self.path)
+
+
+class StreamWriter:
+    # cleaned_products.json (same layout as export_json) or .jsonl, plus the CSV, written per product
+    def __init__(self, json_path, csv_path=None):
+        self.jsonl = json_path.endswith(".jsonl")
+        self.json_file = open(json_path, "w", encoding="utf-8")
+        self.csv_file = open(csv_path, "w", encoding="utf-8", newline="") if csv_path else None
+        self.csv = None
+        if self.csv_file:
+            self.csv = csv.DictWriter(self.csv_file, fieldnames=CSV_KEYS)
+            self.csv.writeheader()
+        self.count = 0
+        if not self.jsonl:
+            self.json_file.write("[")
+
+    def write(self, p):
+        if self.jsonl:
+            self.json_file.write(json.dumps(p, ensure_ascii=False) + "\n")
+        else:
+            item = json.dumps(p, indent=2).replace("\n", "\n  ")
+            self.json_file.write(("," if self.count else "") + "\n  " + item)
+        if self.csv:
+            self.csv.writerow({k: p.get(k, "") for k in CSV_KEYS})
+        self.count += 1
+
+    def close(self):
+        if not self.jsonl:
+            self.json_file.write("\n]" if self.count else "]")
+        self.json_file.close()
+        if self.csv_file:
+            self.csv_file.close()
+
+
+def keeps(p, level):
+    return level == "All" or p.get("confidence", "").lower() == level.lower()
+
+
+def filter_shard(job):
+    # Worker: one input shard -> one JSONL spool. Rejected products keep a stub so
+    # the parent still sees their ASIN first, exactly like deduplicate() then filter
+    path, level, spool_dir = job
+    fd, spool = tempfile.mkstemp(prefix="clean_", suffix=".jsonl", dir=spool_dir)
+    read = 0
+    with os.fdopen(fd, "w", encoding="utf-8") as out:
+        for p in iter_products(path):
+            read += 1
+            if not isinstance(p, dict) or not p.get("asin"):
+                continue
+            record = p if keeps(p, level) else {"asin": p["asin"], "_rejected": True}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return spool, read
+
+
+def main_stream(inputs, confidence_filter, csv_export, top_n=None, workers=1,
+                dedupe="memory", dedupe_db=None, output_json=OUTPUT_JSON, output_csv=OUTPUT_CSV):
+    seen = DiskAsinSet(dedupe_db) if dedupe == "disk" else HashedAsinSet()
+    writer = StreamWriter(output_json, output_csv if csv_export else None)
+    read = unique = 0
+    spool_dir = tempfile.mkdtemp(prefix="clean_spool_")
+    try:
+        if workers > 1 and len(inputs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() yields in input order, so "first ASIN wins" matches a sequential run
+                for spool, shard_read in pool.map(filter_shard, [(p, confidence_filter, spool_dir) for p in inputs]):
+                    read += shard_read
+                    for p in iter_products(spool):
+                        if (top_n is None or writer.count < top_n) and seen.add(p["asin"]):
+                            unique += 1
+                            if not p.get("_rejected"):
+                                writer.write(p)
+                    os.remove(spool)
+        else:
+            for path in inputs:
+                for p in iter_products(path):
+                    read += 1
+                    if top_n is not None and writer.count >= top_n:
+                        break
+                    asin = p.get("asin") if isinstance(p, dict) else None
+                    if asin and seen.add(asin):
+                        unique += 1
+                        if keeps(p, confidence_filter):
+                            writer.write(p)
+    finally:
+        writer.close()
+        seen.close()
+        for name in os.listdir(spool_dir):
+            os.remove(os.path.join(spool_dir, name))
+        os.rmdir(spool_dir)
+
+    print(f"📥 Streamed: {read} products from {len(inputs)} file(s)")
+    print(f"🧼 Deduplicated: {unique} unique ASINs" + (" (stopped early at --top)" if top_n else ""))
+    print(f"✅ Exported JSON: {output_json} ({writer.count} products with confidence='{confidence_filter}')")
+    if csv_export:
+        print(f"📄 CSV exported: {output_csv}")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="🧼 Clean and export Amazon product data.")
     parser.add_argument("--confidence", choices=["All", "High", "Estimated"], default="All", help="Confidence level to filter by")
     parser.add_argument("--csv", action="store_true", help="Export to CSV")
     parser.add_argument("--top", type=int, help="Only include top N results")
+    parser.add_argument("--stream", action="store_true", help="Constant-memory mode for large crawls")
+    parser.add_argument("--input", nargs="+", default=[INPUT_JSON],
+                        help="With --stream: JSON array or JSONL files, e.g. crawl_shards/*.jsonl")
+    parser.add_argument("--output", default=OUTPUT_JSON, help="With --stream: .json or .jsonl")
+    parser.add_argument("--workers", type=int, default=1, help="With --stream: processes filtering input shards")
+    parser.add_argument("--dedupe", choices=["memory", "disk"], default="memory",
+                        help="With --stream: hashed in-memory ASIN set, or SQLite on disk")
+    parser.add_argument("--dedupe-db", help="SQLite file for --dedupe disk (default: a temp file)")
 
     args = parser.parse_args()
-    main(confidence_filter=args.confidence, csv_export=args.csv, top_n=args.top)
+    if args.stream:
+        main_stream(args.input, args.confidence, args.csv, args.top, args.workers,
+                    args.dedupe, args.dedupe_db, args.output)
+    else:
+        main(confidence_filter=args.confidence, csv_export=args.csv, top_n=args.top)
@@ -0,0 +1,198 @@
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+
+from applog import get_logger
+
+log = get_logger("crawl")
+
+
+# === Rate limiting ===
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate  # tokens per second
+        self.capacity = max(1, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        # Takes a token and returns 0, or returns how long until one is available
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, stop_event=None):
+        while True:
+            wait = self.try_acquire()
+            if wait == 0:
+                return True
+            if stop_event is None:
+                time.sleep(wait)
+            elif stop_event.wait(wait):
+                return False
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_hour, burst=1, per_host=None):
+        self.requests_per_hour = requests_per_hour
+        self.burst = burst
+        self.per_host = per_host or {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.buckets:
+                rate = self.per_host.get(host, self.requests_per_hour) / 3600
+                self.buckets[host] = TokenBucket(rate, self.burst)
+            return self.buckets[host]
+
+    def acquire(self, url, stop_event=None):
+        return self.bucket_for(url).acquire(stop_event)
+
+
+# === Work source for finite crawls (tests, benchmarks, one-off runs) ===
+class WorkQueue:
+    def __init__(self, urls=()):
+        self.queue = queue.Queue()
+        for url in urls:
+            self.put(url)
+
+    def put(self, url):
+        self.queue.put(url)
+
+    def take(self, timeout=0.5):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def task_done(self, url, outcome):
+        self.queue.task_done()
+
+    def join(self):
+        self.queue.join()
+
+
+# === Throughput stats ===
+class CrawlStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.pages = 0
+        self.products = 0
+        self.new_asins = 0
+        self.blocked = 0
+        self.failed = 0
+
+    def record(self, outcome, products=0, new_asins=0):
+        with self.lock:
+            self.pages += 1
+            self.products += products
+            self.new_asins += new_asins
+            if outcome == "blocked":
+                self.blocked += 1
+            elif outcome == "failed":
+                self.failed += 1
+
+    def summary(self):
+        with self.lock:
+            hours = max(time.monotonic() - self.started, 1e-9) / 3600
+            return {
+                "pages": self.pages,
+                "new_asins": self.new_asins,
+                "blocked": self.blocked,
+                "failed": self.failed,
+                "pages_per_hour": self.pages / hours,
+                "new_asins_per_hour": self.new_asins / hours,
+                "block_rate": self.blocked / self.pages if self.pages else 0.0,
+            }
+
+    def format(self):
+        s = self.summary()
+        return (
+            f"📊 {s['pages']} pages ({s['pages_per_hour']:.1f}/h), "
+            f"{s['new_asins']} new ASINs ({s['new_asins_per_hour']:.1f}/h), "
+            f"block rate {s['block_rate']:.1%}, {s['failed']} failed"
+        )
+
+
+# === Engine ===
+class CrawlEngine:
+    """N scrape workers over a shared work source, paced by a per-host rate limiter.
+
+    fetch(url) returns a list of products, raises one of blocked_exceptions
+    when the site blocks us, or raises anything else on failure.
+    on_result(url, outcome, products) runs under a lock (so it can update
+    shared DBs) and returns the number of new ASINs it kept.
+    """
+
+    def __init__(self, fetch, source, limiter=None, workers=4, on_result=None, blocked_exceptions=()):
+        self.fetch = fetch
+        self.source = source
+        self.limiter = limiter
+        self.workers = workers
+        self.on_result = on_result
+        self.blocked_exceptions = tuple(blocked_exceptions)
+        self.stats = CrawlStats()
+        self.result_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def _process(self, url):
+        if self.limiter and not self.limiter.acquire(url, self.stop_event):
+            return None  # stopping
+
+        products = []
+        try:
+            products = self.fetch(url) or []
+            outcome = "ok"
+        except self.blocked_exceptions as e:
+            log.warning("🚫 Blocked at %s: %s", url, e)
+            outcome = "blocked"
+        except Exception as e:
+            log.warning("❌ Error scraping %s: %s", url, e)
+            outcome = "failed"
+
+        new_asins = 0
+        if self.on_result:
+            with self.result_lock:
+                new_asins = self.on_result(url, outcome, products) or 0
+        self.stats.record(outcome, len(products), new_asins)
+        return outcome
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            url = self.source.take(timeout=0.5)
+            if url is None:
+                continue
+            outcome = None
+            try:
+                outcome = self._process(url)
+            finally:
+                self.source.task_done(url, outcome)
+
+    def start(self):
+        self.stats = CrawlStats()
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"crawl-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self.threads:
+            t.start()
+        return self
+
+    def stop(self, timeout=None):
+        self.stop_event.set()
+        for t in self.threads:
+            t.join(timeout)
+        self.threads = []
@@ -0,0 +1,180 @@
+import csv
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from geo import distances_to_users, uk_hub
+
+# Carbon accounting shared by app.py, api.py and the dataset generators. Every
+# function takes columns (lists/arrays, or scalars) and works on the whole
+# batch with NumPy: categorical inputs become factor columns in one lookup
+# pass (integer-coded columns index a small factor array directly), then it is
+# all element-wise maths. A single product is just a batch of one. Results
+# round exactly like Python's round(), so they match the per-product code.
+
+# === Factor tables ===
+# Transport leg (api.py): the mode is picked from the distance, or overridden
+AUTO_MODE_LIMITS_KM = [1500, 6000]            # < 1500 Truck, < 6000 Ship, else Air
+AUTO_MODES = ["Truck", "Ship", "Air"]
+AUTO_MODE_FACTORS = [0.12, 0.02, 0.5]         # kg CO2 per kg per 1000 km
+MODE_FACTORS = {"Air": 0.5, "Ship": 0.03, "Truck": 0.15}  # override_transport_mode, as reported to clients
+PACKAGING_FACTOR = 1.2                        # api.py: product + 20% packaging
+APP_PACKAGING_FACTOR = 1.05                   # app.py's lighter allowance
+
+# Rule-based eco score (api.py)
+RECYCLE_POINTS = {"Low": 2, "Medium": 6, "High": 10}
+RECYCLE_POINTS_DEFAULT = 5                    # anything else; missing counts as Medium
+SCORE_LIMITS = [3.5, 5, 6.5, 8, 9]
+SCORE_LABELS = ["F", "D", "C", "B", "A", "A+"]
+
+# Material intensity (app.py, ml_model/defra_material_intensity.csv)
+MATERIAL_INTENSITY_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml_model",
+                                      "defra_material_intensity.csv")
+MATERIAL_INTENSITY_DEFAULT = 2.0              # kg CO2 per kg
+ML_CARBON_FACTOR = 1.2
+TREE_KG_PER_YEAR = 15                         # one tree offsets ~15 kg CO2 a year
+
+# Synthetic training data (ml_model/generate_dataset.py)
+DATASET_MATERIAL_BASE = {"Plastic": 1.2, "Bamboo": 0.6, "Glass": 1.5, "Steel": 1.8, "Cardboard": 0.7, "Aluminum": 1.6, "Paper": 0.5}
+DATASET_MATERIAL_DEFAULT = 1.0
+DATASET_TRANSPORT = {"Land": 1.0, "Air": 2.5, "Ship": 0.8}
+DATASET_RECYCLE = {"Low": 1.0, "Medium": 0.9, "High": 0.7}
+
+# Scrape-based dataset (Extension/generate_dataset.py): score bands on carbon alone
+CARBON_LIMITS = [0.4, 0.7, 1.0, 1.5, 2.0]
+CARBON_LABELS = ["A+", "A", "B", "C", "D", "F"]
+
+# Column already integer-coded against `categories` (e.g. a generator's codes)
+Coded = namedtuple("Coded", ["codes", "categories"])
+
+
+# === Lookups ===
+def lookup(values, table, default):
+    # Factor per row; `values` may be a scalar, a list/array of labels, or Coded
+    if isinstance(values, Coded):
+        return np.array([table.get(c, default) for c in values.categories], dtype=np.float64)[values.codes]
+    values = np.asarray(values, dtype=object)
+    if values.ndim == 0:
+        return np.float64(table.get(values.item(), default))
+    get = table.get
+    flat = np.fromiter((get(v, default) for v in values.ravel()), dtype=np.float64, count=values.size)
+    return flat.reshape(values.shape)
+
+
+def _column(values, dtype=np.float64):
+    return np.asarray(values, dtype=dtype)
+
+
+def _round(values, decimals=2):
+    # np.round scales by 10**decimals first, which can tip values lying just off a
+    # half (62.325 -> 62.32 where round() gives 62.33); redo those few with round()
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, decimals)
+    scaled = values * 10 ** decimals
+    near_half = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_half.any():
+        out = np.array(out, copy=True)
+        out[near_half] = [round(v, decimals) for v in values[near_half].tolist()]
+    return float(out) if out.ndim == 0 else out
+
+
+def load_material_intensity(path=MATERIAL_INTENSITY_CSV):
+    with open(path, "r", encoding="utf-8") as f:
+        return {row["material"]: float(row["co2_per_kg"]) for row in csv.DictReader(f)}
+
+
+# === Transport leg (api.py) ===
+def packed_weight(weight_kg, include_packaging=True, factor=PACKAGING_FACTOR):
+    weight_kg = _column(weight_kg)
+    return np.where(_column(include_packaging, bool), weight_kg * factor, weight_kg)
+
+
+def auto_transport_mode(distance_km):
+    # -> (mode names, kg CO2 per kg per 1000 km)
+    band = np.searchsorted(AUTO_MODE_LIMITS_KM, _column(distance_km), side="right")
+    return np.array(AUTO_MODES, dtype=object)[band], np.array(AUTO_MODE_FACTORS)[band]
+
+
+def transport_modes(distance_km, override_mode=None):
+    # Override wins where it names a known mode, otherwise the distance decides
+    modes, factors = auto_transport_mode(distance_km)
+    if override_mode is None:
+        return modes, factors
+    override = np.broadcast_to(np.asarray(override_mode, dtype=object), modes.shape)
+    override_factors = lookup(override, MODE_FACTORS, np.nan)
+    known = ~np.isnan(override_factors)
+    if known.any():
+        modes = np.where(known, override, modes)
+        factors = np.where(known, override_factors, factors)
+    return modes, factors
+
+
+def transport_carbon(final_weight_kg, distance_km, factors):
+    return _round(_column(final_weight_kg) * factors * (_column(distance_km) / 1000))
+
+
+def rule_eco_score(carbon_kg, recyclability, distance_km, weight_kg):
+    carbon_score = np.maximum(0, 10 - _column(carbon_kg) * 5)
+    weight_score = np.maximum(0, 10 - _column(weight_kg) * 2)
+    distance_score = np.maximum(0, 10 - _column(distance_km) / 1000)
+    # Missing/empty counts as Medium, as in `recyclability or "Medium"`
+    points = {**RECYCLE_POINTS, None: RECYCLE_POINTS["Medium"], "": RECYCLE_POINTS["Medium"]}
+    recycle_score = lookup(recyclability, points, RECYCLE_POINTS_DEFAULT)
+    total = (carbon_score + weight_score + distance_score + recycle_score) / 4
+    return np.array(SCORE_LABELS, dtype=object)[np.searchsorted(SCORE_LIMITS, total, side="right")]
+
+
+def origin_distances(origins, user_lat, user_lon):
+    # Unknown origins ship from the UK hub, as before
+    return distances_to_users(list(np.atleast_1d(np.asarray(origins, dtype=object))), user_lat, user_lon, default=uk_hub)
+
+
+def estimate_transport(weight_kg, distance_km, recyclability, include_packaging=True, override_mode=None,
+                       packaging_factor=PACKAGING_FACTOR):
+    # api.py's estimate for a batch: every argument is a column or a scalar broadcast over the others
+    columns = [weight_kg, distance_km, include_packaging, recyclability] + ([] if override_mode is None else [override_mode])
+    shape = np.broadcast_shapes(*(np.shape(c) for c in columns))
+    weight_kg = np.broadcast_to(_column(weight_kg), shape)
+    distance_km = np.broadcast_to(_column(distance_km), shape)
+    include_packaging = np.broadcast_to(_column(include_packaging, bool), shape)
+    recyclability = np.broadcast_to(np.asarray(recyclability, dtype=object), shape)
+    if override_mode is not None:
+        override_mode = np.broadcast_to(np.asarray(override_mode, dtype=object), shape)
+    final_weight = packed_weight(weight_kg, include_packaging, packaging_factor)
+    modes, factors = transport_modes(distance_km, override_mode)
+    carbon = transport_carbon(final_weight, distance_km, factors)
+    return {
+        "final_weight_kg": final_weight,
+        "transport_mode": modes,
+        "emission_factor": factors,
+        "carbon_kg": carbon,
+        "eco_score": rule_eco_score(carbon, recyclability, np.round(distance_km, 1), final_weight),
+    }
+
+
+# === Material intensity (app.py) ===
+def material_carbon(weight_kg, material, intensity):
+    return _round(_column(weight_kg) * lookup(material, intensity, MATERIAL_INTENSITY_DEFAULT))
+
+
+def ml_carbon(weight_kg):
+    return _round(_column(weight_kg) * ML_CARBON_FACTOR)
+
+
+def trees_to_offset(carbon_kg):
+    trees = np.maximum(1, np.round(_column(carbon_kg) / TREE_KG_PER_YEAR)).astype(np.int64)
+    return int(trees) if trees.ndim == 0 else trees
+
+
+# === Datasets ===
+def dataset_carbon(weight_kg, material, transport, recyclability):
+    # ml_model/generate_dataset.py's synthetic label: weight x material x transport x end-of-life
+    return _round(_column(weight_kg)
+                  * lookup(material, DATASET_MATERIAL_BASE, DATASET_MATERIAL_DEFAULT)
+                  * lookup(transport, DATASET_TRANSPORT, 1.0)
+                  * lookup(recyclability, DATASET_RECYCLE, 1.0))
+
+
+def carbon_band_score(carbon_kg):
+    return np.array(CARBON_LABELS, dtype=object)[np.searchsorted(CARBON_LIMITS, _column(carbon_kg), side="right")]
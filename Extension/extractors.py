@@ -0,0 +1,181 @@
+import os
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from vocabulary import canonical
+
+# Pure page -> field extractors (no browser, no network, no global state), shared
+# by the live scrapers and the page-archive backfill so both derive fields the same way.
+
+
+# === Field extractors ===
+def extract_asin(url):
+    match = re.search(r"/dp/([A-Z0-9]{10})", url)
+    if not match:
+        match = re.search(r"/gp/product/([A-Z0-9]{10})", url)
+    if not match:
+        match = re.search(r"/product/([A-Z0-9]{10})", url)
+    if not match:
+        match = re.search(r"/([A-Z0-9]{10})(?:[/?]|$)", url)
+    return match.group(1) if match else None
+
+
+def extract_weight(text):
+    if not text:
+        return None
+
+    text = text.lower()
+
+    # 1. Match kg first (also handles "kilogram" or "kilograms")
+    kg_match = re.search(r"([\d.]+)\s?(kg|kilogram|kilograms)", text)
+    if kg_match:
+        return round(float(kg_match.group(1)), 3)
+
+    # 2. Match grams
+    g_match = re.search(r"([\d.]+)\s?g", text)
+    if g_match:
+        return round(float(g_match.group(1)) / 1000, 3)
+
+    return None
+
+
+def extract_dimensions(text):
+    match = re.search(r"(\d+(?:\.\d+)?)\s?[x×*]\s?(\d+(?:\.\d+)?)\s?[x×*]\s?(\d+(?:\.\d+)?)(?:\s?cm|centimeters?)", text)
+    if match:
+        return f"{match.group(1)} x {match.group(2)} x {match.group(3)} cm"
+    return None
+
+
+def extract_material(text):
+    match = re.search(r"(?:material|made of|composition)[\s:]+([a-z\s\-]+)", text, re.IGNORECASE)
+    if match:
+        return match.group(1).strip().title()
+    return None
+
+
+def extract_recyclability(text_blobs):
+    full_text = " ".join(text_blobs).lower()
+    if any(kw in full_text for kw in ["100% recyclable", "fully recyclable", "recyclable packaging"]):
+        return "High"
+    elif any(kw in full_text for kw in ["partially recycled", "made from recycled", "recycled content"]):
+        return "Medium"
+    elif any(kw in full_text for kw in ["not recyclable", "non-recyclable", "plastic packaging"]):
+        return "Low"
+    return "Unknown"
+
+
+def normalize_brand(brand_raw):
+    return brand_raw.lower().replace("visit the", "").replace("store", "").strip()
+
+
+def weight_from_spec_cells(cells):
+    # Spec tables alternate label/value cells
+    for label, value in zip(cells, cells[1:]):
+        if "weight" in label.lower():
+            return extract_weight(value.lower())
+    return None
+
+
+def parse_spec_blobs(text_blobs, title):
+    # Weight, dimensions and material from a product page's spec/description text
+    weight = dimensions = material = None
+    for blob in text_blobs:
+        if not weight and any(kw in blob for kw in ["weight", "weighs", "item weight", "product weight"]):
+            weight = extract_weight(blob)
+
+        if not weight:
+            weight = extract_weight(title)
+
+        if not dimensions:
+            dimensions = extract_dimensions(blob)
+
+        if not material:
+            material = extract_material(blob)
+
+        if weight and dimensions and material:
+            break
+    return weight, dimensions, material
+
+
+# === Product pages ===
+PRODUCT_TITLE_SELECTORS = ["#productTitle", "#title span", "span#productTitle", "h1.a-size-large span"]
+PRODUCT_BLOB_SELECTORS = [
+    "#detailBullets_feature_div li",
+    "table.a-keyvalue tr",
+    "#productDetails_techSpec_section_1 td",
+    "#productDescription",
+]
+
+
+def extract_product_page(html):
+    # Everything scrape_amazon_product_page derives from the page itself
+    soup = BeautifulSoup(html, "html.parser")
+
+    title = None
+    for sel in PRODUCT_TITLE_SELECTORS:
+        el = soup.select_one(sel)
+        if el:
+            title = el.get_text(" ", strip=True)
+            break
+    if not title:
+        return None
+
+    byline = soup.select_one("#bylineInfo")
+    brand = normalize_brand(byline.get_text(" ", strip=True) if byline else title.split()[0])
+
+    text_blobs = []
+    for sel in PRODUCT_BLOB_SELECTORS:
+        text_blobs += [el.get_text(" ", strip=True).lower() for el in soup.select(sel)]
+
+    weight, dimensions, material = parse_spec_blobs(text_blobs, title)
+    return {
+        "title": title,
+        "brand": brand,
+        "raw_product_weight_kg": weight,
+        "dimensions_cm": dimensions,
+        "material_type": canonical("material", material),
+        "recyclability": extract_recyclability(text_blobs),
+    }
+
+
+# === Search result pages ===
+SEARCH_CARD_SELECTOR = "div.s-main-slot div[data-asin]"
+SEARCH_TITLE_SELECTORS = [
+    "span.a-size-medium.a-color-base.a-text-normal",
+    "span.a-size-base-plus.a-color-base.a-text-normal",
+    "h2 span",
+]
+SEARCH_LINK_SELECTOR = "a.a-link-normal.s-no-outline"
+SEARCH_BRAND_SELECTOR = "h5.s-line-clamp-1 span.a-size-base"
+
+
+def extract_search_cards_from_html(html, base_url=None):
+    # Same fields as the in-page extract_search_cards script, from a saved page_source
+    base_url = base_url or os.environ.get("AMAZON_BASE_URL", "https://www.amazon.co.uk")
+    soup = BeautifulSoup(html, "html.parser")
+    cards = []
+    for el in soup.select(SEARCH_CARD_SELECTOR):
+        asin = el.get("data-asin")
+        if not asin:
+            continue
+        link = el.select_one(SEARCH_LINK_SELECTOR)
+        title = None
+        for sel in SEARCH_TITLE_SELECTORS:
+            t = el.select_one(sel)
+            if t and t.get_text(strip=True):
+                title = t.get_text(" ", strip=True)
+                break
+        brand_el = el.select_one(SEARCH_BRAND_SELECTOR)
+        cards.append({
+            "asin": asin,
+            "href": urljoin(base_url, link["href"]) if link and link.get("href") else None,
+            "title": title,
+            "brand_attr": el.get("data-brand"),
+            "brand_text": brand_el.get_text(" ", strip=True) if brand_el else None,
+            "aria_label": el.get("aria-label"),
+            "text": el.get_text(" ", strip=True),
+        })
+    tech_details = [td.get_text(" ", strip=True) for td in soup.select("#prodDetails td")]
+    return cards, tech_details
@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # ✅ Import the scraping function (make sure this is the one you're using)
 from Extension.scrape_amazon_titles import scrape_amazon_product
+from emissions import carbon_band_score  # Extension/ is on sys.path once the scraper is imported
 
 # 🔗 Add Amazon product URLs here
 amazon_urls = [
@@ -39,18 +40,7 @@ for url in amazon_urls:
             continue
 
         # 🌱 Define a pseudo "true" eco score based on carbon output
-        if carbon < 0.4:
-            score = "A+"
-        elif carbon < 0.7:
-            score = "A"
-        elif carbon < 1.0:
-            score = "B"
-        elif carbon < 1.5:
-            score = "C"
-        elif carbon < 2.0:
-            score = "D"
-        else:
-            score = "F"
+        score = carbon_band_score(carbon)
 
         rows.append([material, weight, transport, score])
         print(f"✅ Scraped: {product.get('title')}")
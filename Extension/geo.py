@@ -0,0 +1,95 @@
+from math import atan2, cos, radians, sin, sqrt
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+# === Static location tables ===
+origin_hubs = {
+    "China": {"lat": 31.2304, "lon": 121.4737, "city": "Shanghai"},
+    "Germany": {"lat": 50.1109, "lon": 8.6821, "city": "Frankfurt"},
+    "USA": {"lat": 37.7749, "lon": -122.4194, "city": "San Francisco"},
+    "Japan": {"lat": 35.6895, "lon": 139.6917, "city": "Tokyo"},
+    "UK": {"lat": 51.509865, "lon": -0.118092, "city": "London"},
+    "Italy": {"city": "Castel San Giovanni", "lat": 45.0667, "lon": 9.4167},
+    "India": {"lat": 28.6139, "lon": 77.2090, "city": "New Delhi"},
+    "South Korea": {"lat": 37.5665, "lon": 126.9780, "city": "Seoul"},
+    "Spain": {"lat": 40.4168, "lon": -3.7038, "city": "Madrid"},
+    "Poland": {"lat": 52.2297, "lon": 21.0122, "city": "Warsaw"},
+    "Netherlands": {"lat": 52.3676, "lon": 4.9041, "city": "Amsterdam"},
+}
+uk_hub = {"lat": 51.8821, "lon": -0.5057, "city": "Dunstable"}
+
+amazon_fulfillment_centers = {
+    "UK": {"lat": 51.8821, "lon": -0.5057, "city": "Dunstable"},
+    "Germany": {"lat": 50.1109, "lon": 8.6821, "city": "Frankfurt"},
+    "France": {"lat": 48.8566, "lon": 2.3522, "city": "Paris"},
+    "Italy": {"lat": 45.0667, "lon": 9.4167, "city": "Castel San Giovanni"},
+    "USA": {"lat": 37.7749, "lon": -122.4194, "city": "San Francisco"},
+    "Spain": {"lat": 40.4168, "lon": -3.7038, "city": "Madrid"},
+    "Netherlands": {"lat": 52.3676, "lon": 4.9041, "city": "Amsterdam"},
+    "Poland": {"lat": 52.2297, "lon": 21.0122, "city": "Warsaw"},
+}
+
+
+# === Great-circle distance ===
+def haversine(lat1, lon1, lat2, lon2):
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    # Same formula over broadcastable arrays (e.g. one hub vs many users)
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# === Precomputed origin tables (built once at import) ===
+origin_names = list(origin_hubs)
+fulfillment_names = list(amazon_fulfillment_centers)
+_origin_index = {name: i for i, name in enumerate(origin_names)}
+_fulfillment_index = {name: i for i, name in enumerate(fulfillment_names)}
+
+origin_lats = np.array([origin_hubs[n]["lat"] for n in origin_names])
+origin_lons = np.array([origin_hubs[n]["lon"] for n in origin_names])
+_fc_lats = np.array([amazon_fulfillment_centers[n]["lat"] for n in fulfillment_names])
+_fc_lons = np.array([amazon_fulfillment_centers[n]["lon"] for n in fulfillment_names])
+
+# origin hub x fulfillment centre, km
+origin_to_fulfillment_km = haversine_np(origin_lats[:, None], origin_lons[:, None], _fc_lats[None, :], _fc_lons[None, :])
+origin_to_uk_hub_km = haversine_np(origin_lats, origin_lons, uk_hub["lat"], uk_hub["lon"])
+
+
+def origin_hub(country, default=None):
+    return origin_hubs.get(country, default or origin_hubs["UK"])
+
+
+def distance_origin_to_fulfillment(origin_country, fulfillment_country="UK"):
+    # Unknown origins use the UK hub, unknown centres the UK centre (as before)
+    i = _origin_index.get(origin_country, _origin_index["UK"])
+    j = _fulfillment_index.get(fulfillment_country, _fulfillment_index["UK"])
+    return float(origin_to_fulfillment_km[i, j])
+
+
+def distance_origin_to_uk_hub(origin_country):
+    return float(origin_to_uk_hub_km[_origin_index.get(origin_country, _origin_index["UK"])])
+
+
+# === Batches of user coordinates ===
+def origin_coords(origin_countries, default=None):
+    default = default or origin_hubs["UK"]
+    lats = np.array([origin_hubs.get(c, default)["lat"] for c in origin_countries], dtype=np.float64)
+    lons = np.array([origin_hubs.get(c, default)["lon"] for c in origin_countries], dtype=np.float64)
+    return lats, lons
+
+
+def distances_to_users(origin_countries, user_lats, user_lons, default=None):
+    lats, lons = origin_coords(origin_countries, default)
+    return haversine_np(lats, lons, user_lats, user_lons)
+
+
+def distances_from_uk_hub(user_lats, user_lons):
+    return haversine_np(uk_hub["lat"], uk_hub["lon"], user_lats, user_lons)
@@ -0,0 +1,246 @@
+import csv
+import gzip
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from applog import get_logger
+
+# Offline GB postcode lookups from a prebuilt index (data/gb_postcodes.npz).
+# The index is not checked in. Build it once at deploy time, from a
+# geonames GB.txt / GB_full.txt or via pgeocode's download:
+#     python geocoder.py build [GB_full.txt]
+# Without it, get_geocoder() tries that download on first use. If the
+# download fails, it raises GeocoderUnavailable, and api.py answers 503
+# on postcode routes instead of failing to start.
+
+# === CONFIG ===
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATA_PATH = os.path.join(script_dir, "data", "gb_postcodes.npz")
+LRU_SIZE = 65536
+RETRY_SECONDS = int(os.environ.get("GEOCODER_RETRY_SECONDS", 300))  # after a failed load/build
+
+log = get_logger("geocoder")
+
+_non_alnum = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_postcode(postcode):
+    return _non_alnum.sub("", str(postcode or "").upper())
+
+
+def outward_code(normalized):
+    # UK inward codes are always 3 characters ("9PL" in "M13 9PL")
+    return normalized[:-3] if len(normalized) >= 5 else normalized
+
+
+# === Index build (run once, output is bundled with the app) ===
+def _read_source_rows(source_path):
+    opener = gzip.open if source_path.endswith(".gz") else open
+    with opener(source_path, "rt", encoding="utf-8") as f:
+        first = f.readline()
+        f.seek(0)
+        if first.startswith("country_code,"):
+            # pgeocode cache format (CSV with header)
+            for row in csv.DictReader(f):
+                yield row["postal_code"], row["latitude"], row["longitude"]
+        else:
+            # Raw geonames dump: tab separated, no header
+            for row in csv.reader(f, delimiter="\t"):
+                if len(row) >= 11:
+                    yield row[1], row[9], row[10]
+
+
+def build_index(source_path, out_path=DEFAULT_DATA_PATH):
+    full, outward = {}, {}
+    for code, lat, lon in _read_source_rows(source_path):
+        try:
+            point = (float(lat), float(lon))
+        except ValueError:
+            continue
+        key = normalize_postcode(code)
+        if not key:
+            continue
+        table = full if len(key) >= 5 else outward
+        table.setdefault(key, []).append(point)
+
+    # Outward districts without their own row get the centroid of their postcodes
+    derived = {}
+    for key, points in full.items():
+        derived.setdefault(outward_code(key), []).extend(points)
+    for key, points in derived.items():
+        outward.setdefault(key, points)
+
+    def pack(table):
+        keys = sorted(table)
+        coords = np.array([np.mean(table[k], axis=0) for k in keys], dtype=np.float32).reshape(-1, 2)
+        return np.array(keys, dtype="S8"), coords
+
+    full_keys, full_coords = pack(full)
+    outward_keys, outward_coords = pack(outward)
+
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez_compressed(
+        out_path,
+        full_keys=full_keys, full_coords=full_coords,
+        outward_keys=outward_keys, outward_coords=outward_coords,
+    )
+    log.info("📦 Built postcode index: %s postcodes, %s outward codes → %s", len(full_keys), len(outward_keys), out_path)
+    return out_path
+
+
+def _build_from_pgeocode(out_path):
+    # One-off bootstrap when the bundled index is missing
+    import pgeocode
+    pgeocode.Nominatim("gb")  # downloads GB.txt into the pgeocode cache if needed
+    return build_index(os.path.join(pgeocode.STORAGE_DIR, "GB.txt"), out_path)
+
+
+# === Geocoder ===
+class PostcodeGeocoder:
+    def __init__(self, path=DEFAULT_DATA_PATH, lru_size=LRU_SIZE):
+        if not os.path.exists(path):
+            log.warning("⚠️ Postcode index not found at %s, building it from pgeocode data...", path)
+            _build_from_pgeocode(path)
+
+        with np.load(path) as data:
+            self.full_keys = data["full_keys"]
+            self.full_coords = data["full_coords"]
+            self.outward_keys = data["outward_keys"]
+            self.outward_coords = data["outward_coords"]
+
+        self.lookup = lru_cache(maxsize=lru_size)(self._lookup_normalized)
+
+    @staticmethod
+    def _find(keys, coords, key):
+        i = np.searchsorted(keys, key)
+        if i < len(keys) and keys[i] == key:
+            lat, lon = coords[i]
+            return float(lat), float(lon)
+        return None
+
+    def _lookup_normalized(self, normalized):
+        if not normalized:
+            return None
+        key = normalized.encode("ascii", "ignore")
+        return (
+            self._find(self.full_keys, self.full_coords, key)
+            or self._find(self.outward_keys, self.outward_coords, outward_code(key))
+        )
+
+    def query(self, postcode):
+        # (lat, lon) for a single postcode, or None if neither it nor its outward code is known
+        return self.lookup(normalize_postcode(postcode))
+
+    def query_many(self, postcodes):
+        # Vectorized lookup: returns lats, lons (NaN when unknown) and a found mask
+        keys = np.array([normalize_postcode(p).encode("ascii", "ignore") for p in postcodes], dtype="S8")
+        lats = np.full(len(keys), np.nan)
+        lons = np.full(len(keys), np.nan)
+        found = np.zeros(len(keys), dtype=bool)
+
+        for table_keys, table_coords, wanted in (
+            (self.full_keys, self.full_coords, keys),
+            (self.outward_keys, self.outward_coords, np.array([outward_code(k) for k in keys], dtype="S8")),
+        ):
+            if not len(table_keys):
+                continue
+            pending = ~found
+            idx = np.searchsorted(table_keys, wanted).clip(max=len(table_keys) - 1)
+            hit = pending & (table_keys[idx] == wanted)
+            lats[hit] = table_coords[idx[hit], 0]
+            lons[hit] = table_coords[idx[hit], 1]
+            found |= hit
+
+        return lats, lons, found
+
+    def cache_info(self):
+        return self.lookup.cache_info()
+
+
+class GeocoderUnavailable(RuntimeError):
+    pass
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+_geocoder_failure = None  # (monotonic time, message) of the last failed load
+
+
+def get_geocoder():
+    # Raises GeocoderUnavailable if the index can't be loaded or built (e.g. offline
+    # with no bundled file); the load is retried at most every RETRY_SECONDS
+    global _geocoder, _geocoder_failure
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                if _geocoder_failure and time.monotonic() - _geocoder_failure[0] < RETRY_SECONDS:
+                    raise GeocoderUnavailable(_geocoder_failure[1])
+                try:
+                    _geocoder = PostcodeGeocoder()
+                except Exception as e:
+                    _geocoder_failure = (time.monotonic(), f"postcode index unavailable: {e}")
+                    log.error("❌ Could not load the postcode index (%s); run `python geocoder.py build` to create %s",
+                              e, DEFAULT_DATA_PATH)
+                    raise GeocoderUnavailable(_geocoder_failure[1]) from e
+                _geocoder_failure = None
+    return _geocoder
+
+
+def geocoder_ready():
+    return _geocoder is not None
+
+
+# === CLI ===
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="📍 Offline GB postcode geocoder.")
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH, help="Postcode index file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the bundled index from a geonames/pgeocode GB file")
+    build.add_argument("source", nargs="?", help="GB.txt / GB_full.txt (default: download via pgeocode)")
+
+    lookup = sub.add_parser("lookup", help="Geocode postcodes")
+    lookup.add_argument("postcodes", nargs="+")
+
+    bench = sub.add_parser("bench", help="Time single and batched lookups")
+    bench.add_argument("--n", type=int, default=100000)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.source:
+            build_index(args.source, args.data)
+        else:
+            _build_from_pgeocode(args.data)
+
+    elif args.command == "lookup":
+        geocoder = PostcodeGeocoder(args.data)
+        for pc in args.postcodes:
+            print(f"{pc}: {geocoder.query(pc)}")
+
+    elif args.command == "bench":
+        t0 = time.perf_counter()
+        geocoder = PostcodeGeocoder(args.data)
+        print(f"⏱️ Index load: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+        pool = [k.decode() for k in geocoder.full_keys[:: max(1, len(geocoder.full_keys) // 5000)]]
+        pool = pool or [k.decode() for k in geocoder.outward_keys]
+        sample = [pool[i % len(pool)] for i in range(args.n)]
+
+        t0 = time.perf_counter()
+        for pc in sample:
+            geocoder.query(pc)
+        per = (time.perf_counter() - t0) / len(sample) * 1e6
+        print(f"⏱️ Single lookups (LRU warm after first pass): {per:.2f} µs/lookup, {geocoder.cache_info()}")
+
+        t0 = time.perf_counter()
+        geocoder.query_many(sample)
+        per = (time.perf_counter() - t0) / len(sample) * 1e6
+        print(f"⏱️ Batched lookups: {per:.2f} µs/postcode")
@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for amazon.co.uk so the scrapers and the scheduler can be run
+# and benchmarked offline. Serves recorded HTML from fixtures/amazon/ when
+# present (product/<ASIN>.html, search/<term>_<page>.html) and generates
+# deterministic pages otherwise, with configurable latency, 503 rate and
+# CAPTCHA rate. Point the scrapers at it with AMAZON_BASE_URL=http://127.0.0.1:<port>.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(script_dir, "fixtures", "amazon")
+RESULTS_PER_PAGE = 48
+
+BRANDS = [
+    ("Anker", "China"), ("Sony", "Japan"), ("Bosch", "Germany"), ("Philips", "Netherlands"),
+    ("Huel", "UK"), ("Dyson", "UK"), ("Stanley", "USA"), ("Brita", "Germany"),
+    ("Ecozen", "India"), ("Greenleaf", "China"), ("Vonshef", "UK"), ("Bamboozle", "China"),
+]
+MATERIALS = ["Plastic", "Glass", "Aluminium", "Steel", "Paper", "Cardboard", "Bamboo"]
+
+CAPTCHA_PAGE = """<html><head><title>Robot Check</title></head><body>
+<h4>Enter the characters you see below</h4>
+<p>Sorry, we just need to make sure you're not a robot.</p>
+<form action="/errors/validateCaptcha"><img src="/captcha.jpg"><input id="captchacharacters"></form>
+</body></html>"""
+
+ERROR_PAGE = """<html><head><title>Service Unavailable</title></head><body>
+<p>We're sorry, an error has occurred. Please reload this page and try again.</p>
+</body></html>"""
+
+
+# === Deterministic fake catalogue ===
+def _rng(*parts):
+    return random.Random(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest())
+
+
+def fake_asin(term, page, i):
+    return "B0" + hashlib.sha1(f"{term}|{page}|{i}".encode()).hexdigest()[:8].upper()
+
+
+def fake_product(asin):
+    rng = _rng(asin)
+    brand, origin = rng.choice(BRANDS)
+    material = rng.choice(MATERIALS)
+    grams = rng.randint(50, 3000)
+    dims = [rng.randint(5, 60) for _ in range(3)]
+    noun = rng.choice(["Water Bottle", "USB C Charger", "Coffee Mug", "Lunch Box", "Desk Lamp", "Shampoo Bar"])
+    return {
+        "asin": asin,
+        "brand": brand,
+        "origin": origin,
+        "material": material,
+        "grams": grams,
+        "dims": dims,
+        "title": f"{brand} {noun} {rng.randint(100, 999)}, {grams}g",
+    }
+
+
+def search_page_html(term, page):
+    cards = ['<div data-asin="" class="s-result-item s-widget"></div>']  # Amazon interleaves empty widgets
+    for i in range(RESULTS_PER_PAGE):
+        p = fake_product(fake_asin(term, page, i))
+        cards.append(f"""
+<div data-asin="{p['asin']}" data-component-type="s-search-result" class="s-result-item">
+  <h5 class="s-line-clamp-1"><span class="a-size-base">{p['brand']}</span></h5>
+  <a class="a-link-normal s-no-outline" href="/{p['brand'].lower()}-product/dp/{p['asin']}/ref=sr_1_{i}"><img src="/img/{p['asin']}.jpg"></a>
+  <h2><a href="/dp/{p['asin']}"><span class="a-size-medium a-color-base a-text-normal">{p['title']}</span></a></h2>
+  <span class="a-price"><span class="a-offscreen">£{(p['grams'] % 50) + 4}.99</span></span>
+</div>""")
+    return f"""<html><head><title>Amazon.co.uk : {term}</title></head><body>
+<div class="s-main-slot s-result-list">{''.join(cards)}</div></body></html>"""
+
+
+def product_page_html(asin):
+    p = fake_product(asin)
+    w, d, h = p["dims"]
+    return f"""<html><head><title>{p['title']} : Amazon.co.uk</title></head><body>
+<div id="title"><span id="productTitle">{p['title']}</span></div>
+<a id="bylineInfo" href="/stores/{p['brand']}">Visit the {p['brand']} Store</a>
+<div id="feature-bullets"><ul>
+  <li>Durable {p['material'].lower()} construction</li>
+  <li>Made in {p['origin']}</li>
+</ul></div>
+<div id="detailBullets_feature_div"><ul>
+  <li>Item weight : {p['grams']} g</li>
+  <li>Product Dimensions : {w} x {d} x {h} cm</li>
+  <li>Material : {p['material']}</li>
+  <li>Country of origin : {p['origin']}</li>
+  <li>ASIN : {asin}</li>
+</ul></div>
+<div id="productDescription"><p>Recyclable packaging. {p['material']} body.</p></div>
+<div id="merchant-info">Dispatched from and sold by Amazon.</div>
+</body></html>"""
+
+
+# === Server ===
+class MockAmazon:
+    def __init__(self, latency_ms=300, error_rate=0.0, captcha_rate=0.0, fixtures_dir=DEFAULT_FIXTURES, seed=None):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.captcha_rate = captcha_rate
+        self.fixtures_dir = fixtures_dir
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "search": 0, "product": 0, "errors": 0, "captchas": 0, "not_found": 0, "bytes": 0}
+
+    def _fixture(self, *parts):
+        path = os.path.join(self.fixtures_dir, *parts)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        return None
+
+    def respond(self, path):
+        # Returns (status, html) for a request path
+        url = urlparse(path)
+        with self.lock:
+            self.stats["requests"] += 1
+            roll = self.rng.random()
+            jitter = self.rng.uniform(0.5, 1.5)
+        if self.latency_ms:
+            time.sleep(self.latency_ms * jitter / 1000)
+
+        if roll < self.error_rate:
+            return self._count("errors", 503, ERROR_PAGE)
+        if roll < self.error_rate + self.captcha_rate:
+            return self._count("captchas", 200, CAPTCHA_PAGE)
+
+        if url.path.rstrip("/") == "/s":
+            query = parse_qs(url.query)
+            term = query.get("k", [""])[0].replace(" ", "+")
+            page = int(query.get("page", ["1"])[0])
+            html = self._fixture("search", f"{term}_{page}.html") or search_page_html(term, page)
+            return self._count("search", 200, html)
+
+        match = re.search(r"/(?:dp|gp/product)/([A-Z0-9]{10})", url.path)
+        if match:
+            asin = match.group(1)
+            html = self._fixture("product", f"{asin}.html") or product_page_html(asin)
+            return self._count("product", 200, html)
+
+        return self._count("not_found", 404, "<html><body>Page not found</body></html>")
+
+    def _count(self, key, status, html):
+        with self.lock:
+            self.stats[key] += 1
+            self.stats["bytes"] += len(html)
+        return status, html
+
+    def serve(self, host="127.0.0.1", port=0):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/__stats":
+                    with mock.lock:
+                        status, body = 200, json.dumps(mock.stats)
+                else:
+                    status, body = mock.respond(self.path)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def start_mock_server(latency_ms=300, error_rate=0.0, captcha_rate=0.0, fixtures_dir=DEFAULT_FIXTURES, port=0, seed=None):
+    mock = MockAmazon(latency_ms, error_rate, captcha_rate, fixtures_dir, seed)
+    server = mock.serve(port=port)
+    return mock, server, f"http://127.0.0.1:{server.server_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🧪 Local mock amazon.co.uk for offline scraping.")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 503 page")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Share of requests answered with a Robot Check page")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Recorded pages: product/<ASIN>.html, search/<term>_<page>.html")
+    args = parser.parse_args()
+
+    mock, server, base_url = start_mock_server(args.latency_ms, args.error_rate, args.captcha_rate, args.fixtures, args.port)
+    print(f"🧪 Mock Amazon at {base_url} (latency {args.latency_ms:g} ms, errors {args.error_rate:.0%}, captchas {args.captcha_rate:.0%})")
+    print(f"   export AMAZON_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"📊 {mock.stats}")
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,194 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# === CONFIG ===
+DEFAULT_ARCHIVE_DIR = os.environ.get("PAGE_ARCHIVE_DIR", "page_archive")
+
+
+class PageArchive:
+    """Raw HTML of every fetched product page, gzipped and keyed by ASIN and date.
+
+    Layout: <root>/<kind>/<ASIN[:4]>/<ASIN>/<YYYYmmddTHHMMSS>_<sha8>.html.gz.
+    A page identical to the ASIN's latest version is not stored again.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    def _asin_dir(self, asin, kind):
+        return os.path.join(self.root, kind, asin[:4], asin)
+
+    def versions(self, asin, kind="product"):
+        folder = self._asin_dir(asin, kind)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.endswith(".html.gz"))
+
+    def latest(self, asin, kind="product"):
+        versions = self.versions(asin, kind)
+        return versions[-1] if versions else None
+
+    def put(self, asin, html, kind="product", fetched_at=None):
+        data = html.encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()[:8]
+        with self.lock:
+            latest = self.latest(asin, kind)
+            if latest and latest.endswith(f"_{digest}.html.gz"):
+                return latest
+            stamp = datetime.fromtimestamp(fetched_at or time.time()).strftime("%Y%m%dT%H%M%S")
+            folder = self._asin_dir(asin, kind)
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"{stamp}_{digest}.html.gz")
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(tmp, path)
+            return path
+
+    @staticmethod
+    def read(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def iter_latest(self, kind="product"):
+        # (asin, path of its newest page) for every archived ASIN
+        base = os.path.join(self.root, kind)
+        if not os.path.isdir(base):
+            return
+        for prefix in sorted(os.listdir(base)):
+            for asin in sorted(os.listdir(os.path.join(base, prefix))):
+                latest = self.latest(asin, kind)
+                if latest:
+                    yield asin, latest
+
+    def stats(self, kind="product"):
+        asins = pages = size = 0
+        base = os.path.join(self.root, kind)
+        for folder, _, files in os.walk(base):
+            gz = [f for f in files if f.endswith(".html.gz")]
+            if gz:
+                asins += 1
+                pages += len(gz)
+                size += sum(os.path.getsize(os.path.join(folder, f)) for f in gz)
+        return {"asins": asins, "pages": pages, "mb": size / 1e6}
+
+
+_archive = None
+
+
+def get_page_archive():
+    global _archive
+    if _archive is None:
+        _archive = PageArchive()
+    return _archive
+
+
+# === Backfill: re-run the current extractors over the archive ===
+def _extract_batch(paths):
+    # Runs in a pool worker; imports only the pure extractors
+    from extractors import extract_product_page
+
+    results = []
+    for asin, path in paths:
+        try:
+            fields = extract_product_page(PageArchive.read(path))
+        except Exception as e:
+            fields = {"error": str(e)}
+        results.append((asin, fields))
+    return results
+
+
+def apply_fields(product, fields):
+    # Only page-derived fields are replaced, and only with values the page actually had
+    changed = False
+    updates = {
+        "dimensions_cm": fields.get("dimensions_cm"),
+        "material_type": fields.get("material_type"),
+        "raw_product_weight_kg": fields.get("raw_product_weight_kg"),
+        "recyclability": fields.get("recyclability") if fields.get("recyclability") != "Unknown" else None,
+    }
+    if fields.get("raw_product_weight_kg"):
+        updates["estimated_weight_kg"] = round(fields["raw_product_weight_kg"] * 1.05, 2)
+    for key, value in updates.items():
+        if value is not None and product.get(key) != value:
+            product[key] = value
+            changed = True
+    return changed
+
+
+def backfill(archive, store_paths, workers=None, batch_size=200):
+    t0 = time.perf_counter()
+    items = list(archive.iter_latest())
+    batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+
+    extracted, errors = {}, 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for results in pool.map(_extract_batch, batches):
+            for asin, fields in results:
+                if fields is None or "error" in fields:
+                    errors += 1
+                else:
+                    extracted[asin] = fields
+    t_extract = time.perf_counter() - t0
+    print(f"🧪 Re-extracted {len(extracted)} pages ({errors} failed) in {t_extract:.1f}s "
+          f"= {len(items) / max(t_extract, 1e-9):.0f} pages/s")
+
+    # One read and one write per store
+    for path in store_paths:
+        if not os.path.exists(path):
+            print(f"⚠️ {path} not found, skipping.")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            store = json.load(f)
+        products = store.values() if isinstance(store, dict) else store
+        updated = sum(
+            1 for p in products
+            if isinstance(p, dict) and p.get("asin") in extracted and apply_fields(p, extracted[p["asin"]])
+        )
+        if updated:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(store, f, indent=2)
+            os.replace(tmp, path)
+        print(f"💾 {path}: updated {updated} product(s)")
+
+    print(f"✅ Backfill done in {time.perf_counter() - t0:.1f}s")
+    return extracted
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="🗄️ Raw product page archive.")
+    parser.add_argument("--dir", default=DEFAULT_ARCHIVE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Archived ASINs, pages and size")
+
+    show = sub.add_parser("show", help="Print the fields the current extractors derive for an ASIN")
+    show.add_argument("asin")
+
+    fill = sub.add_parser("backfill", help="Re-run the extractors over the archive and update product stores")
+    fill.add_argument("--store", nargs="+", default=["priority_products.json", "bulk_scraped_products.json"])
+    fill.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    fill.add_argument("--batch-size", type=int, default=200)
+
+    args = parser.parse_args()
+    archive = PageArchive(args.dir)
+
+    if args.command == "stats":
+        s = archive.stats()
+        print(f"🗄️ {s['asins']} ASINs, {s['pages']} pages, {s['mb']:.1f} MB")
+    elif args.command == "show":
+        from extractors import extract_product_page
+        latest = archive.latest(args.asin)
+        print(json.dumps(extract_product_page(archive.read(latest)), indent=2) if latest else "Not archived.")
+    else:
+        backfill(archive, args.store, args.workers, args.batch_size)
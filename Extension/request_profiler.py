@@ -0,0 +1,219 @@
+import cProfile
+import hmac
+import io
+import itertools
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+
+from applog import get_logger, request_id_var
+
+# Opt-in per-request profiling. A request is profiled when it carries
+# X-Profile-Token matching PROFILE_TOKEN, or when it is the Nth of a profiled
+# endpoint and PROFILE_SAMPLE_N is set. It runs under cProfile (this thread
+# only) with tracemalloc on, and leaves <id>.prof (pstats) plus <id>.json
+# (timing and top allocation deltas) in PROFILE_DIR, of which the newest
+# PROFILE_KEEP are kept. Nothing is added to unprofiled requests beyond a
+# header check and a counter.
+#
+#   GET /admin/profiles                       newest first
+#   GET /admin/profiles/<id>?top=25&sort=cumulative
+#
+# Both need the token (X-Profile-Token header or ?token=) and 404 when no token is configured.
+
+# === CONFIG ===
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_N = int(os.environ.get("PROFILE_SAMPLE_N", 0))  # 0 = header only
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 50))
+PROFILE_ENDPOINTS = tuple(os.environ.get("PROFILE_ENDPOINTS", "/estimate_emissions,/predict").split(","))
+TOP_ALLOCATIONS = 20
+SORT_KEYS = ("cumulative", "tottime", "ncalls")
+
+log = get_logger("profiler")
+
+
+class _Tracemalloc:
+    # tracemalloc is process-wide; keep it on only while some profiled request is running
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+        self.started_here = False
+
+    def acquire(self):
+        with self.lock:
+            if self.users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started_here = True
+            self.users += 1
+        return tracemalloc.take_snapshot()
+
+    def release(self):
+        snapshot = tracemalloc.take_snapshot()
+        with self.lock:
+            self.users -= 1
+            if self.users == 0 and self.started_here:
+                tracemalloc.stop()
+                self.started_here = False
+        return snapshot
+
+
+_tracing = _Tracemalloc()
+
+
+class RequestProfile:
+    def __init__(self, reason):
+        self.reason = reason
+        self.profiler = cProfile.Profile()
+        self.before = _tracing.acquire()
+        self.start = time.perf_counter()
+        self.profiler.enable()
+
+    def finish(self, path, method, status, out_dir=PROFILE_DIR):
+        self.profiler.disable()
+        elapsed = time.perf_counter() - self.start
+        after = _tracing.release()
+
+        os.makedirs(out_dir, exist_ok=True)
+        # The request id may come from the caller's X-Request-ID
+        rid = re.sub(r"[^A-Za-z0-9_-]", "", request_id_var.get())[:32] or "anon"
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}_{rid}"
+        self.profiler.dump_stats(os.path.join(out_dir, profile_id + ".prof"))
+
+        diffs = after.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)]).compare_to(
+            self.before, "lineno")
+        meta = {
+            "id": profile_id,
+            "path": path,
+            "method": method,
+            "status": status,
+            "reason": self.reason,
+            "duration_ms": round(elapsed * 1000, 2),
+            "created": time.time(),
+            # Process-wide: includes whatever other threads allocated meanwhile
+            "alloc_net_kb": round(sum(d.size_diff for d in diffs) / 1024, 1),
+            "top_allocations": [
+                {"where": str(d.traceback[0]), "size_diff_kb": round(d.size_diff / 1024, 1), "count_diff": d.count_diff}
+                for d in diffs[:TOP_ALLOCATIONS]
+            ],
+        }
+        tmp = os.path.join(out_dir, profile_id + ".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, os.path.join(out_dir, profile_id + ".json"))
+        rotate(out_dir)
+        log.info("🔬 Profiled %s %s (%s) in %.1f ms → %s", method, path, self.reason, elapsed * 1000, profile_id)
+        return meta
+
+    def abandon(self):
+        # The view raised before after_request: stop profiling this thread, save nothing
+        self.profiler.disable()
+        _tracing.release()
+
+
+# === Profile store ===
+def list_profiles(out_dir=PROFILE_DIR):
+    if not os.path.isdir(out_dir):
+        return []
+    metas = []
+    for name in sorted(os.listdir(out_dir), reverse=True):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(out_dir, name), "r", encoding="utf-8") as f:
+                    metas.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return metas
+
+
+def rotate(out_dir=PROFILE_DIR, keep=PROFILE_KEEP):
+    for meta in list_profiles(out_dir)[keep:]:
+        for ext in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(out_dir, meta["id"] + ext))
+            except OSError:
+                pass
+
+
+def top_functions(profile_id, top=25, sort="cumulative", out_dir=PROFILE_DIR):
+    path = os.path.join(out_dir, os.path.basename(profile_id) + ".prof")
+    if not os.path.exists(path):
+        return None
+    stats = pstats.Stats(path, stream=io.StringIO())
+    stats.sort_stats(sort if sort in SORT_KEYS else "cumulative")
+    rows = []
+    for func in stats.fcn_list[:top]:
+        cc, ncalls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})" if line else name,
+            "ncalls": ncalls,
+            "primitive_calls": cc,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    return rows
+
+
+# === Flask wiring ===
+def install_profiling(app):
+    from flask import abort, g, jsonify, request
+
+    counter = itertools.count(1)
+
+    def _token_ok():
+        if not PROFILE_TOKEN:
+            return False
+        supplied = request.headers.get("X-Profile-Token") or request.args.get("token") or ""
+        return hmac.compare_digest(supplied.encode(), PROFILE_TOKEN.encode())
+
+    @app.before_request
+    def _maybe_start_profile():
+        if not request.path.startswith(PROFILE_ENDPOINTS):
+            return
+        reason = None
+        if request.headers.get("X-Profile-Token") and _token_ok():
+            reason = "header"
+        elif PROFILE_SAMPLE_N and next(counter) % PROFILE_SAMPLE_N == 0:
+            reason = f"sampled 1/{PROFILE_SAMPLE_N}"
+        if reason:
+            g.request_profile = RequestProfile(reason)
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            try:
+                meta = profile.finish(request.path, request.method, response.status_code)
+                response.headers["X-Profile-Id"] = meta["id"]
+            except Exception as e:
+                log.warning("⚠️ Could not save request profile: %s", e)
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(exc):
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            profile.abandon()
+
+    @app.route("/admin/profiles")
+    def admin_profiles():
+        if not _token_ok():
+            abort(404)
+        return jsonify(list_profiles())
+
+    @app.route("/admin/profiles/<profile_id>")
+    def admin_profile(profile_id):
+        if not _token_ok():
+            abort(404)
+        rows = top_functions(profile_id, request.args.get("top", 25, type=int), request.args.get("sort", "cumulative"))
+        if rows is None:
+            abort(404)
+        meta = next((m for m in list_profiles() if m["id"] == profile_id), {})
+        return jsonify({**meta, "top_functions": rows})
+
+    return app
@@ -1,6 +1,4 @@
-# As a temporary workaround, try this at the top of the file
 import sys
-print(sys.executable)
 import csv
 import os
 import json
@@ -8,6 +6,8 @@ import random
 import re
 import time
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlparse
 
 
 
@@ -25,39 +25,94 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from brand_enrichment import BrandEnrichmentQueue
+from extractors import (
+    SEARCH_BRAND_SELECTOR, SEARCH_CARD_SELECTOR, SEARCH_LINK_SELECTOR, SEARCH_TITLE_SELECTORS,
+    extract_asin, extract_recyclability, extract_weight, normalize_brand, parse_spec_blobs,
+    weight_from_spec_cells,
+)
+from vocabulary import canonical
+from page_archive import get_page_archive
+from metrics import ORIGIN_SOURCES, SCRAPE_RESULTS
+from applog import SampledLogger, get_logger
+from browser_profile import (
+    FAST_PROFILE, HUMAN_DELAYS, apply_fast_profile, enable_resource_blocking, human_pause, wait_for_any,
+)
+from geo import distance_origin_to_fulfillment, distance_origin_to_uk_hub, origin_hubs
+
 fallback_mode = False
 
+# === Target site (point at mock_amazon.py for offline runs and benchmarks) ===
+AMAZON_BASE_URL = os.environ.get("AMAZON_BASE_URL", "https://www.amazon.co.uk").rstrip("/")
+# Ask a human to solve CAPTCHAs only when someone is at the terminal
+INTERACTIVE_CAPTCHA = (
+    os.environ.get("SCRAPER_INTERACTIVE_CAPTCHA", "1") == "1" and sys.stdin is not None and sys.stdin.isatty()
+)
+
+
+def on_amazon_base(url):
+    # Same path and query on AMAZON_BASE_URL (a no-op against the live site)
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return AMAZON_BASE_URL + "/" + url.lstrip("/")
+    rest = url[len(f"{parsed.scheme}://{parsed.netloc}"):]
+    return AMAZON_BASE_URL + rest
+
+
+# === Crawl space for __main__ (split across workers by shard_crawl.py) ===
+SEARCH_TERMS = [
+    "usb+c+charger", "eco+friendly+bottle", "coffee+mug", "mechanical+keyboard",
+    "shampoo", "wireless+earbuds", "reusable+bag", "portable+fan", "toothbrush",
+    "led+lamp", "bamboo cutlery", "compostable bag", "metal straw", "plastic container",
+    "fabric tote", "glass bottle", "stainless steel mug", "wooden spoon",
+    "eco friendly notebooks", "recycled stationery", "canvas shopping bag",
+    "solar power bank", "eco friendly phone case" ,"stainless steel lunchbox",
+    "reusable baking mat", "recycled paper towels", "compost bin kitchen",
+    "refillable deodorant", "eco friendly shampoo", "solid shampoo bar", "bamboo razor",
+    "sustainable soap", "bamboo toothbrush", "reusable straws", "organic cotton bag"
+]
+SEARCH_PAGES = range(1, 8)
+
 
 # === Load custom brand location metadata ===
 
+log = get_logger("scraper")
+# Per-search-card events: dozens per page, so only a sample is kept at DEBUG
+card_log = SampledLogger(log)
+log.debug("Python: %s", sys.executable)
+
+
 class Log:
+    # Older callers (bulk_scrape_scheduler); goes through the structured logger
     @staticmethod
-    def info(msg): print(f"\033[94mℹ️ {msg}\033[0m")
+    def info(msg): log.info(msg)
     @staticmethod
-    def success(msg): print(f"\033[92m✅ {msg}\033[0m")
+    def success(msg): log.info(msg)
     @staticmethod
-    def warn(msg): print(f"\033[93m⚠️ {msg}\033[0m")
+    def warn(msg): log.warning(msg)
     @staticmethod
-    def error(msg): print(f"\033[91m❌ {msg}\033[0m")
+    def error(msg): log.error(msg)
+
+class ScrapeBlocked(Exception):
+    pass
+
 
 def safe_get(driver, url, retries=3, wait=10):
     for i in range(retries):
         try:
-            if not safe_get(driver, url):
-                Log.error(f"🛑 Giving up on URL: {url}")
-                return []  # Or return None / skip product depending on context
-
+            driver.get(url)
 
             # Check for common Amazon anti-bot pages
             page_source = driver.page_source.lower()
             if "service unavailable" in page_source or "robot check" in page_source or "we're sorry" in page_source:
-                Log.warn(f"🚫 Blocked or 503 at {url}. Retrying ({i+1}/{retries})...")
+                log.warning("🚫 Blocked or 503 at %s. Retrying (%s/%s)...", url, i + 1, retries)
                 time.sleep(wait * (i+1))
                 continue
 
             return True  # success
         except Exception as e:
-            Log.warn(f"❌ Failed to load {url} (attempt {i+1}): {e}")
+            log.warning("❌ Failed to load %s (attempt %s): %s", url, i + 1, e)
             time.sleep(wait * (i+1))
     return False
 
@@ -67,20 +122,20 @@ priority_products = {}
 try:
     with open("priority_products.json", "r", encoding="utf-8") as f:
         priority_products = json.load(f)
-    Log.success(f"✅ Loaded {len(priority_products)} high-accuracy products.")
+    log.info("✅ Loaded %s high-accuracy products.", len(priority_products))
 except FileNotFoundError:
-    Log.warn("priority_products.json not found. Starting with empty product DB.")
+    log.warning("priority_products.json not found. Starting with empty product DB.")
 except Exception as e:
-    Log.error(f"Error loading priority product DB: {e}")
+    log.error("Error loading priority product DB: %s", e)
 
 
 brand_locations = {}
 try:
     with open("brand_locations.json", "r", encoding="utf-8") as f:
         brand_locations = json.load(f)
-    Log.success(f"📦 Loaded {len(brand_locations)} custom brand locations.")
+    log.info("📦 Loaded %s custom brand locations.", len(brand_locations))
 except Exception as e:
-    Log.warn(f" Could not load brand_locations.json: {e}")
+    log.warning(" Could not load brand_locations.json: %s", e)
 
 
 # === CONFIG ===
@@ -91,12 +146,13 @@ chrome_options.add_argument("--headless")
 chrome_options.add_argument("--log-level=3")
 chrome_options.add_argument("window-size=1280,800")  # 🖥️ Simulate realistic screen
 chrome_options.add_argument("--lang=en-GB")  # Optional: browser language
+apply_fast_profile(chrome_options)
 
 
 # 🧢 Rotate user-agent for stealth
 random_user_agent = ua.random
 chrome_options.add_argument(f"user-agent={random_user_agent}")
-Log.info(f"🧢 Using User-Agent: {random_user_agent}")
+log.info("🧢 Using User-Agent: %s", random_user_agent)
 
 
 
@@ -112,23 +168,8 @@ try:
                 "city": row["hq_city"]
             }
 except FileNotFoundError:
-    Log.warn("brand_origins.csv not found. Defaulting to heuristic mapping.")
-
-
-origin_hubs = {
-    "China": {"lat": 31.2304, "lon": 121.4737, "city": "Shanghai"},
-    "Germany": {"lat": 50.1109, "lon": 8.6821, "city": "Frankfurt"},
-    "USA": {"lat": 37.7749, "lon": -122.4194, "city": "San Francisco"},
-    "Japan": {"lat": 35.6895, "lon": 139.6917, "city": "Tokyo"},
-    "UK": {"lat": 51.509865, "lon": -0.118092, "city": "London"},
-    "Italy": {"city": "Castel San Giovanni", "lat": 45.0667, "lon": 9.4167},
-    "India": {"lat": 28.6139, "lon": 77.2090, "city": "New Delhi"},
-    "South Korea": {"lat": 37.5665, "lon": 126.9780, "city": "Seoul"},
-    "Spain": {"lat": 40.4168, "lon": -3.7038, "city": "Madrid"},
-    "Poland": {"lat": 52.2297, "lon": 21.0122, "city": "Warsaw"},
-    "Netherlands": {"lat": 52.3676, "lon": 4.9041, "city": "Amsterdam"},
-}
-uk_hub = {"lat": 51.8821, "lon": -0.5057, "city": "Dunstable"}
+    log.warning("brand_origins.csv not found. Defaulting to heuristic mapping.")
+
 
 known_brand_origins = {
     "huel": "UK",
@@ -157,50 +198,6 @@ known_brand_origins = {
 }
 
 
-amazon_fulfillment_centers = {
-    "UK": {"lat": 51.8821, "lon": -0.5057, "city": "Dunstable"},
-    "Germany": {"lat": 50.1109, "lon": 8.6821, "city": "Frankfurt"},
-    "France": {"lat": 48.8566, "lon": 2.3522, "city": "Paris"},
-    "Italy": {"lat": 45.0667, "lon": 9.4167, "city": "Castel San Giovanni"},
-    "USA": {"lat": 37.7749, "lon": -122.4194, "city": "San Francisco"},
-    "Spain": {"lat": 40.4168, "lon": -3.7038, "city": "Madrid"},
-    "Netherlands": {"lat": 52.3676, "lon": 4.9041, "city": "Amsterdam"},
-    "Poland": {"lat": 52.2297, "lon": 21.0122, "city": "Warsaw"},
-}
-
-
-def fuzzy_normalize_origin(raw_origin):
-    if not raw_origin:
-        return "Unknown"
-
-    origin = raw_origin.strip().lower()
-
-    # Keyword-based fuzzy mapping
-    fuzzy_map = {
-        "uk": ["united kingdom", "uk", "england", "scotland", "wales"],
-        "usa": ["united states", "united states of america", "us", "usa"],
-        "china": ["china", "prc"],
-        "germany": ["germany"],
-        "france": ["france"],
-        "italy": ["italy"],
-        "japan": ["japan"],
-        "ireland": ["ireland", "eire"],
-        "netherlands": ["netherlands", "holland"],
-        "canada": ["canada"],
-        "switzerland": ["switzerland"],
-        "australia": ["australia"],
-        "sweden": ["sweden"],
-        "finland": ["finland"],
-        "mexico": ["mexico"],
-    }
-
-    for country, keywords in fuzzy_map.items():
-        if any(keyword in origin for keyword in keywords):
-            return country.title()
-
-    return raw_origin.title()
-
-
 def estimate_origin_country(title):
     title = title.lower()
     if "huawei" in title:
@@ -233,7 +230,7 @@ def extract_shipping_origin(driver):
             elif "france" in text:
                 return "France"
     except Exception as e:
-        Log.warn(f"⚠️ Could not extract shipping origin: {e}")
+        log.warning("⚠️ Could not extract shipping origin: %s", e)
     return None
 
 
@@ -254,76 +251,17 @@ def maybe_add_to_priority(product, priority_db, save_path="priority_products.jso
         product["confidence"] = "High"
         priority_db[asin] = product
 
-        with open(save_path, "w", encoding="utf-8") as f:
-            json.dump(priority_db, f, indent=2)
+        if save_path:
+            with open(save_path, "w", encoding="utf-8") as f:
+                json.dump(priority_db, f, indent=2)
         
-        Log.success(f"🔐 Added {asin} to priority_products.json")
+        log.info("🔐 Added %s to priority_products.json", asin)
         return True
     
     return False
 
 
 
-def extract_asin(url):
-    match = re.search(r"/dp/([A-Z0-9]{10})", url)
-    if not match:
-        match = re.search(r"/gp/product/([A-Z0-9]{10})", url)
-    if not match:
-        match = re.search(r"/product/([A-Z0-9]{10})", url)
-    if not match:
-        match = re.search(r"/([A-Z0-9]{10})(?:[/?]|$)", url)
-    return match.group(1) if match else None
-
-
-def extract_weight(text):
-    if not text:
-        return None
-
-    text = text.lower()
-
-    # 1. Match kg first (also handles "kilogram" or "kilograms")
-    kg_match = re.search(r"([\d.]+)\s?(kg|kilogram|kilograms)", text)
-    if kg_match:
-        return round(float(kg_match.group(1)), 3)
-
-    # 2. Match grams
-    g_match = re.search(r"([\d.]+)\s?g", text)
-    if g_match:
-        return round(float(g_match.group(1)) / 1000, 3)
-
-    return None
-
-
-
-
-def extract_dimensions(text):
-    match = re.search(r"(\d+(?:\.\d+)?)\s?[x×*]\s?(\d+(?:\.\d+)?)\s?[x×*]\s?(\d+(?:\.\d+)?)(?:\s?cm|centimeters?)", text)
-    if match:
-        return f"{match.group(1)} x {match.group(2)} x {match.group(3)} cm"
-    return None
-
-
-def extract_material(text):
-    match = re.search(r"(?:material|made of|composition)[\s:]+([a-z\s\-]+)", text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip().title()
-    return None
-
-
-
-
-
-
-
-def haversine(lat1, lon1, lat2, lon2):
-    from math import radians, cos, sin, sqrt, atan2
-    R = 6371
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
-
 def is_invalid_brand(candidate):
     candidate = candidate.lower()
     return (
@@ -362,7 +300,7 @@ def resolve_brand_origin(brand_key, title_fallback=None):
 
     # 4. Fallback — guess using product title, and save to brand_locations
     else:
-        Log.warn(f"⚠️ Unrecognized brand: {brand_key}")
+        log.warning("⚠️ Unrecognized brand: %s", brand_key)
         if title_fallback:
             guessed_country = estimate_origin_country(title_fallback)
             guessed_city = origin_hubs.get(guessed_country, origin_hubs["UK"])["city"]
@@ -371,10 +309,11 @@ def resolve_brand_origin(brand_key, title_fallback=None):
                     "country": guessed_country,
                     "city": guessed_city
                 },
-                "fulfillment": "UK"
+                "fulfillment": "UK",
+                "source": "title_guess"
             }
             save_brand_locations()
-            Log.success(f"📦 Learned origin from title: {brand_key} → {guessed_country}")
+            log.info("📦 Learned origin from title: %s → %s", brand_key, guessed_country)
             return guessed_country, guessed_city
 
         # 5. Log unknown brand
@@ -383,8 +322,8 @@ def resolve_brand_origin(brand_key, title_fallback=None):
             with open("unrecognized_brands.txt", "w", encoding="utf-8") as f:
                 f.write("")  # create an empty file
 
-        with open("unrecognized_brands.txt", "a", encoding="utf-8") as log:
-            log.write(f"{brand_key}\n")
+        with open("unrecognized_brands.txt", "a", encoding="utf-8") as unrecognized:
+            unrecognized.write(f"{brand_key}\n")
         return "Unknown", "Unknown"
     
 
@@ -407,10 +346,11 @@ def infer_fulfillment_country(url, sold_by_text=""):
     return "UK"  # fallback default
 
 def save_brand_locations():
-    global brand_locations
+    # Copy first: enrichment commits run on a background thread
+    snapshot = dict(brand_locations)
     with open("brand_locations.json", "w", encoding="utf-8") as f:
-        json.dump(brand_locations, f, indent=2)
-        Log.success(f"📦 Saved updated brand_locations.json with {len(brand_locations)} entries.")
+        json.dump(snapshot, f, indent=2)
+        log.info("📦 Saved updated brand_locations.json with %s entries.", len(brand_locations))
 
 def safe_save_brand_origin(brand_key, country, city="Unknown"):
     if not country or country.lower() == "unknown":
@@ -428,74 +368,43 @@ def safe_save_brand_origin(brand_key, country, city="Unknown"):
             "fulfillment": "UK"
         }
         save_brand_locations()
-        Log.success(f"📦 Inferred and saved origin for {brand_key}: {country}")
+        log.info("📦 Inferred and saved origin for %s: %s", brand_key, country)
 
 
-def enrich_brand_location(brand_name, example_url):
-    global brand_locations
+# === Brand enrichment (background, see brand_enrichment.py) ===
+@lru_cache(maxsize=1)
+def chromedriver_path():
+    return ChromeDriverManager().install()
 
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    driver.get(example_url)
 
-    try:
-        text_blobs = []
-        legacy_specs = []
+def make_enrichment_driver():
+    driver = webdriver.Chrome(service=Service(chromedriver_path()), options=chrome_options)
+    enable_resource_blocking(driver)
+    return driver
 
-        # Try pulling merchant info or description
-        try:
-            merchant = driver.find_element(By.ID, "merchant-info").text
-            text_blobs.append(merchant)
-        except:
-            pass
 
-        try:
-            desc = driver.find_element(By.ID, "productDescription").text
-            text_blobs.append(desc)
-        except:
-            pass
+def commit_brand_locations(results):
+    # Page evidence wins over title guesses made while the lookup was queued
+    for brand_name, (country, city) in results.items():
+        current = brand_locations.get(brand_name)
+        if current is None or current.get("source") == "title_guess":
+            brand_locations[brand_name] = {
+                "origin": {
+                    "country": country,
+                    "city": city
+                },
+                "fulfillment": "UK"
+            }
+    save_brand_locations()
 
-        try:
-            bullets = driver.find_elements(By.CSS_SELECTOR, "#feature-bullets li")
-            text_blobs += [b.text for b in bullets]
-        except:
-            pass
-
-        for blob in text_blobs:
-            blob = blob.lower()
-            if "made in" in blob or "manufactured in" in blob:
-                match = re.search(r"(made|manufactured)\s+in\s+([a-z\s,]+)", blob)
-                if match:
-                    location = match.group(2).strip().title()
-                    country = location.split(",")[-1].strip()
-                    city = location.split(",")[0].strip() if "," in location else "Unknown"
-
-                    print(f"🔍 Guessed: {brand_name} → {city}, {country}")
-
-                    brand_locations[brand_name] = {
-                        "origin": {
-                            "country": country,
-                            "city": city
-                        },
-                        "fulfillment": "UK"
-                    }
-                     # 🚀 Save it instantly
-                    save_brand_locations()
-                    return
-
-        print(f"❌ No location found for: {brand_name}")
 
-    finally:
-        driver.quit()
+enrichment_queue = BrandEnrichmentQueue(make_enrichment_driver, commit_brand_locations)
 
-# Example enrichment script
-# Ensure the unrecognized_brands.txt file exists before reading
-if not os.path.exists("unrecognized_brands.txt"):
-    with open("unrecognized_brands.txt", "w", encoding="utf-8") as f:
-        f.write("")  # just creates the file if it doesn't exist
 
-with open("unrecognized_brands.txt", "r", encoding="utf-8") as f:
-    brands_to_enrich = set(line.strip() for line in f if line.strip())
+def enrich_brand_location(brand_name, example_url):
+    # Non-blocking: queued once per brand, callers carry on with the best origin they have
+    return enrichment_queue.submit(brand_name, on_amazon_base(example_url))
+
 
 # Dummy mapping — replace with real example URLs per brand
 example_urls = {
@@ -504,6 +413,28 @@ example_urls = {
     "avm": "https://www.amazon.co.uk/dp/B01N8S4URO"
 }
 
+
+def enrich_unrecognized_brands():
+    # Example enrichment script (run from __main__ only: importing this module
+    # must not start the background enrichment browsers)
+    # Ensure the unrecognized_brands.txt file exists before reading
+    if not os.path.exists("unrecognized_brands.txt"):
+        with open("unrecognized_brands.txt", "w", encoding="utf-8") as f:
+            f.write("")  # just creates the file if it doesn't exist
+
+    with open("unrecognized_brands.txt", "r", encoding="utf-8") as f:
+        brands_to_enrich = set(line.strip() for line in f if line.strip())
+
+    for brand in brands_to_enrich:
+        if brand in example_urls:
+            enrich_brand_location(brand, example_urls[brand])
+
+    # ✅ Save to JSON here, after loop is complete
+    with open("brand_locations.json", "w", encoding="utf-8") as f:
+        json.dump(brand_locations, f, indent=2)
+        log.info("📦 Saved updated brand_locations.json with %s entries.", len(brand_locations))
+
+
 def finalize_product_entry(product):
     """
     Ensures product has all required fields: origin, city, weight.
@@ -523,7 +454,7 @@ def finalize_product_entry(product):
         fallback_weight = extract_weight(title)
         if fallback_weight:
             product["estimated_weight_kg"] = fallback_weight
-            Log.warn(f"⚖️ Fallback weight from title: {fallback_weight} kg")
+            log.warning("⚖️ Fallback weight from title: %s kg", fallback_weight)
 
     # Save to cleaned products
     try:
@@ -537,43 +468,59 @@ def finalize_product_entry(product):
         cleaned.append(product)
         with open(cleaned_path, "w", encoding="utf-8") as f:
             json.dump(cleaned, f, indent=2)
-        Log.success("🧽 Product added to cleaned_products.json")
+        log.info("🧽 Product added to cleaned_products.json")
     except Exception as e:
-        Log.warn(f"⚠️ Could not write to cleaned_products.json: {e}")
+        log.warning("⚠️ Could not write to cleaned_products.json: %s", e)
 
     # Save to priority products if high quality
     maybe_add_to_priority(product, priority_products)
 
 
-for brand in brands_to_enrich:
-    if brand in example_urls:
-        enrich_brand_location(brand, example_urls[brand])
-
-# ✅ Save to JSON here, after loop is complete
-with open("brand_locations.json", "w", encoding="utf-8") as f:
-    json.dump(brand_locations, f, indent=2)
-    Log.success(f"📦 Saved updated brand_locations.json with {len(brand_locations)} entries.")
 
+# === SCRAPER for search result pages ===
+# === Search result cards ===
+# Runs in the page: every field of every card in a single WebDriver call
+SEARCH_CARDS_JS = """
+const [cardSelector, titleSelectors, linkSelector, brandSelector] = arguments;
+const cards = [];
+for (const el of document.querySelectorAll(cardSelector)) {
+    const asin = el.getAttribute("data-asin");
+    if (!asin) continue;
+    const link = el.querySelector(linkSelector);
+    let title = null;
+    for (const sel of titleSelectors) {
+        const t = el.querySelector(sel);
+        if (t && t.innerText.trim()) { title = t.innerText.trim(); break; }
+    }
+    const brandEl = el.querySelector(brandSelector);
+    cards.push({
+        asin: asin,
+        href: link ? link.href : null,
+        title: title,
+        brand_attr: el.getAttribute("data-brand"),
+        brand_text: brandEl ? brandEl.innerText.trim() : null,
+        aria_label: el.getAttribute("aria-label"),
+        text: el.innerText || "",
+    });
+}
+const techDetails = Array.from(document.querySelectorAll("#prodDetails td"), td => td.innerText);
+return {cards: cards, tech_details: techDetails};
+"""
 
-def extract_recyclability(text_blobs):
-    full_text = " ".join(text_blobs).lower()
-    if any(kw in full_text for kw in ["100% recyclable", "fully recyclable", "recyclable packaging"]):
-        return "High"
-    elif any(kw in full_text for kw in ["partially recycled", "made from recycled", "recycled content"]):
-        return "Medium"
-    elif any(kw in full_text for kw in ["not recyclable", "non-recyclable", "plastic packaging"]):
-        return "Low"
-    return "Unknown"
 
+def extract_search_cards(driver):
+    result = driver.execute_script(
+        SEARCH_CARDS_JS, SEARCH_CARD_SELECTOR, SEARCH_TITLE_SELECTORS, SEARCH_LINK_SELECTOR, SEARCH_BRAND_SELECTOR
+    ) or {}
+    return result.get("cards", []), result.get("tech_details", [])
 
 
-# === SCRAPER for search result pages ===
-def scrape_amazon_titles(url, max_items=100):
+def scrape_amazon_titles(url, max_items=100, raise_on_block=False):
 
     import undetected_chromedriver as uc
-    options = uc.ChromeOptions()
+    options = apply_fast_profile(uc.ChromeOptions())
     driver = uc.Chrome(options=options)
-    global brand_locations # potential bug fix
+    enable_resource_blocking(driver)
     #driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
 
 
@@ -587,104 +534,88 @@ def scrape_amazon_titles(url, max_items=100):
     # options.headless = True
 
 
+    url = on_amazon_base(url)
     if not safe_get(driver, url):
-        Log.error(f"🛑 Giving up on URL: {url}")
+        log.error("🛑 Giving up on URL: %s", url)
+        driver.quit()
+        if raise_on_block:
+            raise ScrapeBlocked(url)
         return []  # Or return None / skip product depending on context
 
 
     try:
-        print("📍 Waiting for product title...")
+        log.debug("📍 Waiting for product title...")
 
         WebDriverWait(driver, 20).until(
             EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.s-main-slot div[data-asin]"))
         )
     except:
-        print("❌ Could not find product containers.")
+        log.warning("❌ Could not find product containers.")
         driver.quit()
         return []
 
-    time.sleep(2)
+    human_pause(2, 2)
 
-    product_elements = driver.find_elements(By.CSS_SELECTOR, "div.s-main-slot div[data-asin]")
-    print(f"🔍 Found {len(product_elements)} items")
+    # One round-trip for every card on the page; the loop below is pure in-memory work
+    cards, tech_details = extract_search_cards(driver)
+    log.info("🔍 Found %s items", len(cards))
+
+    known_brands = list(known_brand_origins.keys()) + list(brand_origin_lookup.keys())
+    spec_weight = weight_from_spec_cells(tech_details)
 
     products = []
-    for product in product_elements:
+    for card in cards:
         if len(products) >= max_items:
             break
 
         try:
-            asin = product.get_attribute("data-asin")
-            if not asin:
+            asin = card["asin"]
+            href = card["href"]
+            title = card["title"]
+            if not asin or not href:
                 continue
 
-            link_el = product.find_element(By.CSS_SELECTOR, "a.a-link-normal.s-no-outline")
-            href = link_el.get_attribute("href")
-
-            title = None
-            title_selectors = [
-                "span.a-size-medium.a-color-base.a-text-normal",
-                "span.a-size-base-plus.a-color-base.a-text-normal",
-                "h2 span"
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    title_el = product.find_element(By.CSS_SELECTOR, selector)
-                    title = title_el.text.strip()
-                    if title:
-                        break
-                except:
-                    continue
-
             if not title:
-                print("❌ Skipping: Could not find product title")
+                card_log.debug("❌ Skipping: Could not find product title")
                 continue
-            
 
-
-            
             # === BRAND DETECTION ===
             brand = None
 
             # 1. Try data-brand
-            brand_attr = product.get_attribute("data-brand")
+            brand_attr = card["brand_attr"]
             if brand_attr and len(brand_attr.strip()) > 1:
                 brand = brand_attr.strip()
 
             # 2. Try known selectors
-            if not brand:
-                try:
-                    el = product.find_element(By.CSS_SELECTOR, "h5.s-line-clamp-1 span.a-size-base")
-                    brand = el.text.strip()
-                except:
-                    pass
+            if not brand and card["brand_text"] is not None:
+                brand = card["brand_text"]
+
             #2.5. trying aria-label attributes
-            aria_label = product.get_attribute("aria-label")
+            aria_label = card["aria_label"]
             if aria_label:
-                for known_brand in list(known_brand_origins.keys()) + list(brand_origin_lookup.keys()):
+                for known_brand in known_brands:
                     if known_brand in aria_label.lower():
                         brand = known_brand.capitalize()
-                        Log.info(f"🔍 Inferred brand from aria-label: {brand}")
+                        card_log.debug("🔍 Inferred brand from aria-label: %s", brand)
                         break
 
             # 3. Try scanning title for known brands
             if not brand:
-                for known_brand in list(known_brand_origins.keys()) + list(brand_origin_lookup.keys()):
+                for known_brand in known_brands:
                     if known_brand in title.lower():
                         brand = known_brand.capitalize()
                         break
-                    
-            #3.5. Full product block text scrape (last proper resort)      
+
+            #3.5. Full product block text scrape (last proper resort)
             if not brand:
-                full_text = product.text.lower()
-                for known_brand in list(known_brand_origins.keys()) + list(brand_origin_lookup.keys()):
+                full_text = card["text"].lower()
+                for known_brand in known_brands:
                     if known_brand in full_text:
                         brand = known_brand.capitalize()
-                        Log.info(f"🧾 Matched brand from full block text: {brand}")
+                        card_log.debug("🧾 Matched brand from full block text: %s", brand)
                         break
 
-
             # 4. Fallback to first word
             if not brand:
                 fallback = title.split()[0].lower()
@@ -695,72 +626,34 @@ def scrape_amazon_titles(url, max_items=100):
 
             # Final guard
             if brand.lower() == "unknown":
-                Log.warn(f"⚠️ Captured unknown brand from title: {title}")
-                # Ensure the file exists
-                if not os.path.exists("unrecognized_brands.txt"):
-                    with open("unrecognized_brands.txt", "w", encoding="utf-8") as f:
-                        f.write("")  # create an empty file
-
-                with open("unrecognized_brands.txt", "a", encoding="utf-8") as log:
-                    log.write(f"{brand_key}\n")
-
-
+                card_log.info("⚠️ Captured unknown brand from title: %s", title)
+                continue
 
+            card_log.debug("🛒 %s", title)
 
-            print("🛒", title)
-            
             brand_key = brand.lower().strip()
-            # Try to enrich brand location if unknown
+            # Queue a background lookup if the brand is unknown; the origin below is the best guess for now
             if brand_key not in brand_locations:
-                enrich_brand_location(brand_key, href)  # call live scraper
-                # Reload JSON after enrichment
-                try:
-                    with open("brand_locations.json", "r", encoding="utf-8") as f:
-                        brand_locations = json.load(f)
-                    Log.success(f"📦 Updated brand_locations.json after enriching {brand_key}")
-                except Exception as e:
-                    Log.warn(f"⚠️ Failed to reload brand_locations after enriching {brand_key}: {e}")
+                enrich_brand_location(brand_key, href)
 
             # Use resolved location
             origin_country, origin_city = resolve_brand_origin(brand_key)
 
-                  
-            origin = origin_hubs.get(origin_country, origin_hubs["UK"])
             fulfillment_country = infer_fulfillment_country(href)  # or use `url` in the product page
-            fulfillment_hub = amazon_fulfillment_centers.get(fulfillment_country, amazon_fulfillment_centers["UK"])
-            distance = round(haversine(origin["lat"], origin["lon"], fulfillment_hub["lat"], fulfillment_hub["lon"]), 1)
-
-
-            weight = None
-            try:
-                # Try scraping tech specs first
-                tech_details = driver.find_elements(By.CSS_SELECTOR, "#prodDetails td")
-                for i in range(len(tech_details) - 1):
-                    label = tech_details[i].text.lower()
-                    value = tech_details[i + 1].text.lower()
-                    if "weight" in label:
-                        weight = extract_weight(value)
-                        print(f"⚖️ Extracted from tech spec: {weight} kg")
-                        break
-
-                # Only fallback after the loop
-                if not weight:
-                    extracted_weight = extract_weight(title)
-                    if extracted_weight:
-                        weight = extracted_weight
-                        print(f"⚠️ Fallback used — extracted from title: {weight} kg")
+            distance = round(distance_origin_to_fulfillment(origin_country, fulfillment_country), 1)
 
-                       
-            except:
-                pass
+            # Tech specs first, title as fallback
+            weight = spec_weight
+            if weight:
+                card_log.debug("⚖️ Extracted from tech spec: %s kg", weight)
+            else:
+                weight = extract_weight(title)
+                if weight:
+                    card_log.debug("⚠️ Fallback used — extracted from title: %s kg", weight)
 
             if not origin_country or origin_country.lower() in ["unknown", "other", ""]:
                 origin_country, origin_city = resolve_brand_origin(brand_key, title)
 
-            if not weight:
-                weight = extract_weight(title)
-                        
-
             products.append({
                 "asin": asin,
                 "title": title,
@@ -774,9 +667,10 @@ def scrape_amazon_titles(url, max_items=100):
             })
 
         except Exception as e:
-            print("⚠️ Skipping product due to error:", e)
+            log.warning("⚠️ Skipping product due to error: %s", e)
 
-        # Save to cleaned_products.json
+    # Save to cleaned_products.json (once per page rather than once per card)
+    if products:
         try:
             cleaned_path = "cleaned_products.json"
             if os.path.exists(cleaned_path):
@@ -785,14 +679,13 @@ def scrape_amazon_titles(url, max_items=100):
             else:
                 cleaned = []
 
-            cleaned.append(product)
+            cleaned.extend(products)
             with open(cleaned_path, "w", encoding="utf-8") as f:
                 json.dump(cleaned, f, indent=2)
-            Log.success("🧽 Product added to cleaned_products.json")
-            
-            
+            log.info("🧽 %s product(s) added to cleaned_products.json", len(products))
+
         except Exception as e:
-            Log.warn(f"⚠️ Could not write to cleaned_products.json: {e}")
+            log.warning("⚠️ Could not write to cleaned_products.json: %s", e)
 
     driver.quit()
     return products
@@ -802,17 +695,15 @@ import os
 
 IS_DOCKER = os.environ.get('IS_DOCKER', 'false').lower() == 'true'
 
-def scrape_amazon_product_page(amazon_url, fallback=False):
+def scrape_amazon_product_page(amazon_url, fallback=False, user_data_dir="selenium_profile"):
     if IS_DOCKER:
         fallback = True
-        
-    import undetected_chromedriver as uc
-    options = uc.ChromeOptions()
-    driver = uc.Chrome(options=options)
-    print("🧪 Inside scraper function, fallback mode is:", fallback)
+
+    log.debug("🧪 Inside scraper function, fallback mode is: %s", fallback)
 
     if fallback:
-        print("🟡 Using fallback mode, returning mock product.")
+        log.info("🟡 Using fallback mode, returning mock product.")
+        SCRAPE_RESULTS.inc(tier="fallback")
         return {
             "title": "Test Product (Fallback Mode)",
             "origin": "Unknown",
@@ -830,16 +721,19 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
     
     
     try:
-        print("🚀 Launching undetected ChromeDriver...")
+        log.debug("🚀 Launching undetected ChromeDriver...")
         from undetected_chromedriver import Chrome, ChromeOptions
-        options = ChromeOptions()
-        options.user_data_dir = "selenium_profile"  # Folder to store persistent session/cookies
+        options = apply_fast_profile(ChromeOptions())
+        options.user_data_dir = user_data_dir  # Folder to store persistent session/cookies
         driver = Chrome(headless=False, options=options)
+        enable_resource_blocking(driver)
 
 
-        print("🌐 Navigating to page:", amazon_url)
-        driver.get(amazon_url)
-        driver.implicitly_wait(5)
+        log.info("🌐 Navigating to page: %s", amazon_url)
+        driver.get(on_amazon_base(amazon_url))
+        # Fast profile waits explicitly for the nodes it parses, so missing optional
+        # sections return at once instead of costing an implicit wait each
+        driver.implicitly_wait(0 if FAST_PROFILE else 5)
         
         text_blobs = [] 
         legacy_specs = [] 
@@ -847,54 +741,61 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
         
  # === 🛡️ Bot detection handling ===
         page = driver.page_source.lower()
+        if ("robot check" in page or "captcha" in page) and not INTERACTIVE_CAPTCHA:
+            log.warning("🛑 CAPTCHA detected (non-interactive run). Giving up on this page.")
+            SCRAPE_RESULTS.inc(tier="blocked")
+            return None
         if "robot check" in page or "captcha" in page:
-            print("🛑 CAPTCHA detected! Saving screenshot...")
+            log.warning("🛑 CAPTCHA detected! Saving screenshot...")
 
             driver.save_screenshot("captcha_screenshot.png")
-            print("📸 Saved screenshot as captcha_screenshot.png")
-            print("🧍 Please solve the CAPTCHA in the Chrome window.")
+            log.info("📸 Saved screenshot as captcha_screenshot.png")
+            log.info("🧍 Please solve the CAPTCHA in the Chrome window.")
             input("✅ Press Enter here once you've solved the CAPTCHA and see the product page...")
 
-            print("🔁 Retrying scrape after CAPTCHA solve...")
+            log.info("🔁 Retrying scrape after CAPTCHA solve...")
 
             # Re-fetch page content after manual solve
             page = driver.page_source.lower()
             if "robot check" in page or "captcha" in page:
-                print("❌ CAPTCHA still present after retry. Giving up.")
+                log.warning("❌ CAPTCHA still present after retry. Giving up.")
+                SCRAPE_RESULTS.inc(tier="blocked")
                 return None
 
 
         # Bot detection check
         page = driver.page_source.lower()
         if "robot check" in page or "captcha" in page:
-            print("🛑 Blocked by CAPTCHA / bot check.")
+            log.warning("🛑 Blocked by CAPTCHA / bot check.")
+            SCRAPE_RESULTS.inc(tier="blocked")
             return None
 
-        print("🖱️ Simulating scroll + click...")
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);")
-            time.sleep(random.uniform(1, 2))
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
-            time.sleep(random.uniform(1.5, 2.5))
-        except Exception as e:
-            print(f"⚠️ Scroll simulation failed: {e}")
-
-        # Try to expand spec blocks
-        try:
-            expandable = driver.find_elements(By.CSS_SELECTOR, ".a-expander-header")
-            if expandable:
-                random.choice(expandable).click()
-                time.sleep(random.uniform(1, 2))
-        except:
-            pass
+        if HUMAN_DELAYS:
+            log.debug("🖱️ Simulating scroll + click...")
+            try:
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.3);")
+                human_pause(1, 2)
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.7);")
+                human_pause(1.5, 2.5)
+            except Exception as e:
+                log.warning("⚠️ Scroll simulation failed: %s", e)
+
+            # Try to expand spec blocks
+            try:
+                expandable = driver.find_elements(By.CSS_SELECTOR, ".a-expander-header")
+                if expandable:
+                    random.choice(expandable).click()
+                    human_pause(1, 2)
+            except:
+                pass
 
-        # Hover over title
-        try:
-            hover_target = driver.find_element(By.ID, "productTitle")
-            webdriver.ActionChains(driver).move_to_element(hover_target).perform()
-            time.sleep(random.uniform(0.5, 1.2))
-        except:
-            pass
+            # Hover over title
+            try:
+                hover_target = driver.find_element(By.ID, "productTitle")
+                webdriver.ActionChains(driver).move_to_element(hover_target).perform()
+                human_pause(0.5, 1.2)
+            except:
+                pass
 
         # Wait and parse title
         title = None
@@ -904,21 +805,29 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
             (By.CSS_SELECTOR, "span#productTitle"),
             (By.CSS_SELECTOR, "h1.a-size-large span")
         ]
-        for by, selector in selectors:
+        # One combined wait instead of up to 10s per selector
+        found = wait_for_any(driver, selectors, timeout=10)
+        if found:
             try:
-                WebDriverWait(driver, 10).until(EC.presence_of_element_located((by, selector)))
-                title = driver.find_element(by, selector).text.strip()
-                break
+                title = driver.find_element(*found).text.strip()
             except:
-                continue
+                title = None
 
         if not title:
-            print(f"❌ Failed to extract product title for: {amazon_url}")
+            log.warning("❌ Failed to extract product title for: %s", amazon_url)
+            SCRAPE_RESULTS.inc(tier="no_title")
             return None
 
         asin = extract_asin(amazon_url)
+        # Keep the raw page so extractor changes can be backfilled without re-scraping
+        if asin:
+            try:
+                get_page_archive().put(asin, driver.page_source)
+            except Exception as e:
+                log.warning("⚠️ Could not archive page for %s: %s", asin, e)
         if asin in priority_products:
-            Log.success("🎯 Using locked metadata for high-accuracy product.")
+            log.info("🎯 Using locked metadata for high-accuracy product.")
+            SCRAPE_RESULTS.inc(tier="priority_db")
             return priority_products[asin]
 
         try:
@@ -926,14 +835,11 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
         except:
             brand = title.split()[0]
 
-        def normalize_brand(brand_raw):
-            return brand_raw.lower().replace("visit the", "").replace("store", "").strip()
-
         # Use it like this:
         brand_name = normalize_brand(brand)
         brand_key = brand_name  # already normalized
 
-        print("🧾 Raw brand text:", brand_name)
+        log.debug("🧾 Raw brand text: %s", brand_name)
 
 
         if brand_key not in brand_origin_lookup and brand_key not in known_brand_origins:
@@ -942,8 +848,8 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
                 with open("unrecognized_brands.txt", "w", encoding="utf-8") as f:
                     f.write("")  # create an empty file
 
-            with open("unrecognized_brands.txt", "a", encoding="utf-8") as log:
-                log.write(f"{brand_name}\n")
+            with open("unrecognized_brands.txt", "a", encoding="utf-8") as unrecognized:
+                unrecognized.write(f"{brand_name}\n")
 
         if brand_key not in brand_locations:
             enrich_brand_location(brand_name, amazon_url)
@@ -965,10 +871,10 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
                     if match:
                         raw_origin = match.group(1).strip()
                         if raw_origin.lower() not in ["no", "not specified", "unknown"]:
-                            origin_country = fuzzy_normalize_origin(raw_origin)
+                            origin_country = canonical("origin", raw_origin, "Unknown")
                             origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
                             origin_source = "blob_match"
-                            print(f"📍 Extracted origin from blob: {raw_origin} → {origin_country}")
+                            log.debug("📍 Extracted origin from blob: %s → %s", raw_origin, origin_country)
                             break
 
             # 1.5 Check legacy tech specs
@@ -978,13 +884,13 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
                         label = legacy_specs[i].text.lower().strip()
                         value = legacy_specs[i + 1].text.strip()
                         if "country of origin" in label:
-                            origin_country = fuzzy_normalize_origin(value)
+                            origin_country = canonical("origin", value, "Unknown")
                             origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
                             origin_source = "techspec_origin"
-                            print(f"📍 Found origin in tech spec: {value} → {origin_country}")
+                            log.debug("📍 Found origin in tech spec: %s → %s", value, origin_country)
                             break
                 except Exception as e:
-                    Log.warn(f"⚠️ Error checking tech spec for origin: {e}")
+                    log.warning("⚠️ Error checking tech spec for origin: %s", e)
 
             # 2. Fallback: brand DB, but only if page didn’t already give a specific origin
             if origin_country in ["Unknown", "Other", None, ""]:
@@ -993,42 +899,42 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
                 origin_city = db_origin_city
                 origin_source = "brand_db"
             else:
-                print(f"🛡️ Preserving explicit product origin: {origin_country} (source: {origin_source})")
+                log.debug("🛡️ Preserving explicit product origin: %s (source: %s)", origin_country, origin_source)
 
             # 3. Fallback: title guess
             if origin_country in ["Unknown", "Other", None, ""] and origin_source not in ["brand_db", "blob_match", "techspec_origin"]:
                 origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
                 origin_source = "title_guess"
-                print(f"🧠 Fallback origin estimate from title: {guess}")
+                log.debug("🧠 Fallback origin estimate from title: %s", guess)
             else:
-                print(f"🚫 Skipping fallback origin guess — origin already resolved from {origin_source}")
+                log.debug("🚫 Skipping fallback origin guess — origin already resolved from %s", origin_source)
 
 
             # 4. Final fallback: shipping panel
             if origin_country in ["Unknown", "Other", None, ""]:
                 guess = extract_shipping_origin(driver)
                 if guess:
-                    origin_country = fuzzy_normalize_origin(guess)
+                    origin_country = canonical("origin", guess, "Unknown")
                     origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
                     origin_source = "shipping_panel"
-                    print(f"🚚 Inferred origin from shipping panel: {guess}")
+                    log.debug("🚚 Inferred origin from shipping panel: %s", guess)
                     
             # 🛡️ Final fallback override guard to protect brand DB origin
             if origin_source == "brand_db":
                 origin_country = known_brand_origins.get(brand_key, origin_country)
                 origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
-                print(f"🛡️ Protected origin override — sticking with brand DB: {origin_country}")
+                log.debug("🛡️ Protected origin override — sticking with brand DB: %s", origin_country)
 
-            print(f"🎯 Returning final origin: {origin_country} (source: {origin_source})")
+            log.debug("🎯 Returning final origin: %s (source: %s)", origin_country, origin_source)
 
             # 🛡️ Final override protection
             if asin in priority_products:
                 origin_country = priority_products[asin].get("brand_estimated_origin", origin_country)
                 origin_city = priority_products[asin].get("origin_city", origin_city)
-                print(f"🔒 Restored origin from priority DB: {origin_country}")
+                log.debug("🔒 Restored origin from priority DB: %s", origin_country)
 
         else:
-            print(f"🌍 Skipping all fallbacks — origin already set to: {origin_country} (source: {origin_source})")
+            log.debug("🌍 Skipping all fallbacks — origin already set to: %s (source: %s)", origin_country, origin_source)
 
 
         # Scrape materials, weight, dimensions
@@ -1054,70 +960,36 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
             text_blobs += [l.text.strip().lower() for l in legacy_specs]
             text_blobs += [d.text.strip().lower() for d in desc]
 
-            print("🔍 Starting to parse text blobs for product details...")
+            log.debug("🔍 Starting to parse text blobs for product details...")
+            weight, dimensions, material = parse_spec_blobs(text_blobs, title)
+            log.debug("⚖️ Weight: %s kg | 📦 Dimensions: %s | 🧬 Material: %s", weight, dimensions, material)
 
-            
-            origin_already_saved = False  # ✅ Add this before the loop
+            # ✅ Save brand origin only ONCE
+            if text_blobs:
+                safe_save_brand_origin(brand_key, origin_country, origin_city)
 
-            for blob in text_blobs:
-                legacy_specs = []
-                if not weight and any(kw in blob for kw in ["weight", "weighs", "item weight", "product weight"]):
-                    extracted_weight = extract_weight(blob)
-                    if extracted_weight:
-                        weight = extracted_weight
-                        print(f"⚖️ Extracted weight: {weight} kg")
-
-                if not weight:
-                    extracted_weight = extract_weight(title)
-                    if extracted_weight:
-                        weight = extracted_weight
-                        print(f"⚠️ Extracted from title fallback: {weight} kg")
-
-                if not dimensions:
-                    extracted_dimensions = extract_dimensions(blob)
-                    if extracted_dimensions:
-                        dimensions = extracted_dimensions
-                        print(f"📦 Extracted dimensions: {dimensions} cm")
-
-                if not material:
-                    extracted_material = extract_material(blob)
-                    if extracted_material:
-                        material = extracted_material
-                        print(f"🧬 Extracted material: {material}")
-
-                # ✅ Save brand origin only ONCE
-                if not origin_already_saved:
-                    safe_save_brand_origin(brand_key, origin_country, origin_city)
-                    origin_already_saved = True
-
-                if weight and dimensions and material and origin_country:
-                    print("✅ All key details found.")
-                    break
-                
-                
             recyclability = extract_recyclability(text_blobs)
 
         except Exception as e:
-            print("⚠️ Extraction error:", e)
+            log.warning("⚠️ Extraction error: %s", e)
 
         if not weight:
-            print("⚠️ Weight not found in specs, using fallback.")
+            log.warning("⚠️ Weight not found in specs, using fallback.")
             weight = 1.0  # Only fallback if nothing extracted at all
 
         # ✅ Only use shipping panel if origin is still unknown
         if origin_country in ["Unknown", "Other", None, ""]:
             guess = extract_shipping_origin(driver)
             if guess:
-                origin_country = fuzzy_normalize_origin(guess)
+                origin_country = canonical("origin", guess, "Unknown")
                 origin_city = origin_hubs.get(origin_country, {}).get("city", "Unknown")
                 origin_source = "shipping_panel"
-                print(f"🚚 Inferred origin from shipping panel: {guess}")
+                log.debug("🚚 Inferred origin from shipping panel: %s", guess)
         else:
-            print(f"🛡️ Protected origin: {origin_country} (source: {origin_source})")
+            log.debug("🛡️ Protected origin: %s (source: %s)", origin_country, origin_source)
 
 
-        origin_hub = origin_hubs.get(origin_country, origin_hubs["UK"])
-        distance = round(haversine(origin_hub["lat"], origin_hub["lon"], uk_hub["lat"], uk_hub["lon"]), 1)
+        distance = round(distance_origin_to_uk_hub(origin_country), 1)
 
             # === Infer smarter transport mode
         long_distance_countries = ["China", "USA", "Japan"]
@@ -1131,35 +1003,8 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
         
 
         # === ✅ Fuzzy corrections for material and origin (place it HERE)
-        if material:
-            mat = material.lower()
-            if "plastic" in mat:
-                material = "Plastic"
-            elif "glass" in mat:
-                material = "Glass"
-            elif "alum" in mat:
-                material = "Aluminium"
-            elif "steel" in mat:
-                material = "Steel"
-            elif "paper" in mat:
-                material = "Paper"
-            elif "cardboard" in mat:
-                material = "Cardboard"
-
-        if origin_country:
-            orig = origin_country.lower()
-            if "china" in orig:
-                origin_country = "China"
-            elif "united kingdom" in orig or "uk" in orig:
-                origin_country = "UK"
-            elif "usa" in orig or "united states" in orig:
-                origin_country = "USA"
-            elif "germany" in orig:
-                origin_country = "Germany"
-            elif "france" in orig:
-                origin_country = "France"
-            elif "italy" in orig:
-                origin_country = "Italy"
+        material = canonical("material", material)
+        origin_country = canonical("origin", origin_country, origin_country)
 
 
         # 🔒 Final override if product is in trusted DB
@@ -1167,11 +1012,10 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
             trusted = priority_products[asin]
             origin_country = trusted.get("brand_estimated_origin", origin_country)
             origin_city = trusted.get("origin_city", origin_city)
-            print(f"🔒 Final override from priority DB: {origin_country}")
+            log.debug("🔒 Final override from priority DB: %s", origin_country)
             
         # Calculate distance here before assigning to product
-        origin_hub = origin_hubs.get(origin_country, origin_hubs["UK"])
-        distance_origin_to_uk = round(haversine(origin_hub["lat"], origin_hub["lon"], uk_hub["lat"], uk_hub["lon"]), 1)
+        distance_origin_to_uk = round(distance_origin_to_uk_hub(origin_country), 1)
         distance_uk_to_user = 100
 
         # === Now build your product dict (after fuzzy fixes)
@@ -1198,21 +1042,22 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
         
         # ✅ Now process + store it
         finalize_product_entry(product)
+        SCRAPE_RESULTS.inc(tier="scraped")
+        ORIGIN_SOURCES.inc(source=origin_source)
         return product
 
 
         # 🌍 Add missing distance fields
-        origin_hub = origin_hubs.get(origin_country, origin_hubs["UK"])
-        distance_origin_to_uk = round(haversine(origin_hub["lat"], origin_hub["lon"], uk_hub["lat"], uk_hub["lon"]), 1)
+        distance_origin_to_uk = round(distance_origin_to_uk_hub(origin_country), 1)
         distance_uk_to_user = 100  # static fallback — change if postcode logic is added
 
         product["distance_origin_to_uk"] = distance_origin_to_uk
         product["distance_uk_to_user"] = distance_uk_to_user
-        print(f"🌍 Returning distances: {product.get('distance_origin_to_uk')} km from origin, {product.get('distance_uk_to_user')} km from UK hub")
+        log.debug("🌍 Returning distances: %s km from origin, %s km from UK hub", product.get('distance_origin_to_uk'), product.get('distance_uk_to_user'))
 
 
-        print("✅ Scraped product:", product["title"])
-        print(f"🎯 Returning final origin: {origin_country} (source: {origin_source})")
+        log.info("✅ Scraped product: %s", product['title'])
+        log.debug("🎯 Returning final origin: %s (source: %s)", origin_country, origin_source)
         return product
 
 
@@ -1230,73 +1075,53 @@ def scrape_amazon_product_page(amazon_url, fallback=False):
 def save_products_to_json(products, path="../ReactPopup/public/data.json"):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(products, f, indent=2)
-    print(f"✅ Saved {len(products)} product(s) to {path}")
+    log.info("✅ Saved %s product(s) to %s", len(products), path)
 
 # === MAIN ===
 if __name__ == "__main__":
-    all_asins = set()
-    all_products = []
+    import argparse
+    from shard_crawl import DEFAULT_SHARD_DIR, merge_segments, run_shard, shard_progress
+
+    parser = argparse.ArgumentParser(description="🛒 Scrape SEARCH_TERMS, optionally as one shard of several workers.")
+    parser.add_argument("--shard", type=int, default=0, help="This worker's shard index")
+    parser.add_argument("--num-shards", type=int, default=1, help="Total workers; terms are split by hash")
+    parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR, help="Segments and checkpoints (shared if on several machines)")
+    parser.add_argument("--merge", action="store_true", help="Skip crawling; merge every shard's segment and build the outputs")
+    args = parser.parse_args()
+
+    if not args.merge:
+        enrich_unrecognized_brands()
+
+        def fetch(term, page):
+            url = f"{AMAZON_BASE_URL}/s?k={term}&page={page}"
+            log.info("Scraping: %s", url)
+            return scrape_amazon_titles(url, max_items=50, raise_on_block=True)
+
+        run_shard(fetch, SEARCH_TERMS, SEARCH_PAGES, args.shard, args.num_shards, args.shard_dir, (ScrapeBlocked,))
+        if args.num_shards > 1:
+            # Other shards may still be running; merge once they are all done
+            log.info("Shard progress: %s. Run with --merge when every shard has finished.", shard_progress(args.shard_dir))
+            sys.exit(0)
+
+    unique_products = merge_segments(args.shard_dir)
 
     # Load priority DB
     priority_path = "priority_products.json"
     try:
         with open(priority_path, "r", encoding="utf-8") as f:
             priority_db = json.load(f)
-            Log.success(f"🔐 Loaded {len(priority_db)} priority products.")
+            log.info("🔐 Loaded %s priority products.", len(priority_db))
     except:
         priority_db = {}
-        Log.warn("No existing priority_products.json, starting fresh.")
-
-    # Define search terms
-    search_terms = [
-        "usb+c+charger", "eco+friendly+bottle", "coffee+mug", "mechanical+keyboard", 	
-        "shampoo", "wireless+earbuds", "reusable+bag", "portable+fan", "toothbrush", 	
-        "led+lamp", "bamboo cutlery", "compostable bag", "metal straw", "plastic container",
-        "fabric tote", "glass bottle", "stainless steel mug", "wooden spoon",
-        "eco friendly notebooks", "recycled stationery", "canvas shopping bag",
-        "solar power bank", "eco friendly phone case" ,"stainless steel lunchbox",
-        "reusable baking mat", "recycled paper towels", "compost bin kitchen", 
-        "refillable deodorant", "eco friendly shampoo", "solid shampoo bar", "bamboo razor",
-        "sustainable soap", "bamboo toothbrush", "reusable straws", "organic cotton bag"
-    ]
-
-
-    for term in search_terms:
-        for page in range(1, 8):
-            url = f"https://www.amazon.co.uk/s?k={term}&page={page}"
-            Log.info(f"Scraping: {url}")
-            products = scrape_amazon_titles(url, max_items=50)
-
-            new_products = []
-            for p in products:
-                asin = p.get("asin")
-                if asin and asin not in all_asins:
-                    all_asins.add(asin)
-                    new_products.append(p)
-
-            if new_products:
-                all_products.extend(new_products)
-                Log.success(f"➕ {len(new_products)} new products")
-
-            for p in new_products:
-                asin = p.get("asin")
-                maybe_add_to_priority(p, priority_db)
-                Log.success(f"⭐ Added high-confidence product: {asin}")
-
-            # Save priority products
+        log.warning("No existing priority_products.json, starting fresh.")
+
+    added = sum(1 for p in unique_products if maybe_add_to_priority(p, priority_db, save_path=None))
+    if added:
         with open(priority_path, "w", encoding="utf-8") as f:
             json.dump(priority_db, f, indent=2)
-            Log.success(f"✅ Saved {len(priority_db)} total trusted products.")
-
-        with open("scraped_products_tmp.json", "w", encoding="utf-8") as f:
-            json.dump(all_products, f, indent=2)
-            Log.info(f"📥 Saved checkpoint: {len(all_products)} total")
-
-        time.sleep(random.uniform(2.5, 4.5))  # anti-bot pause
+        log.info("✅ Saved %s total trusted products (%s new).", len(priority_db), added)
 
     # ✅ ✅ NOW PROCESS THE PRODUCTS
-    unique_products = {p["asin"]: p for p in all_products}.values()
-
     cleaned_products = []
     for product in unique_products:
         if is_high_confidence(product):
@@ -1313,7 +1138,7 @@ if __name__ == "__main__":
 
     with open("cleaned_products.json", "w", encoding="utf-8") as f:
         json.dump(cleaned_products, f, indent=2)
-        print(f"✅ Saved {len(cleaned_products)} to cleaned_products.json")
+        log.info("✅ Saved %s to cleaned_products.json", len(cleaned_products))
 
     if cleaned_products:
         import csv
@@ -1322,6 +1147,6 @@ if __name__ == "__main__":
             writer = csv.DictWriter(f, fieldnames=cleaned_products[0].keys())
             writer.writeheader()
             writer.writerows(cleaned_products)
-            print(f"📄 Saved structured training data to {csv_path}")
+            log.info("📄 Saved structured training data to %s", csv_path)
 
-    save_products_to_json(list(unique_products), "bulk_scraped_products.json")
+    save_products_to_json(unique_products, "bulk_scraped_products.json")
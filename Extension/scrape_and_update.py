@@ -3,6 +3,8 @@ from bs4 import BeautifulSoup
 import json
 import random
 
+from geo import origin_hubs, distance_origin_to_uk_hub
+
 def estimate_origin_country(title):
     title = title.lower()
     if "huawei" in title:
@@ -17,24 +19,6 @@ def estimate_origin_country(title):
         return "UK"
     return "China"
 
-origin_hubs = {
-    "China": {"lat": 31.2304, "lon": 121.4737, "city": "Shanghai"},
-    "Germany": {"lat": 50.1109, "lon": 8.6821, "city": "Frankfurt"},
-    "USA": {"lat": 37.7749, "lon": -122.4194, "city": "San Francisco"},
-    "Japan": {"lat": 35.6895, "lon": 139.6917, "city": "Tokyo"},
-    "UK": {"lat": 51.509865, "lon": -0.118092, "city": "London"}
-}
-
-uk_hub = {"lat": 51.8821, "lon": -0.5057, "city": "Dunstable"}
-
-def haversine(lat1, lon1, lat2, lon2):
-    from math import radians, cos, sin, sqrt, atan2
-    R = 6371
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
 
 def scrape_product_page(url):
     headers = {
@@ -70,7 +54,7 @@ def scrape_product_page(url):
     origin_country = estimate_origin_country(title)
     origin = origin_hubs[origin_country]
 
-    intl_distance = round(haversine(origin["lat"], origin["lon"], uk_hub["lat"], uk_hub["lon"]), 1)
+    intl_distance = round(distance_origin_to_uk_hub(origin_country), 1)
 
     product = {
         "title": title,
@@ -0,0 +1,120 @@
+import glob
+import hashlib
+import json
+import os
+import random
+import time
+
+# Sharded term × page crawl. Terms are assigned to shards by a stable hash, so
+# W workers (on one or several machines) can each run `--shard i --num-shards W`
+# against the same term list without coordinating. Each shard appends its
+# products to its own JSONL segment and records finished pages in a checkpoint,
+# so a crashed worker resumes where it stopped; `merge` dedupes all segments by ASIN.
+#
+#   python scrape_amazon_titles.py --shard 0 --num-shards 4
+#   python scrape_amazon_titles.py --merge
+
+# === CONFIG ===
+DEFAULT_SHARD_DIR = os.environ.get("CRAWL_SHARD_DIR", "crawl_shards")
+
+
+def shard_of(term, num_shards):
+    # Not hash(): that is salted per process and would differ between workers
+    digest = hashlib.sha1(term.encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % num_shards
+
+
+def shard_jobs(terms, pages, shard, num_shards):
+    return [(term, page) for term in terms if shard_of(term, num_shards) == shard for page in pages]
+
+
+def _atomic_json(path, data):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class ShardCheckpoint:
+    def __init__(self, out_dir, shard, num_shards):
+        os.makedirs(out_dir, exist_ok=True)
+        name = f"shard-{shard:03d}-of-{num_shards:03d}"
+        self.segment_path = os.path.join(out_dir, name + ".jsonl")
+        self.checkpoint_path = os.path.join(out_dir, name + ".checkpoint.json")
+        self.done = set()
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                self.done = {(term, page) for term, page in json.load(f)["done"]}
+
+    def is_done(self, term, page):
+        return (term, page) in self.done
+
+    def commit_page(self, term, page, products):
+        # Segment first, then checkpoint: a crash in between only repeats the page,
+        # and the duplicate rows are dropped at merge time
+        with open(self.segment_path, "a", encoding="utf-8") as f:
+            for p in products:
+                f.write(json.dumps(p, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.add((term, page))
+        _atomic_json(self.checkpoint_path, {"done": sorted(self.done), "updated": time.time()})
+
+
+def run_shard(fetch, terms, pages, shard, num_shards, out_dir=DEFAULT_SHARD_DIR,
+              blocked_exceptions=(), pause=(2.5, 4.5)):
+    # fetch(term, page) -> list of products; blocked pages stay unfinished for the next run
+    checkpoint = ShardCheckpoint(out_dir, shard, num_shards)
+    jobs = shard_jobs(terms, pages, shard, num_shards)
+    todo = [job for job in jobs if not checkpoint.is_done(*job)]
+    print(f"🧩 Shard {shard}/{num_shards}: {len(jobs)} pages, {len(jobs) - len(todo)} already done")
+
+    scraped = blocked = 0
+    for i, (term, page) in enumerate(todo):
+        try:
+            products = fetch(term, page)
+        except blocked_exceptions as e:
+            blocked += 1
+            print(f"🚫 {term} p{page} blocked ({e}), left for the next run")
+            continue
+        checkpoint.commit_page(term, page, products)
+        scraped += len(products)
+        print(f"📥 {term} p{page}: {len(products)} products ({len(checkpoint.done)}/{len(jobs)} pages)")
+        if pause and i < len(todo) - 1:
+            time.sleep(random.uniform(*pause))  # anti-bot pause
+
+    print(f"✅ Shard {shard}/{num_shards}: {scraped} products scraped, {blocked} page(s) blocked")
+    return checkpoint
+
+
+def iter_segments(out_dir=DEFAULT_SHARD_DIR):
+    for path in sorted(glob.glob(os.path.join(out_dir, "shard-*.jsonl"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from a crashed worker
+
+
+def merge_segments(out_dir=DEFAULT_SHARD_DIR):
+    # One product per ASIN across every shard; later rows win
+    merged, rows = {}, 0
+    for product in iter_segments(out_dir):
+        rows += 1
+        asin = product.get("asin")
+        if asin:
+            merged[asin] = product
+    print(f"🧩 Merged {rows} rows from {out_dir} into {len(merged)} unique products")
+    return list(merged.values())
+
+
+def shard_progress(out_dir=DEFAULT_SHARD_DIR):
+    progress = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, "shard-*.checkpoint.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            progress[os.path.basename(path).split(".")[0]] = len(json.load(f)["done"])
+    return progress
@@ -0,0 +1,165 @@
+import json
+import math
+import os
+import random
+import threading
+
+# === CONFIG ===
+DEFAULT_STATS_PATH = "term_stats.json"
+MAX_PAGES_PER_TERM = 20
+PAGE_DECAY = 0.7  # weight of a term's older pages relative to its latest one
+UCB_C = 1.0
+
+
+class TermSelector:
+    """Bandit over search terms, rewarded by new ASINs per page load.
+
+    Each term is an arm; pulling it crawls the term's next page. Yield and
+    block outcomes are kept per (term, page) and persisted to JSON, so a
+    term that keeps returning known ASINs stops getting deeper pages while
+    productive terms are crawled further.
+
+    strategy="thompson" samples a Gamma-Poisson posterior for the yield and a
+    Beta posterior for the block rate; strategy="ucb" uses the discounted
+    mean plus an exploration bonus.
+    """
+
+    def __init__(self, path=DEFAULT_STATS_PATH, strategy="thompson", max_pages=MAX_PAGES_PER_TERM,
+                 page_decay=PAGE_DECAY, ucb_c=UCB_C, seed=None):
+        if strategy not in ("thompson", "ucb"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+        self.path = path
+        self.strategy = strategy
+        self.max_pages = max_pages
+        self.page_decay = page_decay
+        self.ucb_c = ucb_c
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.arms = {}  # term -> {page: {"loads", "ok", "blocked", "new_asins", "products"}}
+        self.load()
+
+    # === Persistence ===
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.arms = {
+            term: {int(page): stats for page, stats in pages.items()}
+            for term, pages in data.get("arms", {}).items()
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            data = {"strategy": self.strategy, "arms": self.arms}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+
+    # === Updates ===
+    def record(self, term, page, outcome, new_asins=0, products=0):
+        with self.lock:
+            stats = self.arms.setdefault(term, {}).setdefault(
+                page, {"loads": 0, "ok": 0, "blocked": 0, "new_asins": 0, "products": 0}
+            )
+            stats["loads"] += 1
+            if outcome == "ok":
+                stats["ok"] += 1
+                stats["new_asins"] += new_asins
+                stats["products"] += products
+            elif outcome == "blocked":
+                stats["blocked"] += 1
+
+    def next_page(self, term):
+        # Pages are crawled in order; failed/blocked pages are retried by the frontier
+        pages = self.arms.get(term)
+        page = max(pages) + 1 if pages else 1
+        return page if page <= self.max_pages else None
+
+    # === Scoring ===
+    def _term_totals(self, term):
+        # Discounted so the latest pages (closest to what the next page will yield) dominate
+        pages = self.arms.get(term, {})
+        if not pages:
+            return 0.0, 0.0, 0.0, 0.0
+        latest = max(pages)
+        ok = new = blocked = loads = 0.0
+        for page, s in pages.items():
+            w = self.page_decay ** (latest - page)
+            ok += w * s["ok"]
+            new += w * s["new_asins"]
+            blocked += w * s["blocked"]
+            loads += w * s["loads"]
+        return ok, new, blocked, loads
+
+    def _prior_yield(self):
+        ok = sum(s["ok"] for pages in self.arms.values() for s in pages.values())
+        new = sum(s["new_asins"] for pages in self.arms.values() for s in pages.values())
+        # Optimistic until there is data, so untried terms get explored
+        return max(new / ok, 1.0) if ok else 10.0
+
+    def score(self, term, prior=None, total_loads=None):
+        if self.next_page(term) is None:
+            return None
+        prior = self._prior_yield() if prior is None else prior
+        ok, new, blocked, loads = self._term_totals(term)
+
+        if self.strategy == "thompson":
+            # Gamma(prior + new, 1 + ok) for yield, Beta(1 + blocked, 1 + ok) for blocks
+            yield_sample = self.rng.gammavariate(prior + new, 1.0 / (1.0 + ok))
+            block_sample = self.rng.betavariate(1.0 + blocked, 1.0 + ok)
+            return yield_sample * (1.0 - block_sample)
+
+        if loads == 0:
+            return float("inf")
+        if total_loads is None:
+            total_loads = sum(s["loads"] for pages in self.arms.values() for s in pages.values())
+        return new / loads + self.ucb_c * prior * math.sqrt(2 * math.log(max(total_loads, 1)) / loads)
+
+    def scores(self, terms):
+        with self.lock:
+            prior = self._prior_yield()
+            total = sum(s["loads"] for pages in self.arms.values() for s in pages.values())
+            return {t: self.score(t, prior, total) for t in terms}
+
+    def pick(self, terms):
+        # Best term that still has pages left, or None when all are exhausted
+        scored = [(s, t) for t, s in self.scores(terms).items() if s is not None]
+        return max(scored)[1] if scored else None
+
+    # === Reporting ===
+    def summary(self):
+        rows = []
+        for term, pages in self.arms.items():
+            loads = sum(s["loads"] for s in pages.values())
+            new = sum(s["new_asins"] for s in pages.values())
+            blocked = sum(s["blocked"] for s in pages.values())
+            rows.append({
+                "term": term,
+                "pages": len(pages),
+                "loads": loads,
+                "new_asins": new,
+                "new_per_load": new / loads if loads else 0.0,
+                "block_rate": blocked / loads if loads else 0.0,
+            })
+        return sorted(rows, key=lambda r: r["new_per_load"], reverse=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="🎰 Per-term crawl yield report.")
+    parser.add_argument("--stats", default=DEFAULT_STATS_PATH)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    selector = TermSelector(args.stats)
+    print(f"{'term':<30} {'pages':>5} {'loads':>6} {'new':>7} {'new/load':>9} {'blocked':>8}")
+    for r in selector.summary()[: args.top]:
+        print(
+            f"{r['term']:<30} {r['pages']:>5} {r['loads']:>6} {r['new_asins']:>7} "
+            f"{r['new_per_load']:>9.2f} {r['block_rate']:>8.1%}"
+        )
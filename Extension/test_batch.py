@@ -1,4 +1,5 @@
 # test_batch.py
+import json
 import requests
 
 products = [
@@ -19,15 +20,20 @@ products = [
     }
 ]
 
-for item in products:
-    print(f"\n🔎 Testing: {item['name']}")
-    res = requests.post("http://127.0.0.1:5000/estimate_emissions", json={
-        "amazon_url": item["url"],
-        "postcode": item["postcode"]
-    })
+# One request for the whole list; results stream back (NDJSON) as each scrape finishes
+print(f"\n🔎 Testing {len(products)} products in one batch")
+res = requests.post("http://127.0.0.1:5000/estimate_emissions/batch", json={
+    "items": [{"url": item["url"], "postcode": item["postcode"]} for item in products]
+}, stream=True)
+print("✅ Status:", res.status_code)
+
+for line in res.iter_lines():
+    if not line:
+        continue
     try:
-        print("✅ Status:", res.status_code)
-        print("📦 Response:", res.json())
+        result = json.loads(line)
+        name = products[result["index"]]["name"] if "index" in result else "?"
+        print(f"\n📦 {name}:", result.get("result") or result.get("error"))
     except Exception as e:
-        print("❌ Failed to parse response:", e)
-        print("Raw:", res.text)
+        print("❌ Failed to parse line:", e)
+        print("Raw:", line)
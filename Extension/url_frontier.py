@@ -0,0 +1,209 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+
+# === CONFIG ===
+DEFAULT_DB_PATH = "crawl_frontier.db"
+MAX_ATTEMPTS = 5
+FAILED_BACKOFF_S = 300  # 5 min, doubled per attempt
+BLOCKED_BACKOFF_S = 1800  # 30 min, doubled per attempt
+MAX_BACKOFF_S = 24 * 3600
+
+STATES = ("pending", "in_flight", "done", "failed", "blocked")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',
+    priority REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_eligible_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_ready ON urls (state, next_eligible_at, priority);
+"""
+
+
+class UrlFrontier:
+    """Persistent, deduplicated crawl frontier backed by SQLite.
+
+    Every URL is stored once with its state, attempt count and the time it
+    becomes eligible again, so a restarted scheduler resumes where it left
+    off and never re-scrapes pages already marked done.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # === Adding work ===
+    def add(self, url, priority=0.0):
+        return self.add_many([url], priority) == 1
+
+    def add_many(self, urls, priority=0.0):
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, priority, added_at, updated_at) VALUES (?, ?, ?, ?)",
+                [(u, priority, now, now) for u in urls],
+            )
+            self.conn.execute("COMMIT")
+            return self.conn.total_changes - before
+
+    def set_priority(self, url, priority):
+        with self.lock:
+            self.conn.execute("UPDATE urls SET priority = ? WHERE url = ?", (priority, url))
+
+    def prioritize(self, url_priorities):
+        # Adds any missing URLs and re-scores the ones not yet done, in one transaction
+        now = time.time()
+        rows = [(url, priority) for url, priority in url_priorities]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, priority, added_at, updated_at) VALUES (?, ?, ?, ?)",
+                [(url, priority, now, now) for url, priority in rows],
+            )
+            self.conn.executemany(
+                "UPDATE urls SET priority = ? WHERE url = ? AND state != 'done'",
+                [(priority, url) for url, priority in rows],
+            )
+            self.conn.execute("COMMIT")
+
+    # === Claiming and reporting ===
+    def claim(self):
+        # Highest-priority URL that is due, atomically moved to in_flight
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            row = self.conn.execute(
+                """SELECT url FROM urls
+                   WHERE state IN ('pending', 'failed', 'blocked')
+                     AND next_eligible_at <= ? AND attempts < ?
+                   ORDER BY priority DESC, next_eligible_at, added_at
+                   LIMIT 1""",
+                (now, self.max_attempts),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE urls SET state = 'in_flight', updated_at = ? WHERE url = ?", (now, row[0])
+                )
+            self.conn.execute("COMMIT")
+        return row[0] if row else None
+
+    def _finish(self, url, state, error=None, backoff_base=None):
+        now = time.time()
+        with self.lock:
+            if backoff_base is None:
+                self.conn.execute(
+                    "UPDATE urls SET state = ?, last_error = ?, updated_at = ? WHERE url = ?",
+                    (state, error, now, url),
+                )
+                return
+            attempts = (self.conn.execute("SELECT attempts FROM urls WHERE url = ?", (url,)).fetchone() or (0,))[0] + 1
+            delay = min(MAX_BACKOFF_S, backoff_base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            self.conn.execute(
+                """UPDATE urls SET state = ?, attempts = ?, next_eligible_at = ?, last_error = ?, updated_at = ?
+                   WHERE url = ?""",
+                (state, attempts, now + delay, error, now, url),
+            )
+
+    def mark_done(self, url):
+        self._finish(url, "done")
+
+    def mark_failed(self, url, error=None):
+        self._finish(url, "failed", error, FAILED_BACKOFF_S)
+
+    def mark_blocked(self, url, error=None):
+        self._finish(url, "blocked", error, BLOCKED_BACKOFF_S)
+
+    def release(self, url):
+        # Claimed but never fetched (e.g. shutdown) — back to pending without an attempt
+        self._finish(url, "pending")
+
+    def recover_in_flight(self):
+        # After a crash, anything left in_flight was never completed
+        with self.lock:
+            cur = self.conn.execute("UPDATE urls SET state = 'pending' WHERE state = 'in_flight'")
+            return cur.rowcount
+
+    # === Crawl engine source interface ===
+    def take(self, timeout=0.5):
+        url = self.claim()
+        if url is None:
+            time.sleep(timeout)
+        return url
+
+    def task_done(self, url, outcome):
+        if outcome == "ok":
+            self.mark_done(url)
+        elif outcome == "blocked":
+            self.mark_blocked(url, "blocked")
+        elif outcome == "failed":
+            self.mark_failed(url, "failed")
+        else:
+            self.release(url)
+
+    # === Introspection ===
+    def state_of(self, url):
+        with self.lock:
+            row = self.conn.execute("SELECT state FROM urls WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall())
+            exhausted = self.conn.execute(
+                "SELECT COUNT(*) FROM urls WHERE state IN ('failed', 'blocked') AND attempts >= ?",
+                (self.max_attempts,),
+            ).fetchone()[0]
+        stats = {state: counts.get(state, 0) for state in STATES}
+        stats["gave_up"] = exhausted
+        return stats
+
+    # === Migration from the old text files ===
+    def import_legacy_file(self, path, state):
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            urls = sorted({line.strip() for line in f if line.strip()})
+        now = time.time()
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                """INSERT OR IGNORE INTO urls (url, state, attempts, added_at, updated_at)
+                   VALUES (?, ?, 1, ?, ?)""",
+                [(u, state, now, now) for u in urls],
+            )
+            self.conn.execute("COMMIT")
+            added = self.conn.total_changes - before
+        os.replace(path, path + ".migrated")
+        return added
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="🗂️ Inspect the crawl frontier.")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    args = parser.parse_args()
+
+    frontier = UrlFrontier(args.db)
+    for state, count in frontier.stats().items():
+        print(f"{state:>10}: {count}")
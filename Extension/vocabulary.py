@@ -0,0 +1,115 @@
+import os
+import re
+from functools import lru_cache
+
+# One canonical vocabulary for material, origin, transport and recyclability,
+# shared by the APIs, the scrapers and training. Each field's aliases are
+# compiled into a single regex; a raw value resolves to the highest-priority
+# canonical name mentioned in it (earlier entries win, as in the old keyword
+# maps), or comes back title-cased if none is. Results are memoized on the
+# raw input, so repeat values cost one dict lookup.
+
+# === Vocabulary ===
+# canonical name -> extra aliases (the name itself always matches); aliases
+# match as whole words, so "us" does not fire inside "australia"
+VOCABULARY = {
+    "material": {
+        "Plastic": ["plastics", "polypropylene", "polyethylene", "polycarbonate", "polystyrene", "pvc", "acrylic"],
+        "Glass": ["borosilicate"],
+        "Aluminum": ["aluminium", "aluminum alloy", "aluminium alloy"],
+        "Steel": ["stainless", "stainless steel"],
+        "Paper": ["papers"],
+        "Cardboard": ["corrugated", "paperboard"],
+        "Bamboo": [],
+    },
+    "origin": {
+        "UK": ["united kingdom", "u.k.", "great britain", "britain", "england", "scotland", "wales", "northern ireland"],
+        "USA": ["united states", "united states of america", "us", "u.s.", "u.s.a."],
+        "China": ["prc"],
+        "Germany": [],
+        "France": [],
+        "Italy": [],
+        "Japan": [],
+        "Ireland": ["eire"],
+        "Netherlands": ["holland"],
+        "Canada": [],
+        "Switzerland": [],
+        "Australia": [],
+        "Sweden": [],
+        "Finland": [],
+        "Mexico": [],
+        "India": [],
+        "South Korea": ["republic of korea"],
+        "Spain": [],
+        "Poland": [],
+        "Singapore": [],
+        "Brazil": [],
+        "Norway": [],
+        "Russia": [],
+    },
+    "transport": {
+        "Land": ["truck", "road", "lorry", "van", "rail", "train"],
+        "Air": ["plane", "flight", "air freight", "airfreight"],
+        "Ship": ["sea", "ocean", "boat", "vessel", "sea freight"],
+    },
+    "recyclability": {
+        "Low": ["not recyclable", "non-recyclable", "non recyclable", "unrecyclable"],
+        "Medium": ["partially recyclable", "partly recyclable", "moderate"],
+        "High": ["recyclable", "fully recyclable", "100% recyclable"],
+    },
+}
+DEFAULTS = {"material": "Other", "origin": "Other", "transport": "Land", "recyclability": "Medium"}
+UNKNOWN = {"", "unknown", "n/a", "na", "none", "null", "nan", "not specified", "-"}
+MEMO_SIZE = int(os.environ.get("VOCABULARY_MEMO_SIZE", 8192))
+
+
+def _compile(table):
+    # alias -> (priority, canonical), and one alternation over all aliases, longest first
+    aliases = {}
+    for rank, (name, words) in enumerate(table.items()):
+        for word in [name.lower()] + words:
+            aliases.setdefault(word, (rank, name))
+    pattern = "|".join(re.escape(a) for a in sorted(aliases, key=len, reverse=True))
+    return re.compile(rf"(?<![a-z])(?:{pattern})(?![a-z])"), aliases
+
+
+_MATCHERS = {field: _compile(table) for field, table in VOCABULARY.items()}
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _resolve(field, raw):
+    # -> (matched canonical name or None, spelling to use or None when blank/unknown)
+    text = raw.strip()
+    lowered = text.lower()
+    if lowered in UNKNOWN:
+        return None, None
+    regex, aliases = _MATCHERS[field]
+    found = [aliases[m.group(0)] for m in regex.finditer(lowered)]
+    matched = min(found)[1] if found else None
+    return matched, matched or text.title()
+
+
+# === Lookups ===
+def canonical(field, value, default=None):
+    # Canonical spelling of `value`; blanks and "unknown" give `default`
+    if value is None:
+        return default
+    return _resolve(field, value if isinstance(value, str) else str(value))[1] or default
+
+
+def match(field, value):
+    # Canonical name only if `value` mentions a known alias, else None
+    if value is None:
+        return None
+    return _resolve(field, value if isinstance(value, str) else str(value))[0]
+
+
+def class_index(field, classes):
+    # Canonical spelling -> position in an encoder's classes_ (older encoders learned "Uk", "Usa")
+    index = {}
+    for i, label in enumerate(classes):
+        index.setdefault(canonical(field, label, label), i)
+    return index
+
+
+memo_info = _resolve.cache_info
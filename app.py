@@ -1,12 +1,21 @@
 from flask import Flask, request, jsonify, session
 from flask_cors import CORS
-import joblib
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Extension/ modules import each other flat (metrics, emissions, applog, ...)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Extension"))
 
 import pandas as pd
+from ml_model.model_bundle import BUNDLE_NAME, load_bundle
+from ml_model.explain import ExplanationCache, ForestExplainer, describe
 from Extension.scrape_amazon_titles import (scrape_amazon_product_page,estimate_origin_country, resolve_brand_origin,save_brand_locations)
+# Same module object the scraper records its counters in
+from metrics import ORIGIN_SOURCES, instrument_app, stage_timer
+from emissions import APP_PACKAGING_FACTOR, load_material_intensity, material_carbon, ml_carbon, trees_to_offset
+from vocabulary import canonical, class_index
+from applog import get_logger, install_request_ids
+from request_profiler import install_profiling
 
 import csv
 import re
@@ -15,43 +24,71 @@ import re
 app = Flask(__name__)
 app.secret_key = "super-secret-key"
 CORS(app)
+instrument_app(app, "app")
+install_request_ids(app)
+install_profiling(app)
+log = get_logger("app")
 
 # === Load Model and Encoders ===
 model_dir = "ml_model"
 encoders_dir = os.path.join(model_dir, "encoders")
 
-model = joblib.load(os.path.join(model_dir, "eco_model.pkl"))
-material_encoder = joblib.load(os.path.join(encoders_dir, "material_encoder.pkl"))
-transport_encoder = joblib.load(os.path.join(encoders_dir, "transport_encoder.pkl"))
-recycle_encoder = joblib.load(os.path.join(encoders_dir, "recycle_encoder.pkl"))
-label_encoder = joblib.load(os.path.join(encoders_dir, "label_encoder.pkl"))
-origin_encoder = joblib.load(os.path.join(encoders_dir, "origin_encoder.pkl"))
+bundle_path = os.path.join(model_dir, BUNDLE_NAME)
+
+if os.path.exists(bundle_path):
+    # Single memory-mapped bundle, shared between workers via the page cache
+    bundle = load_bundle(bundle_path)
+    model = bundle.model
+    material_encoder = bundle.encoders["material"]
+    transport_encoder = bundle.encoders["transport"]
+    recycle_encoder = bundle.encoders["recycle"]
+    label_encoder = bundle.encoders["label"]
+    origin_encoder = bundle.encoders["origin"]
+    log.info("📦 Loaded model bundle: %s", bundle_path)
+else:
+    import joblib
+    log.warning("⚠️ %s not found, falling back to joblib pickles (run ml_model/model_bundle.py to create it).", bundle_path)
+    model = joblib.load(os.path.join(model_dir, "eco_model.pkl"))
+    material_encoder = joblib.load(os.path.join(encoders_dir, "material_encoder.pkl"))
+    transport_encoder = joblib.load(os.path.join(encoders_dir, "transport_encoder.pkl"))
+    recycle_encoder = joblib.load(os.path.join(encoders_dir, "recycle_encoder.pkl"))
+    label_encoder = joblib.load(os.path.join(encoders_dir, "label_encoder.pkl"))
+    origin_encoder = joblib.load(os.path.join(encoders_dir, "origin_encoder.pkl"))
 
 valid_scores = list(label_encoder.classes_)
-print("✅ Loaded label classes:", valid_scores)
+log.info("✅ Loaded label classes: %s", valid_scores)
+
+# Tree-path contributions, cached per encoded feature row
+explainer = ForestExplainer(model)
+explanations = ExplanationCache(explainer)
+score_names = list(label_encoder.inverse_transform(explainer.classes_))
+
+# Encoder positions keyed by canonical spelling, built once
+encoder_index = {
+    "material": class_index("material", material_encoder.classes_),
+    "transport": class_index("transport", transport_encoder.classes_),
+    "recyclability": class_index("recyclability", recycle_encoder.classes_),
+    "origin": class_index("origin", origin_encoder.classes_),
+}
 
 # === Load CO2 Map ===
 def load_material_co2_data():
     try:
-        df = pd.read_csv(os.path.join(model_dir, "defra_material_intensity.csv"))
-        return dict(zip(df["material"], df["co2_per_kg"]))
+        return load_material_intensity(os.path.join(model_dir, "defra_material_intensity.csv"))
     except Exception as e:
-        print(f"⚠️ Could not load DEFRA data: {e}")
+        log.warning("⚠️ Could not load DEFRA data: %s", e)
         return {}
 
 material_co2_map = load_material_co2_data()
 
 # === Helpers ===
-def normalize_feature(value, default):
-    clean = str(value or default).strip().title()
-    return default if clean.lower() == "unknown" else clean
-
-def safe_encode(value, encoder, default):
-    value = normalize_feature(value, default)
-    if value not in encoder.classes_:
-        print(f"⚠️ '{value}' not in encoder classes. Defaulting to '{default}'.")
+def safe_encode(value, field, default):
+    index = encoder_index[field]
+    value = canonical(field, value, default)
+    if value not in index:
+        log.warning("⚠️ '%s' not in encoder classes. Defaulting to '%s'.", value, default)
         value = default
-    return encoder.transform([value])[0]
+    return index[value]
 
 @app.route("/api/feature-importance")
 def get_feature_importance():
@@ -74,51 +111,57 @@ def to_python_type(obj):
         return float(obj)
     return obj
 
+def encode_product(data):
+    material = canonical("material", data.get("material"), "Other")
+    weight = float(data.get("weight") or 0.0)
+    transport = canonical("transport", data.get("transport"), "Land")
+    recyclability = canonical("recyclability", data.get("recyclability"), "Medium")
+    origin = canonical("origin", data.get("origin"), "Other")
+    raw = {
+        "material": material,
+        "weight": weight,
+        "transport": transport,
+        "recyclability": recyclability,
+        "origin": origin
+    }
+    row = [
+        safe_encode(material, "material", "Other"),
+        weight,
+        safe_encode(transport, "transport", "Land"),
+        safe_encode(recyclability, "recyclability", "Medium"),
+        safe_encode(origin, "origin", "Other"),
+    ]
+    return raw, row
+
 @app.route("/predict", methods=["POST"])
 def predict_eco_score():
     try:
         data = request.get_json()
-        material = normalize_feature(data.get("material"), "Other")
-        weight = float(data.get("weight") or 0.0)
-        transport = normalize_feature(data.get("transport"), "Land")
-        recyclability = normalize_feature(data.get("recyclability"), "Medium")
-        origin = normalize_feature(data.get("origin"), "Other")
 
         # === Encode features
-        material_encoded = safe_encode(material, material_encoder, "Other")
-        transport_encoded = safe_encode(transport, transport_encoder, "Land")
-        recycle_encoded = safe_encode(recyclability, recycle_encoder, "Medium")
-        origin_encoded = safe_encode(origin, origin_encoder, "Other")
+        with stage_timer("predict", "encode"):
+            raw, row = encode_product(data)
+        material_encoded, weight, transport_encoded, recycle_encoded, origin_encoded = row
 
-        X = [[material_encoded, weight, transport_encoded, recycle_encoded, origin_encoded]]
-        prediction = model.predict(X)
-        decoded_score = label_encoder.inverse_transform([prediction[0]])[0]
+        X = [row]
+        with stage_timer("predict", "predict"):
+            prediction = model.predict(X)
+            decoded_score = label_encoder.inverse_transform([prediction[0]])[0]
 
         confidence = 0.0
         if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X)
+            with stage_timer("predict", "predict_proba"):
+                proba = model.predict_proba(X)
             confidence = round(max(proba[0]) * 100, 1)
 
-        # === Feature Importance *for this sample*
-        global_importance = model.feature_importances_
-        local_impact = {
-            "material": to_python_type(material_encoded * global_importance[0]),
-            "weight": to_python_type(weight * global_importance[1]),
-            "transport": to_python_type(transport_encoded * global_importance[2]),
-            "recyclability": to_python_type(recycle_encoded * global_importance[3]),
-            "origin": to_python_type(origin_encoded * global_importance[4])
-        }
+        # === Feature impact *for this sample*: each feature's share of the predicted class probability
+        with stage_timer("predict", "explain"):
+            local_impact = describe(explainer, *explanations.explain_rows(X)[0], score_names)["feature_impact"]
 
         return jsonify({
             "predicted_label": decoded_score,
             "confidence": f"{confidence}%",
-            "raw_input": {
-                "material": material,
-                "weight": weight,
-                "transport": transport,
-                "recyclability": recyclability,
-                "origin": origin
-            },
+            "raw_input": raw,
             "encoded_input": {
                 "material": to_python_type(material_encoded),
                 "weight": to_python_type(weight),
@@ -130,41 +173,32 @@ def predict_eco_score():
         })
 
     except Exception as e:
-        print(f"❌ Error in /predict: {e}")
+        log.error("❌ Error in /predict: %s", e)
         return jsonify({"error": str(e)}), 500
 
-# === Fuzzy Matching Helpers ===
-def fuzzy_match_material(material):
-    material_keywords = {
-        "Plastic": ["plastic", "plastics"],
-        "Glass": ["glass"],
-        "Aluminium": ["aluminium", "aluminum"],
-        "Steel": ["steel"],
-        "Paper": ["paper", "papers"],
-        "Cardboard": ["cardboard", "corrugated"],
-    }
-
-    material_lower = material.lower()
-    for clean, keywords in material_keywords.items():
-        if any(keyword in material_lower for keyword in keywords):
-            return clean
-    return material
-
-def fuzzy_match_origin(origin):
-    origin_keywords = {
-        "China": ["china"],
-        "UK": ["uk", "united kingdom"],
-        "USA": ["usa", "united states", "america"],
-        "Germany": ["germany"],
-        "France": ["france"],
-        "Italy": ["italy"],
-    }
+@app.route("/explain", methods=["POST"])
+def explain_predictions():
+    # One product, or {"products": [...]} explained in a single batch
+    try:
+        data = request.get_json() or {}
+        products = data.get("products") if isinstance(data.get("products"), list) else [data]
+        all_classes = bool(data.get("all_classes", False))
+
+        with stage_timer("explain", "encode"):
+            encoded = [encode_product(p or {}) for p in products]
+        with stage_timer("explain", "explain"):
+            results = explanations.explain_rows([row for _, row in encoded])
+
+        out = []
+        for (raw, _), (proba, contributions) in zip(encoded, results):
+            item = describe(explainer, proba, contributions, score_names, all_classes)
+            item["raw_input"] = raw
+            out.append(item)
+        return jsonify({"explanations": out, "cache": explanations.cache_info()})
 
-    origin_lower = origin.lower()
-    for clean, keywords in origin_keywords.items():
-        if any(keyword in origin_lower for keyword in keywords):
-            return clean
-    return origin
+    except Exception as e:
+        log.error("❌ Error in /explain: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 @app.route("/api/eco-data", methods=["GET"])
 def fetch_eco_dataset():
@@ -173,7 +207,7 @@ def fetch_eco_dataset():
         df = df.dropna(subset=["material", "true_eco_score", "co2_emissions"])
         return jsonify(df.to_dict(orient="records"))
     except Exception as e:
-        print(f"❌ Failed to return eco dataset: {e}")
+        log.error("❌ Failed to return eco dataset: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/insights", methods=["GET"])
@@ -189,7 +223,7 @@ def insights_dashboard():
 
         return jsonify(insights.to_dict(orient="records"))
     except Exception as e:
-        print(f"❌ Failed to serve insights: {e}")
+        log.error("❌ Failed to serve insights: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/feedback", methods=["POST"])
@@ -197,7 +231,7 @@ def save_feedback():
     try:
         data = request.get_json()
         feedback_dir = os.path.join("ml_model", "user_feedback.json")
-        print("Received feedback:", data)
+        log.info("Received feedback: %s", data)
         # Append to file
         import json
         existing = []
@@ -213,7 +247,7 @@ def save_feedback():
         return jsonify({"message": "✅ Feedback saved!"}), 200
 
     except Exception as e:
-        print(f"❌ Feedback error: {e}")
+        log.error("❌ Feedback error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -225,24 +259,27 @@ def estimate_emissions():
         include_packaging = data.get("include_packaging", True)
 
         if url:
-            product = scrape_amazon_product_page(url)
+            with stage_timer("estimate_emissions", "scrape"):
+                product = scrape_amazon_product_page(url)
             title = product.get("title", "Amazon Product")
-            material = normalize_feature(product.get("material_type"), "Other")
-            transport = normalize_feature(data.get("transport") or product.get("transport_mode"), "Land")
-            recyclability = normalize_feature(product.get("recyclability"), "Medium")
+            material = canonical("material", product.get("material_type"), "Other")
+            transport = canonical("transport", data.get("transport") or product.get("transport_mode"), "Land")
+            recyclability = canonical("recyclability", product.get("recyclability"), "Medium")
 
-            origin = normalize_feature(
-                product.get("brand_estimated_origin") or product.get("origin"), 
+            origin = canonical(
+                "origin", product.get("brand_estimated_origin") or product.get("origin"),
                 "Other"
             )
 
             if origin in ["Unknown", "Other", None, ""] and title:
-                guessed = estimate_origin_country(title)
+                with stage_timer("estimate_emissions", "origin_fallback"):
+                    guessed = estimate_origin_country(title)
                 if guessed and guessed.lower() != "other":
-                    print(f"🧠 Fallback origin estimate from title: {guessed}")
-                    origin = guessed
+                    log.info("🧠 Fallback origin estimate from title: %s", guessed)
+                    ORIGIN_SOURCES.inc(source="api_title_guess")
+                    origin = canonical("origin", guessed, "Other")
                 else:
-                    print(f"🔒 Skipped fallback — origin already trusted: {origin}")
+                    log.debug("🔒 Skipped fallback — origin already trusted: %s", origin)
 
 
             dimensions = product.get("dimensions_cm")
@@ -255,16 +292,16 @@ def estimate_emissions():
                 weight = 0.5
 
             if include_packaging:
-                weight *= 1.05
+                weight *= APP_PACKAGING_FACTOR
 
-            print(f"✅ Final product weight used: {weight} kg")
+            log.debug("✅ Final product weight used: %s kg", weight)
 
 
             raw_weight = product.get("raw_product_weight_kg")
             estimated_weight = product.get("estimated_weight_kg")
             weight = float(raw_weight or estimated_weight or 0.5)
             if include_packaging:
-                weight *= 1.05
+                weight *= APP_PACKAGING_FACTOR
 
             try:
                 weight = float(raw_weight or estimated_weight or 0.5)
@@ -272,16 +309,16 @@ def estimate_emissions():
                 weight = 0.5
 
             if include_packaging:
-                weight *= 1.05
+                weight *= APP_PACKAGING_FACTOR
 
-            print(f"✅ Final product weight used: {weight} kg")
+            log.debug("✅ Final product weight used: %s kg", weight)
 
         else:
             title = data.get("title", "Manual Product")
-            material = normalize_feature(data.get("material"), "Other")
-            transport = normalize_feature(data.get("transport"), "Land")
-            recyclability = normalize_feature(data.get("recyclability"), "Medium")
-            origin = normalize_feature(data.get("origin"), "Other")
+            material = canonical("material", data.get("material"), "Other")
+            transport = canonical("transport", data.get("transport"), "Land")
+            recyclability = canonical("recyclability", data.get("recyclability"), "Medium")
+            origin = canonical("origin", data.get("origin"), "Other")
             dimensions = None
 
             try:
@@ -290,74 +327,68 @@ def estimate_emissions():
                 weight = 0.5
 
             if include_packaging:
-                weight *= 1.05
+                weight *= APP_PACKAGING_FACTOR
 
-            print(f"✅ Final manual product weight used: {weight} kg")
+            log.debug("✅ Final manual product weight used: %s kg", weight)
 
 
-        # Fuzzy material and origin mappings
-        material = fuzzy_match_material(material)
-        origin = fuzzy_match_origin(origin)
-
         # Calculate carbon
-        carbon_kg = round(weight * material_co2_map.get(material, 2.0), 2)
+        carbon_kg = material_carbon(weight, material, material_co2_map)
 
         # ML prediction
-        X = pd.DataFrame([[ 
-            safe_encode(material, material_encoder, "Other"),
-            weight,
-            safe_encode(transport, transport_encoder, "Land"),
-            safe_encode(recyclability, recycle_encoder, "Medium"),
-            safe_encode(origin, origin_encoder, "Other")
-        ]], columns=["material_encoded", "weight", "transport_encoded", "recycle_encoded", "origin_encoded"])
+        with stage_timer("estimate_emissions", "encode"):
+            X = pd.DataFrame([[ 
+                safe_encode(material, "material", "Other"),
+                weight,
+                safe_encode(transport, "transport", "Land"),
+                safe_encode(recyclability, "recyclability", "Medium"),
+                safe_encode(origin, "origin", "Other")
+            ]], columns=["material_encoded", "weight", "transport_encoded", "recycle_encoded", "origin_encoded"])
 
         decoded_score = "C"
         confidence = 0.0
         try:
-            prediction = model.predict(X)[0]
-            decoded_score = label_encoder.inverse_transform([prediction])[0]
+            with stage_timer("estimate_emissions", "predict"):
+                prediction = model.predict(X)[0]
+                decoded_score = label_encoder.inverse_transform([prediction])[0]
             if decoded_score not in valid_scores:
                 decoded_score = "C"
             if hasattr(model, "predict_proba"):
-                proba = model.predict_proba(X)
+                with stage_timer("estimate_emissions", "predict_proba"):
+                    proba = model.predict_proba(X)
                 confidence = round(max(proba[0]) * 100, 1)
             
         except Exception as e:
-            print(f"⚠️ Prediction failed: {e}")
+            log.warning("⚠️ Prediction failed: %s", e)
 
         # Logging
         try:
             log_path = os.path.join(model_dir, "eco_dataset.csv")
-            with open(log_path, "a", newline='', encoding="utf-8") as f:
+            with stage_timer("estimate_emissions", "csv_log"), open(log_path, "a", newline='', encoding="utf-8") as f:
                 writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
                 writer.writerow([title, material, f"{weight:.2f}", transport, recyclability, decoded_score, carbon_kg, origin])
         except Exception as log_error:
-            print(f"⚠️ Logging skipped: {log_error}")
+            log.warning("⚠️ Logging skipped: %s", log_error)
             
             # 🔒 Log only real, valid scraped entries to a separate dataset for training
         try:
             if url:  # confirms this was a scraped product
-                valid_materials = list(material_encoder.classes_)
-                valid_transports = list(transport_encoder.classes_)
-                valid_recyclability = list(recycle_encoder.classes_)
-                valid_origins = list(origin_encoder.classes_)
-
                 if (
                     decoded_score in valid_scores and
-                    material in valid_materials and
-                    transport in valid_transports and
-                    recyclability in valid_recyclability and
-                    origin in valid_origins
+                    material in encoder_index["material"] and
+                    transport in encoder_index["transport"] and
+                    recyclability in encoder_index["recyclability"] and
+                    origin in encoder_index["origin"]
                 ):
                     clean_log_path = os.path.join(model_dir, "real_scraped_dataset.csv")
-                    with open(clean_log_path, "a", newline='', encoding="utf-8") as f:
+                    with stage_timer("estimate_emissions", "csv_log"), open(clean_log_path, "a", newline='', encoding="utf-8") as f:
                         writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
                         writer.writerow([title, material, f"{weight:.2f}", transport, recyclability, decoded_score, carbon_kg, origin])
-                    print("✅ Logged to real_scraped_dataset.csv")
+                    log.debug("✅ Logged to real_scraped_dataset.csv")
                 else:
-                    print("⚠️ Skipped real_scraped_dataset.csv log: one or more values are invalid.")
+                    log.debug("⚠️ Skipped real_scraped_dataset.csv log: one or more values are invalid.")
         except Exception as clean_log_error:
-            print(f"⚠️ Logging to real_scraped_dataset.csv failed: {clean_log_error}")
+            log.warning("⚠️ Logging to real_scraped_dataset.csv failed: %s", clean_log_error)
 
 
         # Emojis
@@ -365,13 +396,10 @@ def estimate_emissions():
             "A+": "🌍", "A": "🌿", "B": "🍃",
             "C": "🌱", "D": "⚠️", "E": "❌", "F": "💀"
         }
-        print(f"🎯 Returning final origin: {origin}")
+        log.debug("🎯 Returning final origin: %s", origin)
 
-        import pprint
-        pprint.pprint({
-            "distance_from_origin_km": product.get("distance_origin_to_uk"),
-            "distance_from_uk_hub_km": product.get("distance_uk_to_user")
-        })
+        log.debug("📏 Distances: %s km from origin, %s km from UK hub",
+                  product.get("distance_origin_to_uk"), product.get("distance_uk_to_user"))
 
 
         return jsonify({
@@ -379,8 +407,8 @@ def estimate_emissions():
                 "attributes": {
                     "eco_score_ml": f"{decoded_score} {emoji_map.get(decoded_score, '')} ({confidence}%)",
                     "eco_score_confidence": f"{confidence}%",
-                    "ml_carbon_kg": round(weight * 1.2, 2),  # or whatever variable you're using
-                    "trees_to_offset": max(1, round(carbon_kg / 15)),  # assumes 1 tree offsets ~15 kg CO₂/year
+                    "ml_carbon_kg": ml_carbon(weight),
+                    "trees_to_offset": trees_to_offset(carbon_kg),
                     "material_type": material,
                     "weight_kg": round(weight, 2),  # weight incl packaging
                     "raw_product_weight_kg": round(raw_weight or estimated_weight or 0.5, 2),
@@ -399,14 +427,14 @@ def estimate_emissions():
 
 
     except Exception as e:
-        print(f"❌ Uncaught error: {e}")
+        log.error("❌ Uncaught error: %s", e)
         return jsonify({"error": str(e)}), 500
 
 @app.route("/test_post", methods=["POST"])
 def test_post():
     try:
         data = request.get_json()
-        print("✅ Received test POST:", data)
+        log.info("✅ Received test POST: %s", data)
         return jsonify({"message": "Success", "you_sent": data}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -416,10 +444,6 @@ def test_post():
 def test():
     return "✅ Server is working!"
 
-if __name__ == '__main__':
-    app.run(host="0.0.0.0", port=5000, debug=True)
-
-
 @app.route("/health")
 def health():
     return jsonify({"status": "✅ Server is up"}), 200
@@ -429,6 +453,10 @@ def home():
     return "<h2>🌍 EcoImpact API is Live</h2>"
 
 
-
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 10000)))
+    # Dev server only — use serve.py (or gunicorn wsgi:app --preload) in production
+    app.run(
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 10000)),
+        debug=os.environ.get("FLASK_ENV") == "development",
+    )
@@ -0,0 +1,109 @@
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+# Load-test harness for serve.py: starts the preforked server at each worker
+# count, hammers /predict from separate client processes and reports
+# requests/second and latency percentiles.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+PAYLOADS = [
+    {"material": "Plastic", "weight": 0.6, "transport": "Ship", "recyclability": "Low", "origin": "China"},
+    {"material": "Glass", "weight": 1.2, "transport": "Land", "recyclability": "High", "origin": "UK"},
+    {"material": "Steel", "weight": 2.4, "transport": "Air", "recyclability": "Medium", "origin": "Germany"},
+    {"material": "Bamboo", "weight": 0.3, "transport": "Ship", "recyclability": "Medium", "origin": "India"},
+]
+
+
+def wait_until_up(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def client(port, path, duration, seed):
+    latencies = []
+    errors = 0
+    i = seed
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        body = json.dumps(PAYLOADS[i % len(PAYLOADS)])
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            conn.close()
+            if resp.status != 200:
+                errors += 1
+        except OSError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_level(workers, args):
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(script_dir, "serve.py"), "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(workers)],
+        cwd=args.cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_until_up(args.port):
+            raise RuntimeError(f"serve.py did not come up with {workers} worker(s)")
+
+        # Warm every worker before measuring
+        client(args.port, args.path, 1.0, 0)
+
+        with multiprocessing.Pool(args.concurrency) as pool:
+            results = pool.starmap(
+                client, [(args.port, args.path, args.duration, seed) for seed in range(args.concurrency)]
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(l for lat, _ in results for l in lat)
+    errors = sum(e for _, e in results)
+    rps = len(latencies) / args.duration
+    print(
+        f"workers={workers:<3} requests={len(latencies):<7} errors={errors:<5} rps={rps:8.1f}"
+        f"  p50={percentile(latencies, 50) * 1000:7.2f} ms  p99={percentile(latencies, 99) * 1000:7.2f} ms",
+        flush=True,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="📈 Load-test /predict through serve.py at several worker counts.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--concurrency", type=int, default=32, help="Number of client processes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker level")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--path", default="/predict")
+    parser.add_argument("--cwd", default=script_dir, help="Directory the server runs in (must contain ml_model/)")
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        run_level(workers, args)
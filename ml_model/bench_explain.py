@@ -0,0 +1,137 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Latency budget for tree-path explanations. Times a /predict-shaped Flask
+# route (JSON in, encode, predict + predict_proba, jsonify) with and without
+# the explanation, cold (cache miss) and warm (cache hit), plus batched
+# /explain throughput. The three variants run interleaved for --rounds
+# rounds. Noise (GC, CPU frequency, other processes) only ever adds time,
+# so the budget is checked on each variant's best round; medians are
+# printed alongside. Exits 1 if the best-of-N cold overhead is above --budget.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from explain import ExplanationCache, ForestExplainer, describe  # noqa: E402
+from model_bundle import BUNDLE_NAME, load_bundle  # noqa: E402
+
+
+def load_model(model_dir):
+    bundle_path = os.path.join(model_dir, BUNDLE_NAME)
+    if os.path.exists(bundle_path):
+        return load_bundle(bundle_path).model, f"bundle {bundle_path}"
+    pkl_path = os.path.join(model_dir, "eco_model.pkl")
+    if os.path.exists(pkl_path):
+        import joblib
+        return joblib.load(pkl_path), f"pickle {pkl_path}"
+    # Neither exists (fresh checkout): fit the same forest train_model.py would on the logged rows
+    from sklearn.ensemble import RandomForestClassifier
+    from compact_dataset import COUNT_COLUMN, compact, load_rows
+    df, _ = compact(load_rows(os.path.join(model_dir, "eco_dataset.csv")).dropna(), threshold=None)
+    codes = {c: df[c].astype("category").cat.codes for c in ["material", "transport", "recyclability", "origin", "true_eco_score"]}
+    X = np.column_stack([codes["material"], df["weight"], codes["transport"], codes["recyclability"], codes["origin"]])
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X, codes["true_eco_score"], sample_weight=df[COUNT_COLUMN])
+    return model, "forest fitted on eco_dataset.csv"
+
+
+def time_per_call(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def interleaved_rounds(fns, repeat, rounds):
+    # {name: fn} -> {name: [seconds per call, one per round]}, the variants interleaved round by round
+    for fn in fns.values():
+        for _ in range(max(3, repeat // 10)):
+            fn()
+    samples = {name: [] for name in fns}
+    for _ in range(rounds):
+        for name, fn in fns.items():
+            samples[name].append(time_per_call(fn, repeat))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="⏱️ Explanation latency budget.")
+    parser.add_argument("--model-dir", default=script_dir)
+    parser.add_argument("--repeat", type=int, default=100, help="Calls per timing round")
+    parser.add_argument("--rounds", type=int, default=15, help="Interleaved timing rounds; the best round is compared")
+    parser.add_argument("--budget", type=float, default=0.25,
+                        help="Max cold explanation overhead as a share of /predict latency")
+    args = parser.parse_args()
+
+    from flask import Flask, jsonify, request
+
+    model, source = load_model(args.model_dir)
+    explainer = ForestExplainer(model)
+    print(f"🌲 {source}: {len(explainer.roots)} trees, {len(explainer.delta)} nodes")
+
+    rng = np.random.default_rng(0)
+    n_rows = 4096
+    rows = np.column_stack([rng.integers(0, 8, n_rows), np.round(rng.uniform(0.1, 2.0, n_rows), 2),
+                            rng.integers(0, 3, n_rows), rng.integers(0, 3, n_rows), rng.integers(0, 12, n_rows)])
+    # Cold: no cache, so every call walks the trees; warm: the default LRU
+    caches = {"cold": ExplanationCache(explainer, maxsize=0), "warm": ExplanationCache(explainer)}
+    state = {"i": 0}
+
+    app = Flask(__name__)
+
+    @app.route("/predict/<mode>", methods=["POST"])
+    def predict(mode):
+        data = request.get_json()
+        X = [[float(data[k]) for k in ("material", "weight", "transport", "recyclability", "origin")]]
+        label = model.predict(X)[0]
+        confidence = round(float(np.max(model.predict_proba(X)[0])) * 100, 1)
+        out = {"predicted_label": str(label), "confidence": f"{confidence}%"}
+        if mode != "none":
+            out["feature_impact"] = describe(explainer, *caches[mode].explain_rows(X)[0])["feature_impact"]
+        return jsonify(out)
+
+    client = app.test_client()
+
+    def call(mode):
+        def run():
+            # Cold: a new row every call and no cache; warm: the same row, cached
+            i = state["i"] = (state["i"] + 1) % n_rows if mode == "cold" else 0
+            row = rows[i]
+            client.post(f"/predict/{mode}", json=dict(zip(("material", "weight", "transport", "recyclability", "origin"), row.tolist())))
+        return run
+
+    samples = interleaved_rounds({mode: call(mode) for mode in ("none", "cold", "warm")}, args.repeat, args.rounds)
+    best = {mode: min(t) for mode, t in samples.items()}
+    median = {mode: float(np.median(t)) for mode, t in samples.items()}
+    base = best["none"]
+    cold_share = (best["cold"] - base) / base
+    print(f"Best / median of {args.rounds} rounds x {args.repeat} calls:")
+    for mode, label in [("none", "without explanation "), ("cold", "explanation cold    "), ("warm", "explanation cached  ")]:
+        print(f"/predict, {label}: {best[mode] * 1000:7.3f} ms ({(best[mode] - base) / base:+.0%}) "
+              f"| median {median[mode] * 1000:7.3f} ms ({(median[mode] - median['none']) / median['none']:+.0%})")
+
+    print("\nBatched explain (no cache):")
+    for n in (1, 32, 256, 4096):
+        X = rows[:n]
+        t_pred = time_per_call(lambda: model.predict_proba(X), max(3, args.repeat // n))
+        t_expl = time_per_call(lambda: explainer.explain(X), max(3, args.repeat // n))
+        print(f"  {n:>5} rows: predict_proba {t_pred * 1000:8.2f} ms | explain {t_expl * 1000:8.2f} ms "
+              f"({n / t_expl:,.0f} rows/s)")
+
+    proba, _ = explainer.explain(rows[:256])
+    err = float(np.abs(proba - model.predict_proba(rows[:256])).max())
+    print(f"\n🔎 max |base + Σ contributions − predict_proba| = {err:.2e}")
+
+    if cold_share > args.budget or err > 1e-9:
+        print(f"❌ Over budget: cold explanation adds {cold_share:.0%} (budget {args.budget:.0%})")
+        sys.exit(1)
+    print(f"✅ Within budget ({args.budget:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Compares cold start and per-worker memory of the joblib pickles vs the
+# memory-mapped bundle. Each "worker" is a separate interpreter, like a
+# gunicorn worker without --preload, and all of them stay alive together so
+# the shared (page cache) part of their memory shows up in PSS.
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+WORKER_CODE = r"""
+import os, sys, time, json
+t0 = time.perf_counter()
+fmt, model_dir = sys.argv[1], sys.argv[2]
+if fmt == "bundle":
+    sys.path.insert(0, sys.argv[3])
+    from model_bundle import load_bundle
+    bundle = load_bundle(os.path.join(model_dir, "eco_model.bundle"))
+    model, encoders = bundle.model, bundle.encoders
+else:
+    import joblib
+    model = joblib.load(os.path.join(model_dir, "eco_model.pkl"))
+    encoders = {}
+    for name in ["material", "transport", "recycle", "label", "origin"]:
+        path = os.path.join(model_dir, "encoders", f"{name}_encoder.pkl")
+        if os.path.exists(path):
+            encoders[name] = joblib.load(path)
+load_s = time.perf_counter() - t0
+t1 = time.perf_counter()
+model.predict_proba([[0] * model.n_features_in_])
+first_predict_s = time.perf_counter() - t1
+print(json.dumps({"load_s": load_s, "first_predict_s": first_predict_s}), flush=True)
+sys.stdin.read()
+"""
+
+
+def read_memory(pid):
+    mem = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                mem["rss_mb"] = int(line.split()[1]) / 1024
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    mem["pss_mb"] = int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return mem
+
+
+def run_format(fmt, model_dir, workers):
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-W", "ignore", "-c", WORKER_CODE, fmt, model_dir, script_dir],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    try:
+        for p in procs:
+            line = p.stdout.readline()
+            if not line:
+                raise RuntimeError(f"{fmt} worker exited before loading the model")
+            results.append(json.loads(line))
+        for p, r in zip(procs, results):
+            r.update(read_memory(p.pid))
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+    return results
+
+
+def summarize(fmt, results):
+    n = len(results)
+    avg = lambda key: sum(r.get(key, 0) for r in results) / n
+    print(
+        f"{fmt:>7} | workers={n:<3} load={avg('load_s') * 1000:8.1f} ms"
+        f"  first_predict={avg('first_predict_s') * 1000:7.2f} ms"
+        f"  rss/worker={avg('rss_mb'):7.1f} MB  pss/worker={avg('pss_mb'):7.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="⏱️ Benchmark model loading: joblib pickles vs memory-mapped bundle.")
+    parser.add_argument("--model-dir", default=script_dir)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    formats = []
+    if os.path.exists(os.path.join(args.model_dir, "eco_model.pkl")):
+        formats.append("joblib")
+    if os.path.exists(os.path.join(args.model_dir, "eco_model.bundle")):
+        formats.append("bundle")
+    if not formats:
+        sys.exit(f"❌ No eco_model.pkl or eco_model.bundle in {args.model_dir}")
+
+    for workers in args.workers:
+        for fmt in formats:
+            summarize(fmt, run_format(fmt, args.model_dir, workers))
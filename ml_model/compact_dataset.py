@@ -0,0 +1,195 @@
+import argparse
+import csv
+import os
+import re
+import time
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Compacts the append-only logs (eco_dataset.csv, prediction_log.csv), where
+# every request for the same product adds the same line again:
+#   1. near-duplicate titles ("... 500ml", "... 500 ml, Black") are grouped
+#      with MinHash + LSH and rewritten to the group's most common title
+#   2. identical rows are collapsed into one with a `count` column
+# train_model.py passes `count` as sample_weight, so a compacted row weighs
+# as much as the duplicates it replaced.
+
+# === CONFIG ===
+DATASET_COLUMNS = ["title", "material", "weight", "transport", "recyclability", "true_eco_score", "co2_emissions", "origin"]
+PREDICTION_LOG_COLUMNS = ["material", "weight", "transport", "recyclability", "origin", "prediction"]
+COUNT_COLUMN = "count"
+NUM_PERM = 64          # MinHash signature length
+BANDS = 16             # LSH bands of NUM_PERM // BANDS rows; pairs above ~0.5 similarity become candidates
+SHINGLE = 4            # character n-grams
+TITLE_THRESHOLD = 0.8  # estimated Jaccard similarity needed to merge two titles
+
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 1 << 31, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, NUM_PERM, dtype=np.uint64)
+
+
+# === Loading ===
+def load_rows(path, columns=DATASET_COLUMNS):
+    # No header (or one repeated by earlier generator runs, dropped here). Older
+    # prediction_log.csv lines predate the middle columns, so short rows keep
+    # their leading fields and their last one, with the gap left empty.
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        lines = [r for r in csv.reader(f) if r]
+    has_count = bool(lines) and lines[0][-1] == COUNT_COLUMN
+    names = columns + [COUNT_COLUMN] if has_count else columns
+    rows = []
+    for r in lines:
+        if r[0] == names[0]:
+            continue
+        if len(r) < len(names):
+            r = r[:-1] + [""] * (len(names) - len(r)) + r[-1:]
+        rows.append(r[:len(names)])
+    df = pd.DataFrame(rows, columns=names)
+    for col in ("weight", "co2_emissions"):
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if has_count:
+        df[COUNT_COLUMN] = pd.to_numeric(df[COUNT_COLUMN], errors="coerce").fillna(1).astype(np.int64)
+    return df
+
+
+# === MinHash title grouping ===
+def normalize_title(title):
+    return re.sub(r"[^a-z0-9]+", " ", str(title).lower()).strip()
+
+
+def shingles(title):
+    text = f" {normalize_title(title)} "
+    grams = {text[i:i + SHINGLE] for i in range(max(1, len(text) - SHINGLE + 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(titles):
+    # One row of NUM_PERM minimums of (a*h + b) mod p per title
+    signatures = np.empty((len(titles), NUM_PERM), dtype=np.uint64)
+    for i, title in enumerate(titles):
+        h = shingles(title)
+        signatures[i] = ((h[:, None] * _A + _B) % _PRIME).min(axis=0)
+    return signatures
+
+
+def group_titles(titles, weights=None, threshold=TITLE_THRESHOLD):
+    # Returns {title: canonical title}; the canonical one is the most frequent in its group
+    titles = list(titles)
+    weights = [1] * len(titles) if weights is None else list(weights)
+    if not titles:
+        return {}
+    signatures = minhash(titles)
+
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    rows = NUM_PERM // BANDS
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i in range(len(titles)):
+            buckets[chunk[i].tobytes()].append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                a, b = find(first), find(other)
+                if a != b and np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[b] = a
+
+    groups = defaultdict(list)
+    for i in range(len(titles)):
+        groups[find(i)].append(i)
+    canonical = {}
+    for members in groups.values():
+        best = max(members, key=lambda i: (weights[i], -len(titles[i])))
+        for i in members:
+            canonical[titles[i]] = titles[best]
+    return canonical
+
+
+# === Compaction ===
+def compact(df, keys=None, title_column="title", threshold=TITLE_THRESHOLD):
+    # Collapses rows that are identical on `keys` (default: every column) into one with a count
+    start = time.perf_counter()
+    rows_in = int(df[COUNT_COLUMN].sum()) if COUNT_COLUMN in df else len(df)
+    df = df.copy()
+    if COUNT_COLUMN not in df:
+        df[COUNT_COLUMN] = 1
+    keys = list(keys) if keys else [c for c in df.columns if c != COUNT_COLUMN]
+
+    titles_in = titles_out = None
+    if title_column in keys and threshold is not None:
+        per_title = df.groupby(title_column, sort=False)[COUNT_COLUMN].sum()
+        canonical = group_titles(per_title.index, per_title.to_numpy(), threshold)
+        df[title_column] = df[title_column].map(canonical)
+        titles_in, titles_out = len(canonical), len(set(canonical.values()))
+
+    others = {c: "first" for c in df.columns if c not in keys and c != COUNT_COLUMN}
+    out = (df.groupby(keys, sort=False, dropna=False)
+             .agg({COUNT_COLUMN: "sum", **others})
+             .reset_index()[[c for c in df.columns if c != COUNT_COLUMN] + [COUNT_COLUMN]])
+
+    report = {
+        "rows_in": rows_in,
+        "rows_out": len(out),
+        "rows_saved": rows_in - len(out),
+        "ratio": round(rows_in / max(len(out), 1), 2),
+        "largest_group": int(out[COUNT_COLUMN].max()) if len(out) else 0,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    if titles_in is not None:
+        report.update({"titles_in": titles_in, "title_groups": titles_out})
+    return out, report
+
+
+def expand(df):
+    # Back to one row per original line (for tools that don't understand `count`)
+    return df.loc[df.index.repeat(df[COUNT_COLUMN])].drop(columns=COUNT_COLUMN).reset_index(drop=True)
+
+
+def print_report(report, label):
+    print(f"📦 {label}: {report['rows_in']} rows → {report['rows_out']} "
+          f"({report['rows_saved']} saved, {report['ratio']}x, largest group {report['largest_group']}) "
+          f"in {report['seconds']}s")
+    if "titles_in" in report:
+        print(f"🔤 {report['titles_in']} distinct titles → {report['title_groups']} near-duplicate groups")
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="📦 Dedupe and compact the training / request logs.")
+    parser.add_argument("path", nargs="?", default=os.path.join(script_dir, "eco_dataset.csv"))
+    parser.add_argument("--kind", choices=["dataset", "prediction_log"], default=None,
+                        help="Column layout (default: guessed from the file name)")
+    # Always a separate file: app.py keeps appending headerless 8-column rows to the
+    # logs, so they are never rewritten in this header + `count` layout.
+    # train_model.py --dataset reads the output directly.
+    parser.add_argument("--out", default=None, help="Default: <name>.compact.csv next to the input")
+    parser.add_argument("--threshold", type=float, default=TITLE_THRESHOLD, help="Title similarity to merge at")
+    parser.add_argument("--no-titles", action="store_true", help="Exact dedupe only, keep titles as they are")
+    args = parser.parse_args()
+
+    kind = args.kind or ("prediction_log" if "prediction_log" in os.path.basename(args.path) else "dataset")
+    columns = PREDICTION_LOG_COLUMNS if kind == "prediction_log" else DATASET_COLUMNS
+    df = load_rows(args.path, columns)
+    compacted, report = compact(df, threshold=None if args.no_titles else args.threshold)
+
+    out = args.out or os.path.splitext(args.path)[0] + ".compact.csv"
+    if os.path.abspath(out) == os.path.abspath(args.path):
+        parser.error("--out must not be the input log (it stays append-only)")
+    tmp = out + ".tmp"
+    compacted.to_csv(tmp, index=False)
+    os.replace(tmp, out)
+
+    print_report(report, os.path.basename(args.path))
+    print(f"✅ Saved {len(compacted)} rows to {out}")
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Per-prediction explanations for the random forest: exact tree-path
+# (Saabas) contributions. Walking a sample down a tree, every split moves the
+# node's class distribution; that change is credited to the split's feature.
+# Averaged over the trees this gives, for every class,
+#     predict_proba(x) == base + sum(contributions over features)
+# exactly. A batch walks all of its (sample, tree) pairs together, one depth
+# level per step, like BundledForest.apply().
+
+FEATURES = ["material", "weight", "transport", "recyclability", "origin"]
+CACHE_SIZE = 4096
+BATCH_ROWS = 64  # rows walked together; bounds the per-walker accumulator
+
+
+def _forest_arrays(model):
+    # BundledForest already holds flat arrays; a joblib sklearn forest gets flattened once
+    if hasattr(model, "children_left"):
+        return {name: getattr(model, name) for name in ("children_left", "children_right", "feature", "threshold", "value", "roots")}
+    try:
+        from .model_bundle import forest_arrays
+    except ImportError:
+        from model_bundle import forest_arrays
+    return forest_arrays(model)
+
+
+class ForestExplainer:
+    def __init__(self, model, feature_names=FEATURES):
+        arrays = _forest_arrays(model)
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.roots = arrays["roots"]
+        self.classes_ = np.asarray(model.classes_)
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+
+        value = np.asarray(arrays["value"], dtype=np.float64)
+        parent = np.arange(len(value))
+        for children in (self.children_left, self.children_right):
+            has = children != -1
+            parent[children[has]] = np.flatnonzero(has)
+        # Change in class distribution from parent to node (0 at the roots)
+        self.delta = value - value[parent]
+        self.base = value[self.roots].mean(axis=0)
+
+    def explain(self, X):
+        # -> probabilities (n, classes), contributions (n, features, classes)
+        X = np.asarray(X, dtype=np.float32)  # same split semantics as sklearn / BundledForest
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        parts = [self._explain_chunk(X[i:i + BATCH_ROWS]) for i in range(0, X.shape[0], BATCH_ROWS)]
+        contributions = np.concatenate(parts) if len(parts) != 1 else parts[0]
+        return self.base + contributions.sum(axis=1), contributions
+
+    def _explain_chunk(self, X):
+        n, n_trees = X.shape[0], len(self.roots)
+        # One accumulator per (sample, tree) walker; a walker touches one feature per
+        # step, so the fancy-index add below never sees a repeated index
+        acc = np.zeros((n * n_trees * self.n_features, len(self.base)))
+        walker = np.arange(n * n_trees)
+        nodes = np.tile(self.roots, n)
+        while True:
+            left = self.children_left[nodes]
+            internal = left != -1
+            if not internal.all():
+                walker, nodes, left = walker[internal], nodes[internal], left[internal]
+                if not nodes.size:
+                    break
+            feat = self.feature[nodes]
+            step = np.where(X[walker // n_trees, feat] <= self.threshold[nodes], left, self.children_right[nodes])
+            acc[walker * self.n_features + feat] += self.delta[step]
+            nodes = step
+        return acc.reshape(n, n_trees, self.n_features, -1).sum(axis=1) / n_trees
+
+
+class ExplanationCache:
+    # LRU keyed on the encoded feature row, so repeat lookups of a product skip the walk
+    def __init__(self, explainer, maxsize=CACHE_SIZE):
+        self.explainer = explainer
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(row):
+        return tuple(float(v) for v in row)
+
+    def explain_rows(self, rows):
+        # -> list of (probabilities, contributions) per row; misses are computed in one batch
+        keys = [self.key(r) for r in rows]
+        results, missing = {}, []
+        with self.lock:
+            for k in keys:
+                if k in self.entries:
+                    self.entries.move_to_end(k)
+                    results[k] = self.entries[k]
+                    self.hits += 1
+                elif k not in results and k not in missing:
+                    missing.append(k)
+                    self.misses += 1
+        if missing:
+            proba, contributions = self.explainer.explain(missing)
+            with self.lock:
+                for i, k in enumerate(missing):
+                    results[k] = self.entries[k] = (proba[i], contributions[i])
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return [results[k] for k in keys]
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+def describe(explainer, proba, contributions, class_names=None, all_classes=False):
+    # JSON-ready explanation of one row for its predicted class (or every class)
+    names = [str(c) for c in (explainer.classes_ if class_names is None else class_names)]
+    idx = int(np.argmax(proba))
+    out = {
+        "predicted_label": names[idx],
+        "probability": round(float(proba[idx]), 4),
+        "base_value": round(float(explainer.base[idx]), 4),
+        "feature_impact": {f: round(float(contributions[i, idx]), 4) for i, f in enumerate(explainer.feature_names)},
+    }
+    if all_classes:
+        out["per_class"] = {
+            name: {f: round(float(contributions[i, j]), 4) for i, f in enumerate(explainer.feature_names)}
+            for j, name in enumerate(names)
+        }
+    return out
@@ -1,8 +1,18 @@
-import csv
+import argparse
 import os
+import sys
 import time
-import random
-from random import choice, uniform
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Extension"))
+from emissions import Coded, dataset_carbon  # noqa: E402
+
+# Synthetic eco_dataset.csv rows, generated in NumPy blocks. Each block of
+# BLOCK_SIZE rows draws from its own stream seeded with (seed, block index),
+# so the same --seed, --rows and --balance always give the same file,
+# whatever --chunk-size is.
 
 # --- Config ---
 search_terms = [
@@ -10,122 +20,206 @@ search_terms = [
     "eco tote bag", "solar charger", "compost bin", "glass food container",
     "protein powder", "iphone", "electric guitar", "amplifier", "office chair",
     "notepad", "pencils", "snowboard", "aftershave", "canvas", "deodrant",
-    "lighter", "laptop", "bicycle", "hammer", "chopping board", "hammock"
+    "lighter", "laptop", "bicycle", "hammer", "chopping board", "hammock",
     "photo frame", "books", "plant pot", "piano", "clock", "portable charger",
     "cat food", "vinyl", "headphones", "marker", "moisturiser", "playstation",
     "beanie", "necklace", "extension cord", "nail clippers", "glow sticks", "fork"
 ]
-max_products = 100
-rows = []
+max_products = 100  # per term, the default --rows
 
+materials = ["Plastic", "Bamboo", "Other", "Glass", "Steel", "Cardboard", "Aluminum", "Paper"]
+transports = ["Land", "Air", "Ship"]
+recyclabilities = ["Low", "Medium", "High"]
 origins = ["UK", "China", "Germany", "USA", "Italy", "France", "Singapore", "Brazil", "India", "Norway", "Russia", "Japan"]
+scores = ["A+", "A", "B", "C", "D", "E", "F"]
+fallback_scores = ["A", "B", "C", "D", "E", "F"]
+
+# Carbon factors live in Extension/emissions.py (DATASET_*)
+material_recyclability = {
+    "Plastic": "Low",
+    "Glass": "High", "Aluminum": "High", "Steel": "High",
+    "Bamboo": "Medium", "Cardboard": "Medium", "Paper": "Medium",
+}  # anything else: random
+
+COLUMNS = ["title", "material", "weight", "transport", "recyclability", "true_eco_score", "co2_emissions", "origin"]
+BLOCK_SIZE = 65536
+
+# Lookup arrays indexed by category code
+_FIXED_RECYCLE = np.array([recyclabilities.index(material_recyclability.get(m, "Low")) for m in materials])
+_RANDOM_RECYCLE = np.array([m not in material_recyclability for m in materials])
+_M = {m: i for i, m in enumerate(materials)}
+_T = {t: i for i, t in enumerate(transports)}
+_S = {s: i for i, s in enumerate(scores)}
+
 
 # --- Eco scoring logic ---
-def assign_recyclability(material):
-    if material in ["Plastic"]:
-        return "Low"
-    elif material in ["Glass", "Aluminum", "Steel"]:
-        return "High"
-    elif material in ["Bamboo", "Cardboard", "Paper"]:
-        return "Medium"
+def assign_recyclability(material, rng):
+    recyclability = _FIXED_RECYCLE[material]
+    fallback = _RANDOM_RECYCLE[material]
+    recyclability[fallback] = rng.integers(0, len(recyclabilities), fallback.sum())  # fallback randomness
+    return recyclability
+
+
+def assign_score(material, weight, transport, rng):
+    # Same rules, same precedence as the per-row version; first match wins
+    conditions = [
+        (material == _M["Bamboo"]) & (transport == _T["Ship"]) & (weight < 0.5),
+        transport == _T["Air"],
+        weight > 1.2,
+        (material == _M["Plastic"]) & (transport == _T["Land"]),
+        (material == _M["Glass"]) & (transport == _T["Ship"]),
+        material == _M["Steel"],
+    ]
+    choices = [_S["A+"], _S["F"], _S["D"], _S["C"], _S["B"], _S["C"]]
+    fallback = np.array([_S[s] for s in fallback_scores])[rng.integers(0, len(fallback_scores), len(weight))]
+    return np.select(conditions, choices, default=fallback)
+
+
+def mock_products(rng, n):
+    material = rng.integers(0, len(materials), n)
+    transport = rng.integers(0, len(transports), n)
+    weight = np.round(rng.uniform(0.1, 2.0, n), 2)
+    recyclability = assign_recyclability(material, rng)
+    origin = rng.integers(0, len(origins), n)
+    title = rng.integers(0, len(search_terms), n)
+    score = assign_score(material, weight, transport, rng)
+    carbon = dataset_carbon(weight, Coded(material, materials), Coded(transport, transports),
+                            Coded(recyclability, recyclabilities))
+    return {"title": title, "material": material, "weight": weight, "transport": transport,
+            "recyclability": recyclability, "true_eco_score": score, "co2_emissions": carbon, "origin": origin}
+
+
+# --- Class balance ---
+def parse_balance(spec):
+    # "natural" (whatever the rules produce), "uniform", or weights like "A+=1,A=2,F=0.5"
+    if spec == "natural":
+        return None
+    if spec == "uniform":
+        return np.full(len(scores), 1 / len(scores))
+    weights = np.zeros(len(scores))
+    for part in spec.split(","):
+        label, _, value = part.partition("=")
+        if label.strip() not in _S:
+            raise ValueError(f"Unknown class '{label}' in --balance (expected one of {scores})")
+        weights[_S[label.strip()]] = float(value)
+    if weights.sum() <= 0:
+        raise ValueError("--balance weights must not all be zero")
+    return weights / weights.sum()
+
+
+def quotas(n, weights):
+    # Largest-remainder split of n rows over the classes
+    exact = n * weights
+    counts = np.floor(exact).astype(int)
+    counts[np.argsort(counts - exact)[: n - counts.sum()]] += 1
+    return counts
+
+
+def balanced_products(rng, n, weights, max_rounds=200):
+    # Oversample, keep each class's quota, then shuffle the kept rows together
+    need = quotas(n, weights)
+    kept = []
+    for _ in range(max_rounds):
+        if not need.any():
+            break
+        batch = mock_products(rng, max(4 * n, 4096))
+        take = []
+        for label in np.flatnonzero(need):
+            idx = np.flatnonzero(batch["true_eco_score"] == label)[: need[label]]
+            need[label] -= len(idx)
+            take.append(idx)
+        idx = np.concatenate(take)
+        kept.append({k: v[idx] for k, v in batch.items()})
     else:
-        return choice(["Low", "Medium", "High"])  # fallback randomness
-
-
-def assign_score(material, weight, transport):
-    if material == "Bamboo" and transport == "Ship" and weight < 0.5:
-        return "A+"
-    if transport == "Air":
-        return "F"
-    if weight > 1.2:
-        return "D"
-    if material == "Plastic" and transport == "Land":
-        return "C"
-    if material == "Glass" and transport == "Ship":
-        return "B"
-    if material == "Steel":
-        return "C"
-    return random.choice(["A", "B", "C", "D", "E", "F"])  # fallback randomness
-
-def mock_product():
-    material = choice(materials)
-    transport = choice(["Land", "Air", "Ship"])
-    weight = round(uniform(0.1, 2.0), 2)
-    recyclability = assign_recyclability(material)
-    origin = choice(origins).upper()   # randomly pick one
-
-    base = {
-        "Plastic": 1.2,
-        "Bamboo": 0.6,
-        "Glass": 1.5,
-        "Steel": 1.8,
-        "Cardboard": 0.7,
-        "Aluminum": 1.6,
-        "Paper": 0.5
-    }.get(material, 1.0)  # 👈 fallback for 'Other' or unexpected material
-    print("🔬 Material chosen:", material)
-
-
-    transport_factor = {
-        "Land": 1.0,
-        "Air": 2.5,
-        "Ship": 0.8
-    }[transport]
-
-    recycle_factor = {
-    "Low": 1.0,
-    "Medium": 0.9,
-    "High": 0.7
-    }.get(recyclability, 1.0)  # 👈 Default to 1.0 if 'Unknown'
-
-
-    carbon = round(weight * base * transport_factor * recycle_factor, 2)
-
-    return {
-        "material": material,
-        "weight": weight,
-        "transport": transport,
-        "recyclability": recyclability,
-        "co2_emissions": carbon,
-        "origin": origin  # 👈 NEW
-    }
+        raise RuntimeError(f"Could not fill class quotas after {max_rounds} rounds: still need {dict(zip(scores, need))}")
+    block = {k: np.concatenate([b[k] for b in kept]) for k in kept[0]}
+    order = rng.permutation(n)
+    return {k: v[order] for k, v in block.items()}
 
 
 # --- Generate data ---
-materials = ["Plastic", "Bamboo", "Other", "Glass", "Steel", "Cardboard", "Aluminum", "Paper",]
-
-for term in search_terms:
-    print(f"\n🔎 Searching: {term}")
-    for _ in range(max_products):
-        product = mock_product()
-        eco_score = assign_score(product["material"], product["weight"], product["transport"])
-
-        rows.append([
-            term,  # ➜ this is the new "title" field
-            product["material"],
-            product["weight"],
-            product["transport"],
-            product["recyclability"],
-            eco_score,
-            product["co2_emissions"],
-            product["origin"]
-        ])
-
-        
-        print(f"✅ Mock Eco Product ➜ {eco_score}")
-        time.sleep(random.uniform(0.1, 0.2))  # faster runs
-
-# --- Save to CSV ---
-base_dir = os.path.dirname(__file__)
-save_path = os.path.join(base_dir, "eco_dataset.csv")
-
-print(f"\n🧮 Total rows generated: {len(rows)}")
-print(f"📄 Saving to: {os.path.abspath(save_path)}")
-print("🔍 Example row with title:", rows[0])
-
-with open(save_path, "a", newline="", encoding="utf-8") as f:
-    writer = csv.writer(f)
-    writer.writerow(["title","material", "weight", "transport", "recyclability", "true_eco_score", "co2_emissions", "origin"])
-    writer.writerows(rows)
-
-print(f"\n✅ Saved {len(rows)} smart mock products to {save_path}")
+def generate(rows, seed, balance=None, block_size=BLOCK_SIZE):
+    # Yields DataFrames of up to block_size rows
+    for block, start in enumerate(range(0, rows, block_size)):
+        n = min(block_size, rows - start)
+        rng = np.random.default_rng([seed, block])
+        data = mock_products(rng, n) if balance is None else balanced_products(rng, n, balance)
+        yield pd.DataFrame({
+            "title": pd.Categorical.from_codes(data["title"], search_terms),
+            "material": pd.Categorical.from_codes(data["material"], materials),
+            "weight": data["weight"],
+            "transport": pd.Categorical.from_codes(data["transport"], transports),
+            "recyclability": pd.Categorical.from_codes(data["recyclability"], recyclabilities),
+            "true_eco_score": pd.Categorical.from_codes(data["true_eco_score"], scores),
+            "co2_emissions": data["co2_emissions"],
+            "origin": pd.Categorical.from_codes(data["origin"], [o.upper() for o in origins]),
+        }, columns=COLUMNS)
+
+
+def rechunk(frames, chunk_size):
+    buffered, size = [], 0
+    for frame in frames:
+        buffered.append(frame)
+        size += len(frame)
+        while size >= chunk_size:
+            joined = pd.concat(buffered, ignore_index=True)
+            yield joined.iloc[:chunk_size]
+            buffered, size = [joined.iloc[chunk_size:]], size - chunk_size
+    if size:
+        yield pd.concat(buffered, ignore_index=True)
+
+
+# --- Save ---
+def write_csv(frames, path, append=True):
+    # One header per file: only when the file is new, empty, or overwritten
+    mode = "a" if append else "w"
+    header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+    total = 0
+    with open(path, mode, newline="", encoding="utf-8") as f:
+        for frame in frames:
+            frame.to_csv(f, header=header, index=False)
+            header = False
+            total += len(frame)
+    return total
+
+
+def write_parquet(frames, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ Parquet output needs pyarrow (pip install pyarrow); use a .csv path instead.")
+    writer, total = None, 0
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            total += len(frame)
+    finally:
+        if writer:
+            writer.close()
+    return total
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="🧪 Seeded, vectorized synthetic eco dataset.")
+    parser.add_argument("--rows", type=int, default=len(search_terms) * max_products)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--balance", default="natural", help='"natural", "uniform" or weights like "A+=1,A=1,B=2"')
+    parser.add_argument("--out", default=os.path.join(base_dir, "eco_dataset.csv"), help=".csv or .parquet")
+    parser.add_argument("--overwrite", action="store_true", help="Replace the CSV instead of appending to it")
+    parser.add_argument("--chunk-size", type=int, default=BLOCK_SIZE * 4, help="Rows per write")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    frames = rechunk(generate(args.rows, args.seed, parse_balance(args.balance)), args.chunk_size)
+    if args.out.endswith(".parquet"):
+        total = write_parquet(frames, args.out)
+    else:
+        total = write_csv(frames, args.out, append=not args.overwrite)
+    elapsed = time.perf_counter() - t0
+
+    print(f"✅ Saved {total} smart mock products to {os.path.abspath(args.out)} "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s, seed {args.seed}, balance {args.balance})")
@@ -0,0 +1,211 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+# === Bundle format ===
+# One file instead of six pickles:
+#   8 bytes   magic  b"ECOBNDL1"
+#   4 bytes   little-endian uint32 length of the JSON header
+#   N bytes   JSON header (encoder classes, forest metadata, array table)
+#   padding   to a 64-byte boundary, then every array back to back
+# Arrays are read through a read-only np.memmap, so forked or separately
+# started workers share the tree pages through the OS page cache.
+
+MAGIC = b"ECOBNDL1"
+ALIGN = 64
+BUNDLE_NAME = "eco_model.bundle"
+ENCODER_NAMES = ["material", "transport", "recycle", "label", "origin"]
+
+
+# === Lightweight stand-ins for the sklearn objects ===
+class BundledLabelEncoder:
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self._index = {c: i for i, c in enumerate(self.classes_.tolist())}
+
+    def transform(self, values):
+        try:
+            return np.array([self._index[v] for v in values], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e.args[0]!r}")
+
+    def inverse_transform(self, indices):
+        return self.classes_[np.asarray(indices, dtype=np.int64)]
+
+
+class BundledForest:
+    """Random forest predictor evaluated straight from flat node arrays."""
+
+    def __init__(self, arrays, classes, feature_importances, n_features):
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.classes_ = np.asarray(classes)
+        self.feature_importances_ = np.asarray(feature_importances)
+        self.n_features_in_ = n_features
+        self.n_estimators = len(self.roots)
+
+    def _as_matrix(self, X):
+        # sklearn evaluates trees on float32 inputs; match it so splits agree
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model is expecting {self.n_features_in_} features as input."
+            )
+        return X
+
+    def apply(self, X):
+        # Walk every sample down every tree at once, one depth level per step
+        X = self._as_matrix(X)
+        nodes = np.tile(self.roots, (X.shape[0], 1))
+        while True:
+            left = self.children_left[nodes]
+            is_leaf = left == -1
+            if is_leaf.all():
+                return nodes
+            feat = np.where(is_leaf, 0, self.feature[nodes])
+            go_left = np.take_along_axis(X, feat, axis=1) <= self.threshold[nodes]
+            step = np.where(go_left, left, self.children_right[nodes])
+            nodes = np.where(is_leaf, nodes, step)
+
+    def predict_proba(self, X):
+        return self.value[self.apply(X)].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class ModelBundle:
+    def __init__(self, model, encoders, header):
+        self.model = model
+        self.encoders = encoders
+        self.header = header
+
+
+# === Export ===
+def forest_arrays(model):
+    # Concatenate every fitted tree into global node arrays
+    lefts, rights, feats, thresholds, values, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        left = tree.children_left.astype(np.int32)
+        right = tree.children_right.astype(np.int32)
+        lefts.append(np.where(left == -1, -1, left + offset))
+        rights.append(np.where(right == -1, -1, right + offset))
+        feats.append(tree.feature.astype(np.int32))
+        thresholds.append(tree.threshold.astype(np.float64))
+
+        value = tree.value[:, 0, :].astype(np.float64)
+        totals = value.sum(axis=1, keepdims=True)
+        values.append(value / np.where(totals == 0, 1.0, totals))
+
+        roots.append(offset)
+        offset += tree.node_count
+
+    return {
+        "children_left": np.concatenate(lefts),
+        "children_right": np.concatenate(rights),
+        "feature": np.concatenate(feats),
+        "threshold": np.concatenate(thresholds),
+        "value": np.concatenate(values),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+
+
+def _to_builtin(values):
+    return [v.item() if hasattr(v, "item") else v for v in values]
+
+
+def save_bundle(path, model, encoders):
+    arrays = forest_arrays(model)
+
+    table = {}
+    cursor = 0
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arrays[name] = arr
+        table[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": cursor}
+        cursor += -(-arr.nbytes // ALIGN) * ALIGN
+
+    header = {
+        "format_version": 1,
+        "n_features": int(model.n_features_in_),
+        "classes": _to_builtin(model.classes_),
+        "feature_importances": [float(v) for v in model.feature_importances_],
+        "encoders": {name: _to_builtin(enc.classes_) for name, enc in encoders.items()},
+        "arrays": table,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGN) * ALIGN
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(4, "little"))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + table[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + cursor)
+
+    print(f"📦 Saved model bundle to {path} ({os.path.getsize(path) / 1e6:.2f} MB)")
+
+
+# === Load ===
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an eco model bundle")
+        length = int.from_bytes(f.read(4), "little")
+        header = json.loads(f.read(length))
+    data_start = -(-(len(MAGIC) + 4 + length) // ALIGN) * ALIGN
+    return header, data_start
+
+
+def load_bundle(path):
+    header, data_start = read_header(path)
+    raw = np.memmap(path, dtype=np.uint8, mode="r")
+
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        start = data_start + spec["offset"]
+        arrays[name] = np.frombuffer(raw, dtype=dtype, count=count, offset=start).reshape(spec["shape"])
+
+    model = BundledForest(arrays, header["classes"], header["feature_importances"], header["n_features"])
+    encoders = {name: BundledLabelEncoder(classes) for name, classes in header["encoders"].items()}
+    return ModelBundle(model, encoders, header)
+
+
+# === CLI: convert the existing joblib pickles ===
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description="📦 Convert eco_model.pkl + encoders into a single model bundle.")
+    parser.add_argument("--model-dir", default=os.path.dirname(os.path.abspath(__file__)))
+    parser.add_argument("--out", help="Bundle path (default: <model-dir>/eco_model.bundle)")
+    args = parser.parse_args()
+
+    encoders_dir = os.path.join(args.model_dir, "encoders")
+    model = joblib.load(os.path.join(args.model_dir, "eco_model.pkl"))
+    encoders = {}
+    for name in ENCODER_NAMES:
+        enc_path = os.path.join(encoders_dir, f"{name}_encoder.pkl")
+        if os.path.exists(enc_path):
+            encoders[name] = joblib.load(enc_path)
+        else:
+            print(f"⚠️ Missing encoder: {enc_path}")
+
+    if not encoders:
+        sys.exit("❌ No encoders found, nothing to bundle.")
+
+    save_bundle(args.out or os.path.join(args.model_dir, BUNDLE_NAME), model, encoders)
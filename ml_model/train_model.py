@@ -4,17 +4,31 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
 import joblib
+import argparse
 import os
+import sys
+import time
+from model_bundle import BUNDLE_NAME, save_bundle
+from compact_dataset import COUNT_COLUMN, compact, load_rows, print_report
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.preprocessing import label_binarize
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Extension"))
+from vocabulary import DEFAULTS, canonical  # noqa: E402
+
+parser = argparse.ArgumentParser(description="🌲 Train the eco score model.")
+parser.add_argument("--no-compact", action="store_true", help="Train on every logged row as-is")
+parser.add_argument("--compare", action="store_true", help="Also time a fit on the uncompacted rows")
+parser.add_argument("--dataset", default=None, help="eco_dataset.csv, or a compact_dataset.py output (default: eco_dataset.csv)")
+args = parser.parse_args()
+
 # === Load dataset ===
 script_dir = os.path.dirname(__file__)
 project_root = os.path.dirname(script_dir)
-csv_path = os.path.join(script_dir, "eco_dataset.csv")
-column_names = ["title", "material", "weight", "transport", "recyclability", "true_eco_score", "co2_emissions", "origin"]
-df = pd.read_csv(csv_path, header=None, names=column_names, quotechar='"')
+csv_path = args.dataset or os.path.join(script_dir, "eco_dataset.csv")
+# Raw log lines or a compacted file with a header and `count` column
+df = load_rows(csv_path)
 
 # === Clean and filter ===
 valid_scores = ["A+", "A", "B", "C", "D", "E", "F"]
@@ -23,8 +37,9 @@ df["true_eco_score"] = df["true_eco_score"].str.upper().str.strip()
 df = df[df["true_eco_score"].isin(valid_scores)]
 df.dropna(subset=["material", "weight", "transport", "recyclability", "origin"], inplace=True)
 
+# Same canonical spellings the API encodes with (one lookup per distinct value)
 for col in ["material", "transport", "recyclability", "origin"]:
-    df[col] = df[col].astype(str).str.strip().str.title()
+    df[col] = df[col].map({v: canonical(col, v, DEFAULTS[col]) for v in df[col].unique()})
 
 # === Fallback row ===
 fallback_row = {
@@ -38,6 +53,18 @@ fallback_row = {
     "origin": "Other"
 }
 df = pd.concat([df, pd.DataFrame([fallback_row])], ignore_index=True)
+if COUNT_COLUMN in df:
+    df[COUNT_COLUMN] = df[COUNT_COLUMN].fillna(1).astype("int64")
+
+# === Compact ===
+# Repeated requests log identical rows; fit on each distinct row once, weighted by how often it was seen
+feature_columns = ["material", "weight", "transport", "recyclability", "origin", "true_eco_score"]
+if args.no_compact:
+    if COUNT_COLUMN not in df:
+        df[COUNT_COLUMN] = 1
+else:
+    df, compact_report = compact(df[feature_columns + [c for c in [COUNT_COLUMN] if c in df]], threshold=None)
+    print_report(compact_report, "Training rows")
 
 # === Encode features ===
 material_encoder = LabelEncoder()
@@ -55,13 +82,27 @@ df["label_encoded"] = label_encoder.fit_transform(df["true_eco_score"])
 # === Train ===
 X = df[["material_encoded", "weight", "transport_encoded", "recycle_encoded", "origin_encoded"]]
 y = df["label_encoded"]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+w = df[COUNT_COLUMN]
+X_train, X_test, y_train, y_test, w_train, w_test = train_test_split(X, y, w, test_size=0.2, random_state=42)
 
 model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
-
-print("✅ Accuracy:", model.score(X_test, y_test))
-print(classification_report(y_test, model.predict(X_test)))
+fit_start = time.perf_counter()
+model.fit(X_train, y_train, sample_weight=w_train)
+fit_seconds = time.perf_counter() - fit_start
+print(f"⏱️ Fit on {len(X_train)} rows ({int(w_train.sum())} weighted) in {fit_seconds:.2f}s")
+
+if args.compare and not args.no_compact:
+    # Same training rows, expanded back to one per logged line
+    repeat = X_train.index.repeat(w_train)
+    full_start = time.perf_counter()
+    RandomForestClassifier(n_estimators=100, random_state=42).fit(X_train.loc[repeat], y_train.loc[repeat])
+    full_seconds = time.perf_counter() - full_start
+    print(f"⏱️ Uncompacted fit on {len(repeat)} rows in {full_seconds:.2f}s "
+          f"→ {full_seconds / max(fit_seconds, 1e-9):.1f}x speedup")
+
+# Test rows are weighted too, so the metrics still reflect the logged distribution
+print("✅ Accuracy:", model.score(X_test, y_test, sample_weight=w_test))
+print(classification_report(y_test, model.predict(X_test), sample_weight=w_test))
 
 # === Save model and encoders ===
 model_dir = os.path.join(project_root, "ml_model")
@@ -75,6 +116,14 @@ joblib.dump(recycle_encoder, os.path.join(encoders_dir, "recycle_encoder.pkl"))
 joblib.dump(origin_encoder, os.path.join(encoders_dir, "origin_encoder.pkl"))
 joblib.dump(label_encoder, os.path.join(encoders_dir, "label_encoder.pkl"))
 
+save_bundle(os.path.join(model_dir, BUNDLE_NAME), model, {
+    "material": material_encoder,
+    "transport": transport_encoder,
+    "recycle": recycle_encoder,
+    "label": label_encoder,
+    "origin": origin_encoder,
+})
+
 print("✅ Model + encoders saved!")
 
 # === Feature Importance Chart ===
@@ -91,7 +140,7 @@ print("✅ Saved feature importance chart.")
 
 # === Confusion Matrix ===
 y_pred = model.predict(X_test)
-cm = confusion_matrix(y_test, y_pred)
+cm = confusion_matrix(y_test, y_pred, sample_weight=w_test).round().astype(int)
 labels = label_encoder.classes_
 
 plt.figure(figsize=(6, 5))
@@ -112,8 +161,8 @@ fpr = dict()
 tpr = dict()
 roc_auc = dict()
 for i in range(len(labels)):
-    fpr[i], tpr[i], _ = roc_curve(y_test_bin[:, i], y_score[:, i])
-    roc_auc[i] = roc_auc_score(y_test_bin[:, i], y_score[:, i])
+    fpr[i], tpr[i], _ = roc_curve(y_test_bin[:, i], y_score[:, i], sample_weight=w_test)
+    roc_auc[i] = roc_auc_score(y_test_bin[:, i], y_score[:, i], sample_weight=w_test)
 
 plt.figure(figsize=(6, 5))
 for i in range(len(labels)):
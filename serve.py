@@ -0,0 +1,122 @@
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+# === Preforked production server for app.py ===
+# The master imports the app (model + encoders load once), freezes the GC so
+# those objects are never touched again, binds the socket and then forks the
+# workers. Workers inherit the loaded state copy-on-write and accept on the
+# shared socket. Each worker exits after max_requests (+ jitter) and the
+# master replaces it, which bounds any slow memory growth.
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def serve_worker(app, sock, host, port, max_requests, access_log):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    random.seed()
+
+    served = 0
+
+    def counting_app(environ, start_response):
+        nonlocal served
+        served += 1
+        return app(environ, start_response)
+
+    handler = WSGIRequestHandler if access_log else QuietRequestHandler
+    server = make_server(host, port, counting_app, request_handler=handler, fd=sock.fileno())
+    server.timeout = 1.0
+
+    while not max_requests or served < max_requests:
+        server.handle_request()
+        if os.getppid() == 1:
+            break  # master died
+    # os._exit skips atexit: drain the worker's queued log records first
+    applog = sys.modules.get("applog")
+    if applog:
+        applog.shutdown()
+    os._exit(0)
+
+
+def run(app, host, port, workers, max_requests, max_requests_jitter, access_log):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.set_inheritable(True)
+
+    # Objects created so far (model, encoders, DataFrames) move to a permanent
+    # generation, so GC passes in the workers don't dirty their pages
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(slot):
+        limit = max_requests + random.randint(0, max_requests_jitter) if max_requests else 0
+        pid = os.fork()
+        if pid == 0:
+            serve_worker(app, sock, host, port, limit, access_log)
+        children[pid] = slot
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+    print(f"🚀 Serving on http://{host}:{port} with {workers} worker(s) (pid {os.getpid()})", flush=True)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is not None and not stopping:
+            # Recycled (or crashed) worker — replace it
+            spawn(slot)
+
+    sock.close()
+    print("👋 Server stopped.", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="🌍 Preforked multi-worker server for the EcoImpact API.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 5000)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--max-requests", type=int, default=5000, help="Recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=500)
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from app import app as wsgi_app
+
+    if not hasattr(os, "fork"):
+        print("⚠️ os.fork is not available on this platform, serving from a single process.")
+        make_server(args.host, args.port, wsgi_app, threaded=True).serve_forever()
+    else:
+        run(wsgi_app, args.host, args.port, args.workers, args.max_requests, args.max_requests_jitter, args.access_log)
@@ -0,0 +1,6 @@
+# WSGI entry point: `gunicorn wsgi:app --preload` (same as app:app) or `python serve.py`.
+# Model + encoders load when app.py is imported, so a prefork server that imports
+# it before forking shares them copy-on-write.
+from app import app
+
+__all__ = ["app"]